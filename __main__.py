@@ -200,7 +200,8 @@ def mostrar_resumen_diagnostico(ui: UIHelper, diagnostico: Dict):
     if diagnostico.get('errores'):
         print("\nErrores detectados:")
         for error in diagnostico['errores']:
-            print(f"- {error['tipo']}: {error['mensaje']}")
+            origen = error.get('componente', error.get('tipo'))
+            print(f"- {origen}: {error['mensaje']}")
     
     # Acciones realizadas
     if diagnostico.get('acciones_ejecutadas'):
@@ -0,0 +1,768 @@
+"""
+Servidor SSH/SFTP local que imita un hosting compartido para medir el
+conector sin tocar servidores reales. Sirve una instalación WordPress
+sintética y añade latencia y límite de ancho de banda configurables.
+
+Antes de medir se comprueba que las variantes comparadas dan el mismo
+resultado. Uso, desde la raíz del proyecto:
+
+    python benchmarks/ssh_stand_in.py
+"""
+
+import logging
+import os
+import queue
+import random
+import shutil
+import socket
+import subprocess
+import tempfile
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+# Agregar el directorio raíz al path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src.utils.ui_helper import UIHelper
+from src.hostinger_diagnostic.diagnostic_manager import DiagnosticConfig
+from src.hostinger_diagnostic.hostinger_connector import HostingerConnector
+from src.hostinger_diagnostic.log_analyzer import LogAnalyzer
+from src.hostinger_diagnostic.remote_logs import IncrementalLogFetcher
+from src.hostinger_diagnostic.ssh_pool import SSHConnectionPool
+
+try:
+    import paramiko
+except ImportError:
+    raise ImportError(
+        "El módulo 'paramiko' es necesario para conexiones SSH. "
+        "Instálelo con: pip install paramiko"
+    )
+
+# Líneas con las que se generan los logs sintéticos ({n} se sustituye por un
+# número)
+LINEAS_LOG = [
+    ("[{fecha}] PHP Warning:  Undefined array key \"opcion_{n}\" in "
+     "/home/u/public_html/wp-content/plugins/plugin-{p}/includes/clase.php "
+     "on line {n}"),
+    ("[{fecha}] PHP Notice:  Function wp_enqueue_script was called "
+     "incorrectly (id {n})"),
+    ("[{fecha}] PHP Fatal error:  Uncaught Error: Call to undefined function "
+     "funcion_{p}() in "
+     "/home/u/public_html/wp-content/themes/tema-0/functions.php:{n}"),
+    ("[{fecha}] WordPress database error Deadlock found when trying to get "
+     "lock for query SELECT {n}"),
+    ("[{fecha}] PHP Deprecated:  Creation of dynamic property "
+     "Clase_{p}::$campo is deprecated"),
+    "[{fecha}] Plugin plugin-{p} error: timeout tras {n} ms",
+    ("[{fecha}] Cron reschedule event error for hook "
+     "action_scheduler_run_queue ({n})"),
+]
+
+TAMANO_LECTURA = 65536
+
+
+def crear_sitio_sintetico(
+    home: Path,
+    plugins: int = 20,
+    temas: int = 3,
+    archivos_por_plugin: int = 25,
+    subidas: int = 200,
+    tamano_log: int = 10 * 1024 * 1024,
+    semilla: int = 0
+) -> Path:
+    """
+    Crea una instalación WordPress sintética en home/public_html.
+
+    Incluye núcleo mínimo, temas y plugins con cabeceras válidas, archivos
+    en uploads y un debug.log del tamaño indicado. La misma semilla genera
+    siempre el mismo árbol.
+    """
+    aleatorio = random.Random(semilla)
+    raiz = Path(home) / 'public_html'
+    (raiz / 'wp-includes').mkdir(parents=True, exist_ok=True)
+    (raiz / 'wp-includes/version.php').write_text(
+        "<?php\n$wp_version = '6.4.3';\n$required_php_version = '7.0.0';\n"
+    )
+    (raiz / 'wp-config.php').write_text(
+        "<?php\ndefine('DB_NAME', 'sintetico');\ndefine('WP_DEBUG', true);\n"
+    )
+
+    for t in range(temas):
+        tema = raiz / f'wp-content/themes/tema-{t}'
+        tema.mkdir(parents=True, exist_ok=True)
+        (tema / 'style.css').write_text(
+            f"/*\nTheme Name: Tema {t}\nVersion: 1.{t}.0\n"
+            f"Requires at least: 6.{t}\n"
+            f"Tested up to: 6.{t + 2}\nRequires PHP: 7.4\n*/\n"
+        )
+        (tema / 'functions.php').write_text(
+            "<?php\n" + ''.join(
+                f"add_action('init', 'tema_{t}_f{i}');\n"
+                f"function tema_{t}_f{i}() {{}}\n"
+                for i in range(50)
+            )
+        )
+
+    for p in range(plugins):
+        plugin = raiz / f'wp-content/plugins/plugin-{p}'
+        (plugin / 'includes').mkdir(parents=True, exist_ok=True)
+        (plugin / f'plugin-{p}.php').write_text(
+            f"<?php\n/*\nPlugin Name: Plugin {p}\n"
+            f"Version: {p % 5}.{p % 3}.0\nRequires at least: 5.{p % 10}\n"
+            f"Requires PHP: 7.{p % 5}\n*/\n"
+            f"require_once __DIR__ . '/includes/clase-0.php';\n"
+        )
+        for i in range(archivos_por_plugin):
+            (plugin / f'includes/clase-{i}.php').write_text(
+                f"<?php\nclass Plugin_{p}_Clase_{i} {{\n"
+                + '    public $dato = 1;\n' * aleatorio.randint(10, 200)
+                + "}\n"
+            )
+
+    uploads = raiz / 'wp-content/uploads/2024/01'
+    uploads.mkdir(parents=True, exist_ok=True)
+    for i in range(subidas):
+        tamano = aleatorio.randint(512, 4096)
+        (uploads / f'imagen-{i}.jpg').write_bytes(
+            bytes(aleatorio.getrandbits(8) for _ in range(tamano))
+        )
+
+    (raiz / 'wp-content/debug.log').write_bytes(b'')
+    ampliar_log(raiz / 'wp-content/debug.log', tamano_log, semilla)
+    return raiz
+
+
+def ampliar_log(log: Path, tamano: int, semilla: int = 0):
+    """Añade al log líneas sintéticas hasta sumar unos `tamano` bytes"""
+    aleatorio = random.Random(semilla)
+    escritos = 0
+    with open(log, 'a', encoding='utf-8') as archivo:
+        lineas = []
+        while escritos < tamano:
+            plantilla = aleatorio.choice(LINEAS_LOG)
+            hora = aleatorio.randint(0, 23)
+            minuto = aleatorio.randint(0, 59)
+            linea = plantilla.format(
+                fecha=f"01-Jan-2024 {hora:02d}:{minuto:02d}:00 UTC",
+                n=aleatorio.randint(1, 5000),
+                p=aleatorio.randint(0, 19)
+            ) + '\n'
+            lineas.append(linea)
+            escritos += len(linea)
+            if len(lineas) >= 1000:
+                archivo.write(''.join(lineas))
+                lineas = []
+        archivo.write(''.join(lineas))
+
+
+class EnlaceSimulado:
+    """
+    Proxy TCP que retrasa cada segmento la mitad de `latencia` en cada
+    sentido y limita el caudal a `ancho_banda` bytes por segundo.
+
+    El retraso se aplica por segmento sin bloquear los siguientes, de modo
+    que las peticiones en vuelo (canales concurrentes, SFTP con lectura
+    anticipada) se benefician igual que en una red real.
+    """
+
+    def __init__(
+        self,
+        destino: tuple,
+        latencia: float = 0.0,
+        ancho_banda: Optional[int] = None
+    ):
+        self.destino = destino
+        self.latencia = latencia
+        self.ancho_banda = ancho_banda
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind(('127.0.0.1', 0))
+        self._socket.listen(64)
+        self.puerto = self._socket.getsockname()[1]
+        self._activo = True
+        threading.Thread(target=self._aceptar, daemon=True).start()
+
+    def cerrar(self):
+        self._activo = False
+        try:
+            self._socket.close()
+        except OSError:
+            pass
+
+    def _aceptar(self):
+        while self._activo:
+            try:
+                cliente, _ = self._socket.accept()
+            except OSError:
+                break
+            try:
+                servidor = socket.create_connection(self.destino)
+            except OSError as e:
+                logging.error(f"Enlace simulado sin destino: {str(e)}")
+                cliente.close()
+                continue
+            for origen, destino in ((cliente, servidor), (servidor, cliente)):
+                origen.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                threading.Thread(
+                    target=self._bombear, args=(origen, destino), daemon=True
+                ).start()
+
+    def _bombear(self, origen: socket.socket, destino: socket.socket):
+        """Reenvía un sentido de la conexión con retraso y límite de caudal"""
+        cola: queue.Queue = queue.Queue()
+
+        def _leer():
+            while True:
+                try:
+                    datos = origen.recv(TAMANO_LECTURA)
+                except OSError:
+                    datos = b''
+                cola.put((time.monotonic() + self.latencia / 2, datos))
+                if not datos:
+                    break
+
+        threading.Thread(target=_leer, daemon=True).start()
+        libre = time.monotonic()
+        try:
+            while True:
+                llegada, datos = cola.get()
+                if not datos:
+                    break
+                if self.ancho_banda:
+                    # El enlace queda ocupado len/ancho_banda segundos por
+                    # segmento
+                    ocupado = len(datos) / self.ancho_banda
+                    libre = max(libre, time.monotonic()) + ocupado
+                    llegada = max(llegada, libre)
+                espera = llegada - time.monotonic()
+                if espera > 0:
+                    time.sleep(espera)
+                destino.sendall(datos)
+        except OSError:
+            pass
+        finally:
+            try:
+                destino.shutdown(socket.SHUT_WR)
+            except OSError:
+                pass
+
+
+class _SFTPHandle(paramiko.SFTPHandle):
+    def stat(self):
+        try:
+            return paramiko.SFTPAttributes.from_stat(
+                os.fstat(self.readfile.fileno())
+            )
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+
+
+class _SFTPServidor(paramiko.SFTPServerInterface):
+    """SFTP con el home del usuario sintético como raíz"""
+
+    def __init__(self, server, *args, home: Path = None, **kwargs):
+        super().__init__(server, *args, **kwargs)
+        self.home = Path(home)
+
+    def _ruta(self, ruta: str) -> str:
+        ruta = os.path.normpath('/' + ruta).lstrip('/')
+        return str(self.home / ruta)
+
+    def canonicalize(self, ruta):
+        return os.path.normpath('/' + ruta)
+
+    def list_folder(self, ruta):
+        try:
+            directorio = self._ruta(ruta)
+            return [
+                paramiko.SFTPAttributes.from_stat(
+                    os.lstat(os.path.join(directorio, nombre)), nombre
+                )
+                for nombre in os.listdir(directorio)
+            ]
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+
+    def stat(self, ruta):
+        try:
+            return paramiko.SFTPAttributes.from_stat(os.stat(self._ruta(ruta)))
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+
+    def lstat(self, ruta):
+        try:
+            return paramiko.SFTPAttributes.from_stat(
+                os.lstat(self._ruta(ruta))
+            )
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+
+    def open(self, ruta, flags, attr):
+        try:
+            descriptor = os.open(
+                self._ruta(ruta), flags | getattr(os, 'O_BINARY', 0), 0o644
+            )
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+        if flags & os.O_WRONLY:
+            modo = 'ab' if flags & os.O_APPEND else 'wb'
+        elif flags & os.O_RDWR:
+            modo = 'a+b' if flags & os.O_APPEND else 'r+b'
+        else:
+            modo = 'rb'
+        archivo = os.fdopen(descriptor, modo)
+        handle = _SFTPHandle(flags)
+        handle.filename = self._ruta(ruta)
+        handle.readfile = archivo
+        handle.writefile = archivo
+        return handle
+
+    def remove(self, ruta):
+        try:
+            os.remove(self._ruta(ruta))
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+        return paramiko.SFTP_OK
+
+    def rename(self, ruta, nueva):
+        try:
+            os.rename(self._ruta(ruta), self._ruta(nueva))
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+        return paramiko.SFTP_OK
+
+    def mkdir(self, ruta, attr):
+        try:
+            os.mkdir(self._ruta(ruta))
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+        return paramiko.SFTP_OK
+
+    def rmdir(self, ruta):
+        try:
+            os.rmdir(self._ruta(ruta))
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+        return paramiko.SFTP_OK
+
+
+class _SubsistemaSFTP(paramiko.SFTPServer):
+    """Subsistema SFTP que libera su canal al terminar la sesión"""
+
+    def finish_subsystem(self):
+        super().finish_subsystem()
+        self.get_server().liberar_canal()
+
+
+class _Servidor(paramiko.ServerInterface):
+    """Autenticación por contraseña y ejecución de comandos en shell local"""
+
+    def __init__(self, sustituto: 'SSHStandInServer'):
+        self.sustituto = sustituto
+        self.canales = 0
+        self._bloqueo = threading.Lock()
+
+    def check_auth_password(self, usuario, password):
+        if (usuario == self.sustituto.usuario
+                and password == self.sustituto.password):
+            return paramiko.AUTH_SUCCESSFUL
+        return paramiko.AUTH_FAILED
+
+    def get_allowed_auths(self, usuario):
+        return 'password'
+
+    def check_channel_request(self, tipo, chanid):
+        if tipo != 'session':
+            return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+        with self._bloqueo:
+            # Igual que MaxSessions de OpenSSH
+            if self.canales >= self.sustituto.max_canales:
+                return paramiko.OPEN_FAILED_RESOURCE_SHORTAGE
+            self.canales += 1
+        return paramiko.OPEN_SUCCEEDED
+
+    def liberar_canal(self):
+        with self._bloqueo:
+            self.canales -= 1
+
+    def check_channel_exec_request(self, canal, comando):
+        threading.Thread(
+            target=self.sustituto._ejecutar,
+            args=(canal, comando.decode('utf-8'), self),
+            daemon=True
+        ).start()
+        return True
+
+
+class SSHStandInServer:
+    """
+    Servidor SSH/SFTP en proceso que se comporta como un hosting compartido.
+
+    Los comandos se ejecutan con `sh -c` en el home sintético (de modo que
+    'public_html' es la ruta de WordPress, como en Hostinger) y el SFTP
+    usa ese home como raíz. Entre cliente y servidor se interpone un
+    EnlaceSimulado con la latencia y el ancho de banda indicados.
+
+    Uso:
+        with SSHStandInServer(latencia=0.05, ancho_banda=2_000_000) as srv:
+            conector = HostingerConnector(servidor.config(), ui)
+    """
+
+    def __init__(
+        self,
+        home: Optional[Path] = None,
+        latencia: float = 0.0,
+        ancho_banda: Optional[int] = None,
+        usuario: str = 'u123456789',
+        password: str = 'sustituto',
+        max_canales: int = 10,
+        **sitio
+    ):
+        self._temporal = None
+        if home is None:
+            self._temporal = tempfile.mkdtemp(prefix='webgenesis-ssh-')
+            home = Path(self._temporal)
+        self.home = Path(home)
+        if not (self.home / 'public_html').exists():
+            crear_sitio_sintetico(self.home, **sitio)
+        self.latencia = latencia
+        self.ancho_banda = ancho_banda
+        self.usuario = usuario
+        self.password = password
+        self.max_canales = max_canales
+        self.clave_host = paramiko.RSAKey.generate(2048)
+        self.conexiones = 0
+        self.comandos = 0
+        self._socket: Optional[socket.socket] = None
+        self._enlace: Optional[EnlaceSimulado] = None
+        self._transportes: List[paramiko.Transport] = []
+        self._activo = False
+
+    @property
+    def puerto(self) -> int:
+        """Puerto al que se conectan los clientes (el del enlace simulado)"""
+        return self._enlace.puerto
+
+    def config(self, ruta_remota: str = 'public_html') -> DiagnosticConfig:
+        """Configuración de diagnóstico remoto que apunta a este servidor"""
+        return DiagnosticConfig(
+            modo='remoto',
+            host='127.0.0.1',
+            usuario=self.usuario,
+            password=self.password,
+            ruta_remota=ruta_remota,
+            puerto=self.puerto
+        )
+
+    def iniciar(self) -> 'SSHStandInServer':
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind(('127.0.0.1', 0))
+        self._socket.listen(64)
+        self._activo = True
+        threading.Thread(target=self._aceptar, daemon=True).start()
+        self._enlace = EnlaceSimulado(
+            self._socket.getsockname(), self.latencia, self.ancho_banda
+        )
+        return self
+
+    def detener(self):
+        self._activo = False
+        if self._enlace is not None:
+            self._enlace.cerrar()
+        if self._socket is not None:
+            self._socket.close()
+        for transporte in self._transportes:
+            transporte.close()
+        self._transportes = []
+        if self._temporal:
+            shutil.rmtree(self._temporal, ignore_errors=True)
+
+    def __enter__(self) -> 'SSHStandInServer':
+        return self.iniciar()
+
+    def __exit__(self, *excepcion):
+        self.detener()
+
+    def _aceptar(self):
+        while self._activo:
+            try:
+                cliente, _ = self._socket.accept()
+            except OSError:
+                break
+            cliente.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            transporte = paramiko.Transport(cliente)
+            transporte.add_server_key(self.clave_host)
+            transporte.set_subsystem_handler(
+                'sftp', _SubsistemaSFTP, _SFTPServidor, home=self.home
+            )
+            servidor = _Servidor(self)
+            try:
+                transporte.start_server(server=servidor)
+            except (paramiko.SSHException, EOFError, OSError) as e:
+                logging.warning(f"Negociación SSH fallida: {str(e)}")
+                continue
+            self.conexiones += 1
+            self._transportes.append(transporte)
+
+    def _ejecutar(self, canal, comando: str, servidor: _Servidor):
+        """Ejecuta un comando y conecta stdin, stdout y stderr con el canal"""
+        self.comandos += 1
+        proceso = subprocess.Popen(
+            ['sh', '-c', comando],
+            cwd=self.home,
+            env={**os.environ, 'HOME': str(self.home)},
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+
+        def _entrada():
+            try:
+                while True:
+                    datos = canal.recv(TAMANO_LECTURA)
+                    if not datos:
+                        break
+                    proceso.stdin.write(datos)
+            except (OSError, EOFError):
+                pass
+            finally:
+                try:
+                    proceso.stdin.close()
+                except OSError:
+                    pass
+
+        def _errores():
+            while True:
+                datos = proceso.stderr.read1(TAMANO_LECTURA)
+                if not datos:
+                    break
+                canal.sendall_stderr(datos)
+
+        hilos = [
+            threading.Thread(target=_entrada, daemon=True),
+            threading.Thread(target=_errores, daemon=True)
+        ]
+        for hilo in hilos:
+            hilo.start()
+        try:
+            while True:
+                datos = proceso.stdout.read1(TAMANO_LECTURA)
+                if not datos:
+                    break
+                canal.sendall(datos)
+            hilos[1].join()
+            canal.send_exit_status(proceso.wait())
+        except (OSError, EOFError):
+            proceso.kill()
+        finally:
+            canal.shutdown_write()
+            canal.close()
+            servidor.liberar_canal()
+
+
+def _medir(funcion: Callable[[], object], repeticiones: int = 1) -> float:
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion()
+    return round((time.perf_counter() - inicio) / repeticiones, 4)
+
+
+def verificar_equivalencias(
+    tamano_log: int = 512 * 1024, ui: Optional[UIHelper] = None
+):
+    """
+    Comprueba en el servidor sustituto que las variantes que compara el
+    benchmark son intercambiables: ejecutar_lote, ejecutar_comandos y
+    ejecutar_comando en serie devuelven lo mismo, y leer un log en dos
+    pasadas incrementales da los mismos errores que leerlo entero.
+
+    Raises:
+        AssertionError: Si alguna variante da un resultado distinto
+    """
+    ui = ui or UIHelper()
+    # Con salida y sin stderr, o fallidas con stderr: así ejecutar_comando, que
+    # solo mira stderr, es comparable
+    sondas = {
+        'config': "cat public_html/wp-config.php",
+        'version': "cat public_html/wp-includes/version.php",
+        'plugins': "ls public_html/wp-content/plugins",
+        'binario': (
+            "head -c 4096 public_html/wp-content/uploads/2024/01/imagen-0.jpg"
+            " | od -An -tx1"
+        ),
+        'ausente': "cat public_html/no-existe.php",
+    }
+
+    sitio = {'plugins': 4, 'subidas': 4, 'tamano_log': tamano_log}
+    with SSHStandInServer(**sitio) as servidor:
+        pool = SSHConnectionPool()
+        conector = HostingerConnector(servidor.config(), ui, pool)
+        try:
+            assert conector.test_connection(), (
+                "No se pudo conectar al servidor sustituto"
+            )
+
+            serie = {
+                nombre: conector.ejecutar_comando(comando)
+                for nombre, comando in sondas.items()
+            }
+            respuestas = conector.ejecutar_comandos(list(sondas.values()))
+            canales = {
+                nombre: (
+                    r['exito'],
+                    r['salida'] if r['exito'] else (r['error'] or r['salida'])
+                )
+                for nombre, r in zip(sondas, respuestas)
+            }
+            lote = conector.ejecutar_lote(sondas)
+            assert serie == canales == lote, (
+                f"Resultados distintos:\n{serie}\n{canales}\n{lote}"
+            )
+            assert not lote['ausente'][0] and all(
+                exito for nombre, (exito, _) in lote.items()
+                if nombre != 'ausente'
+            )
+
+            log = servidor.home / 'public_html/wp-content/debug.log'
+            analizador = LogAnalyzer(ui)
+            with tempfile.TemporaryDirectory() as estado:
+                fetcher = IncrementalLogFetcher(
+                    conector.transporte(), Path(estado) / 'logs.json'
+                )
+                incremental = fetcher.obtener(analizador)
+                ampliar_log(log, tamano_log // 4, semilla=1)
+                siguiente = fetcher.obtener(analizador)
+            desde = siguiente['logs']['wp-content/debug.log']['desde']
+            assert desde > 0, "La segunda pasada no fue incremental"
+            assert not incremental['errores'] and not siguiente['errores']
+
+            completo = analizador.analizar_logs(conector.obtener_logs())
+            mensajes = Counter(e['mensaje'] for e in completo['errores'])
+            incrementales = Counter(
+                e['mensaje']
+                for e in (
+                    incremental['resultados']['errores']
+                    + siguiente['resultados']['errores']
+                )
+            )
+            assert mensajes and mensajes == incrementales, (
+                "El log incremental no coincide con el completo"
+            )
+        finally:
+            conector.cerrar_conexion()
+            pool.cerrar_todo()
+
+
+def ejecutar_benchmark(
+    latencia: float = 0.05,
+    ancho_banda: Optional[int] = 2_000_000,
+    tamano_log: int = 8 * 1024 * 1024,
+    ui: Optional[UIHelper] = None
+) -> Dict[str, Dict[str, float]]:
+    """
+    Compara en el servidor sustituto las variantes de cada operación remota:
+    conexión nueva frente a pool, sondas en serie, en canales concurrentes y
+    en lote, log completo frente a incremental, y transferencia con y sin
+    compresión. Devuelve los segundos de cada variante.
+    """
+    ui = ui or UIHelper()
+    resultados: Dict[str, Dict[str, float]] = {}
+    sondas = {
+        f"sonda_{i}": f"test -d public_html/wp-content/plugins/plugin-{i}"
+        for i in range(8)
+    }
+
+    enlace = {'latencia': latencia, 'ancho_banda': ancho_banda}
+    with SSHStandInServer(tamano_log=tamano_log, **enlace) as servidor:
+        config = servidor.config()
+
+        def _conectar(pool: SSHConnectionPool):
+            conector = HostingerConnector(config, ui, pool)
+            conector.test_connection()
+            conector.cerrar_conexion()
+
+        def _conectar_sin_pool():
+            nuevo = SSHConnectionPool()
+            try:
+                _conectar(nuevo)
+            finally:
+                nuevo.cerrar_todo()
+
+        pool = SSHConnectionPool()
+        resultados['conexion'] = {
+            'nueva': _medir(_conectar_sin_pool, 3),
+            'pool': _medir(lambda: _conectar(pool), 3)
+        }
+
+        conector = HostingerConnector(config, ui, pool, compresion='ninguno')
+        conector.test_connection()
+        resultados['sondas'] = {
+            'serie': _medir(
+                lambda: [conector.ejecutar_comando(c) for c in sondas.values()]
+            ),
+            'canales': _medir(
+                lambda: conector.ejecutar_comandos(list(sondas.values()))
+            ),
+            'lote': _medir(lambda: conector.ejecutar_lote(sondas))
+        }
+
+        with tempfile.TemporaryDirectory() as estado:
+            fetcher = IncrementalLogFetcher(
+                conector.transporte(), Path(estado) / 'logs.json'
+            )
+            analizador = LogAnalyzer(ui)
+            resultados['logs'] = {
+                'completo': _medir(conector.obtener_logs),
+                'incremental_inicial': _medir(
+                    lambda: fetcher.obtener(analizador)
+                ),
+            }
+            ampliar_log(
+                servidor.home / 'public_html/wp-content/debug.log',
+                tamano_log // 100,
+                semilla=1
+            )
+            resultados['logs']['incremental_siguiente'] = _medir(
+                lambda: fetcher.obtener(analizador)
+            )
+            fetcher.reiniciar()
+            resultados['logs']['resumen_remoto'] = _medir(
+                lambda: fetcher.resumir_remoto(analizador)
+            )
+
+        resultados['transferencia'] = {}
+        for compresion in ('ninguno', 'auto'):
+            conector_c = HostingerConnector(
+                config, ui, pool, compresion=compresion
+            )
+            conector_c.test_connection()
+            resultados['transferencia'][compresion] = _medir(
+                lambda: conector_c.manifiesto_remoto('public_html/wp-content')
+            )
+            resultados['transferencia'][f"{compresion}_log"] = _medir(
+                lambda: sum(
+                    len(b) for b in conector_c.flujo_remoto(
+                        'cat public_html/wp-content/debug.log'
+                    )
+                )
+            )
+            conector_c.cerrar_conexion()
+
+        conector.cerrar_conexion()
+        pool.cerrar_todo()
+    return resultados
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    verificar_equivalencias()
+    print("Equivalencias verificadas")
+    for grupo, medidas in ejecutar_benchmark().items():
+        print(grupo)
+        for variante, segundos in medidas.items():
+            print(f"  {variante:<24} {segundos:>8.3f}s")
@@ -0,0 +1,88 @@
+"""
+Orígenes de código activos en una instalación WordPress (tema activo y
+plugins activos) que analizan los inventarios de recursos y hooks.
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .plugin_catalog import PluginCatalog
+from .transport import Transport
+
+
+def plugins_activos(
+    ruta: Path,
+    advertencias: Optional[List[str]] = None,
+    transporte: Optional[Transport] = None
+) -> Optional[List[str]]:
+    """
+    Obtiene los plugins activos con WP-CLI.
+
+    WP-CLI se ejecuta a través de transporte (por defecto, en local sobre
+    ruta). Si no responde se usa el último volcado de opciones guardado
+    (y se anota su fecha en advertencias); si tampoco hay volcado devuelve
+    None.
+    """
+    catalogo = PluginCatalog(ruta, transporte)
+    opciones = catalogo.actualizar_estado()
+    if opciones is None:
+        return None
+    if catalogo.estado_desde_cache and advertencias is not None:
+        advertencias.append(
+            "WP-CLI no disponible: plugins activos según el volcado "
+            f"guardado el {opciones.get('fecha', '?')}"
+        )
+    return catalogo.activos()
+
+
+def plugins_instalados(ruta: Path) -> List[str]:
+    """Slugs de todos los plugins instalados, activos o no"""
+    return sorted({
+        info['slug'] for info in PluginCatalog(ruta).plugins.values()
+        if info['tipo'] == 'plugin'
+    })
+
+
+def origenes_activos(
+    ruta: Path,
+    temas: List[str],
+    plugins: Optional[List[str]] = None,
+    advertencias: Optional[List[str]] = None,
+    transporte: Optional[Transport] = None
+) -> Dict[str, Path]:
+    """
+    Devuelve las raíces de código activas indexadas por origen.
+
+    Args:
+        ruta: Raíz de la instalación WordPress
+        temas: Tema activo y, si es hijo, sus ancestros
+        plugins: Slugs de los plugins activos (por defecto, los del
+            catálogo de plugins)
+        advertencias: Lista donde se anota si no se pudo saber qué plugins
+            están activos y se usaron todos los instalados
+        transporte: Transporte con el que consultar WP-CLI si no se indican
+            los plugins (por defecto, local)
+
+    Returns:
+        Diccionario 'tema:<slug>' / 'plugin:<slug>' -> directorio
+    """
+    origenes = {}
+    for tema in temas:
+        if (ruta / 'wp-content/themes' / tema).is_dir():
+            origenes[f"tema:{tema}"] = ruta / 'wp-content/themes' / tema
+
+    if plugins is None:
+        plugins = plugins_activos(ruta, advertencias, transporte)
+    if plugins is None:
+        plugins = plugins_instalados(ruta)
+        if advertencias is not None:
+            advertencias.append(
+                "No se pudo obtener el estado de los plugins (sin WP-CLI ni "
+                f"volcado de opciones): se incluyen los {len(plugins)} "
+                "plugins instalados, activos o no, y los totales pueden "
+                "estar inflados"
+            )
+    for plugin in plugins:
+        if (ruta / 'wp-content/plugins' / plugin).is_dir():
+            origenes[f"plugin:{plugin}"] = ruta / 'wp-content/plugins' / plugin
+    return origenes
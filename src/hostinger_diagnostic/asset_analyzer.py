@@ -0,0 +1,280 @@
+"""
+Análisis del peso de los recursos front-end (CSS, JS, fuentes e imágenes)
+del tema activo y de los plugins activos.
+"""
+
+import logging
+import os
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from ..utils.ui_helper import UIHelper
+from .active_sources import origenes_activos
+from .scan_cache import ScanCache, huella_contenido
+from .scan_scope import ScanScope
+from .transport import Transport
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+TIPOS_ACTIVO = {
+    '.css': 'css',
+    '.js': 'js',
+    '.mjs': 'js',
+    '.woff': 'fuente',
+    '.woff2': 'fuente',
+    '.ttf': 'fuente',
+    '.otf': 'fuente',
+    '.eot': 'fuente',
+    '.png': 'imagen',
+    '.jpg': 'imagen',
+    '.jpeg': 'imagen',
+    '.gif': 'imagen',
+    '.webp': 'imagen',
+    '.avif': 'imagen',
+    '.svg': 'imagen',
+}
+
+# Formatos que ya están comprimidos y no se benefician de gzip/brotli
+FORMATOS_COMPRIMIDOS = {
+    '.woff', '.woff2', '.png', '.jpg', '.jpeg', '.gif', '.webp', '.avif'
+}
+
+# Límites de tamaño transferido (comprimido cuando aplica) por archivo y por
+# origen
+PRESUPUESTOS_POR_DEFECTO = {
+    'css': {'archivo': 50 * 1024, 'total': 150 * 1024},
+    'js': {'archivo': 100 * 1024, 'total': 350 * 1024},
+    'fuente': {'archivo': 100 * 1024, 'total': 300 * 1024},
+    'imagen': {'archivo': 250 * 1024, 'total': 2 * 1024 * 1024},
+}
+
+# Solo se podan directorios de control de versiones: vendor, node_modules o
+# cache (excluidos en el escaneo de PHP) suelen contener el CSS/JS que se sirve
+EXCLUSIONES_ACTIVOS = ['.git', '.svn', '.hg']
+
+# Relación aproximada brotli/gzip para texto cuando el módulo brotli no está
+# instalado
+RATIO_BROTLI_ESTIMADO = 0.86
+
+
+class AssetAnalyzer:
+    """Inventario y peso de los recursos front-end de temas y plugins"""
+
+    def __init__(
+        self,
+        ui: UIHelper,
+        alcance: Optional[ScanScope] = None,
+        presupuestos: Optional[Dict[str, Dict[str, int]]] = None,
+        max_workers: Optional[int] = None
+    ):
+        self.ui = ui
+        alcance = alcance or ScanScope(excluir=list(EXCLUSIONES_ACTIVOS))
+        self.alcance = alcance.con_inclusiones(
+            *[f"*{extension}" for extension in TIPOS_ACTIVO]
+        )
+        self.presupuestos = presupuestos or PRESUPUESTOS_POR_DEFECTO
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+
+    def analizar(
+        self,
+        ruta: Path,
+        temas: Optional[List[str]] = None,
+        plugins: Optional[List[str]] = None,
+        transporte: Optional[Transport] = None
+    ) -> Dict:
+        """
+        Analiza los recursos del tema y los plugins activos de una instalación.
+
+        Args:
+            ruta: Raíz de la instalación WordPress
+            temas: Tema activo y, si es hijo, sus ancestros
+            plugins: Slugs de los plugins activos (por defecto se consultan
+                con WP-CLI)
+            transporte: Transporte con el que se ejecuta WP-CLI (por
+                defecto, local)
+        """
+        resultados = {
+            'activos': [],
+            'totales': {},
+            'por_origen': {},
+            'excedidos': [],
+            'advertencias': []
+        }
+        try:
+            origenes = origenes_activos(
+                ruta, temas or [], plugins, resultados['advertencias'],
+                transporte
+            )
+            cache = ScanCache.para_raiz(ruta, 'activos')
+            truncado = False
+
+            pendientes = []
+            for origen, raiz in origenes.items():
+                recorrido = self.alcance.recorrer(raiz)
+                for archivo, st in recorrido:
+                    datos = cache.consultar(archivo, st)
+                    if datos is None:
+                        pendientes.append((origen, archivo, st))
+                    else:
+                        resultados['activos'].append({
+                            'origen': origen, 'archivo': str(archivo), **datos
+                        })
+                if recorrido.truncado:
+                    truncado = True
+                    resultados['advertencias'].append(
+                        f"Inventario de recursos de {origen} incompleto "
+                        f"({recorrido.motivo})"
+                    )
+
+            # Lectura, huella y compresión en paralelo: zlib y hashlib liberan
+            # el GIL
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                procesados = executor.map(
+                    lambda pendiente: self._procesar(cache, pendiente[1]),
+                    pendientes
+                )
+                for pendiente, procesado in zip(pendientes, procesados):
+                    origen, archivo, st = pendiente
+                    huella, datos, analizado = procesado
+                    if datos is None:
+                        continue
+                    cache.registrar(archivo, st, huella, datos, analizado)
+                    resultados['activos'].append(
+                        {'origen': origen, 'archivo': str(archivo), **datos}
+                    )
+
+            if not truncado:
+                cache.evictar()
+            cache.guardar()
+
+            self._totalizar(resultados)
+            self._evaluar_presupuestos(resultados)
+            resultados['cache'] = cache.estadisticas()
+            resultados['brotli_estimado'] = brotli is None
+            ratio = resultados['cache']['ratio_aciertos']
+            self.ui.print_step(
+                f"Recursos front-end: {len(resultados['activos'])} "
+                f"(aciertos de caché: {ratio:.0%})"
+            )
+
+        except Exception as e:
+            logging.error(f"Error al analizar recursos front-end: {str(e)}")
+            resultados['advertencias'].append(
+                f"Error al analizar recursos: {str(e)}"
+            )
+
+        return resultados
+
+    def _procesar(
+        self, cache: ScanCache, archivo: Path
+    ) -> Tuple[Optional[str], Optional[Dict], bool]:
+        """Lee un archivo, calcula su huella y lo analiza si es nuevo"""
+        try:
+            contenido = archivo.read_bytes()
+        except OSError as e:
+            logging.warning(f"No se pudo leer {archivo}: {str(e)}")
+            return None, None, False
+        huella = huella_contenido(contenido)
+        datos = cache.por_huella(huella)
+        if datos is not None:
+            return huella, datos, False
+        datos = self.analizar_contenido(archivo.suffix.lower(), contenido)
+        return huella, datos, True
+
+    def analizar_contenido(self, extension: str, contenido: bytes) -> Dict:
+        """Calcula tamaños y minificación de un recurso"""
+        tipo = TIPOS_ACTIVO.get(extension, 'otro')
+        tamano = len(contenido)
+        datos = {
+            'tipo': tipo,
+            'bytes': tamano,
+            'gzip': tamano,
+            'brotli': tamano,
+            'minificado': None
+        }
+        if extension not in FORMATOS_COMPRIMIDOS and tamano:
+            # 18 bytes de cabecera y cola gzip
+            datos['gzip'] = len(zlib.compress(contenido, 6)) + 18
+            if brotli is not None:
+                datos['brotli'] = len(brotli.compress(contenido, quality=5))
+            else:
+                datos['brotli'] = int(datos['gzip'] * RATIO_BROTLI_ESTIMADO)
+        if tipo in ('css', 'js'):
+            datos['minificado'] = self._parece_minificado(contenido)
+        return datos
+
+    def _parece_minificado(self, contenido: bytes) -> bool:
+        """Heurística de minificación: líneas largas y pocos espacios"""
+        if not contenido:
+            return True
+        lineas = contenido.count(b'\n') + 1
+        longitud_media = len(contenido) / lineas
+        blancos = (
+            contenido.count(b' ') + contenido.count(b'\t') + lineas
+        ) / len(contenido)
+        return longitud_media > 200 or (
+            len(contenido) > 1024 and blancos < 0.05
+        )
+
+    def _totalizar(self, resultados: Dict):
+        """Agrega tamaños por tipo y por origen"""
+        for activo in resultados['activos']:
+            for clave, agrupacion in (
+                (activo['tipo'], resultados['totales']),
+                (activo['origen'], resultados['por_origen'])
+            ):
+                total = agrupacion.setdefault(
+                    clave, {'archivos': 0, 'bytes': 0, 'gzip': 0, 'brotli': 0}
+                )
+                total['archivos'] += 1
+                total['bytes'] += activo['bytes']
+                total['gzip'] += activo['gzip']
+                total['brotli'] += activo['brotli']
+
+    def _evaluar_presupuestos(self, resultados: Dict):
+        """Marca los archivos y orígenes que superan los presupuestos"""
+        totales_origen_tipo = {}
+        for activo in resultados['activos']:
+            presupuesto = self.presupuestos.get(activo['tipo'])
+            clave = (activo['origen'], activo['tipo'])
+            totales_origen_tipo[clave] = (
+                totales_origen_tipo.get(clave, 0) + activo['gzip']
+            )
+            if presupuesto and activo['gzip'] > presupuesto['archivo']:
+                resultados['excedidos'].append({
+                    'origen': activo['origen'],
+                    'tipo': activo['tipo'],
+                    'archivo': activo['archivo'],
+                    'bytes': activo['gzip'],
+                    'limite': presupuesto['archivo']
+                })
+            if activo['minificado'] is False and activo['bytes'] > 10 * 1024:
+                resultados['advertencias'].append(
+                    f"Recurso sin minificar: {activo['archivo']}"
+                )
+
+        for (origen, tipo), total in sorted(totales_origen_tipo.items()):
+            presupuesto = self.presupuestos.get(tipo)
+            if presupuesto and total > presupuesto['total']:
+                resultados['excedidos'].append({
+                    'origen': origen,
+                    'tipo': tipo,
+                    'archivo': None,
+                    'bytes': total,
+                    'limite': presupuesto['total']
+                })
+
+        for excedido in resultados['excedidos']:
+            destino = excedido['archivo'] or (
+                f"total {excedido['tipo']} de {excedido['origen']}"
+            )
+            resultados['advertencias'].append(
+                f"Presupuesto excedido: {destino} "
+                f"({excedido['bytes'] // 1024} KB > "
+                f"{excedido['limite'] // 1024} KB)"
+            )
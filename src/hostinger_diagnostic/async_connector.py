@@ -0,0 +1,497 @@
+"""
+Motor SSH asíncrono para diagnosticar cientos de servidores desde un solo
+proceso. Ofrece la misma interfaz que HostingerConnector con corrutinas y
+requiere el paquete opcional asyncssh.
+"""
+
+import asyncio
+import json
+import logging
+import random
+import shlex
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from ..utils.ui_helper import UIHelper
+from .remote_batch import parsear_lote, script_lote
+from .remote_logs import ARCHIVOS_LOG, ruta_log_remota
+
+try:
+    import asyncssh
+except ImportError:
+    asyncssh = None
+
+T = TypeVar('T')
+
+ClaveConexion = Tuple[str, str, int]
+
+# Un comando solo se repite si no llegó a ejecutarse (canal rechazado); las
+# sondas de solo lectura se repiten también si se agotó su tiempo, porque un
+# comando cortado a medias puede haber hecho ya parte de su trabajo
+_ERRORES_CANAL = (asyncssh.ChannelOpenError,) if asyncssh is not None else ()
+_ERRORES_LECTURA = _ERRORES_CANAL + (asyncio.TimeoutError,)
+
+
+@dataclass
+class LimitesAsync:
+    """Límites de concurrencia, tiempos de espera y reintentos del motor"""
+    max_conexiones: int = 200
+    max_por_host: int = 4
+    timeout_conexion: float = 15.0
+    timeout_comando: float = 60.0
+    reintentos: int = 3
+    espera_base: float = 0.5
+    espera_max: float = 10.0
+    keepalive: int = 30
+
+
+class AsyncSSHEngine:
+    """
+    Conexiones asyncssh compartidas entre los conectores de una flota.
+
+    Hay una conexión por (host, usuario, puerto) multiplexada en canales.
+    Un semáforo global limita las conexiones abiertas y otro por host los
+    canales simultáneos en un mismo servidor. Cada conexión se cierra
+    cuando la suelta el último conector que la usa, liberando su hueco
+    global para otro servidor.
+    """
+
+    def __init__(self, limites: Optional[LimitesAsync] = None):
+        if asyncssh is None:
+            raise ImportError(
+                "El módulo 'asyncssh' es necesario para el motor asíncrono. "
+                "Instálelo con: pip install asyncssh"
+            )
+        self.limites = limites or LimitesAsync()
+        # Los semáforos se crean dentro del bucle de eventos que los usa
+        self._global: Optional[asyncio.Semaphore] = None
+        self._por_host: Dict[str, asyncio.Semaphore] = {}
+        self._bloqueos: Dict[ClaveConexion, asyncio.Lock] = {}
+        self._conexiones: Dict[
+            ClaveConexion, 'asyncssh.SSHClientConnection'
+        ] = {}
+        self._referencias: Dict[ClaveConexion, int] = {}
+        self._abiertas = 0
+        self._metricas = {
+            'conexiones': 0,
+            'fallos_conexion': 0,
+            'reintentos': 0,
+            'timeouts': 0,
+            'comandos': 0,
+            'max_abiertas': 0,
+            'segundos_conexion': 0.0
+        }
+
+    async def conectar(
+        self,
+        host: str,
+        usuario: str,
+        password: Optional[str],
+        puerto: int = 22
+    ):
+        """Devuelve la conexión del servidor, abriéndola si aún no existe"""
+        clave = (host, usuario, puerto)
+        bloqueo = self._bloqueos.setdefault(clave, asyncio.Lock())
+        async with bloqueo:
+            conexion = self._conexiones.get(clave)
+            if conexion is None:
+                # La espera por un hueco global no cuenta para el tiempo máximo
+                # de conexión
+                await self._cupo_global().acquire()
+                try:
+                    conexion = await self.con_reintentos(
+                        lambda: self._abrir(host, usuario, password, puerto),
+                        self.limites.timeout_conexion,
+                        f"conexión con {usuario}@{host}"
+                    )
+                except BaseException:
+                    self._global.release()
+                    self._metricas['fallos_conexion'] += 1
+                    raise
+                self._conexiones[clave] = conexion
+            self._referencias[clave] = self._referencias.get(clave, 0) + 1
+            return conexion
+
+    async def soltar(
+        self,
+        host: str,
+        usuario: str,
+        puerto: int = 22,
+        descartar: bool = False
+    ):
+        """
+        Deja de usar una conexión; se cierra al soltarla el último conector.
+        """
+        clave = (host, usuario, puerto)
+        restantes = self._referencias.get(clave, 0) - 1
+        if restantes > 0 and not descartar:
+            self._referencias[clave] = restantes
+            return
+        self._referencias.pop(clave, None)
+        conexion = self._conexiones.pop(clave, None)
+        if conexion is not None:
+            await self._cerrar(conexion)
+
+    async def ejecutar(
+        self, conexion, host: str, comando: str, idempotente: bool = False
+    ) -> Dict:
+        """
+        Ejecuta un comando respetando el límite de canales por host.
+
+        Solo se reintenta tras agotar el tiempo si idempotente es True.
+        """
+        async with self._semaforo_host(host):
+            inicio = time.perf_counter()
+            self._metricas['comandos'] += 1
+            resultado = await self.con_reintentos(
+                lambda: conexion.run(
+                    comando, check=False, encoding='utf-8', errors='replace'
+                ),
+                self.limites.timeout_comando,
+                comando,
+                _ERRORES_LECTURA if idempotente else _ERRORES_CANAL
+            )
+            return {
+                'comando': comando,
+                'exito': resultado.exit_status == 0,
+                'salida': resultado.stdout or '',
+                'error': resultado.stderr or '',
+                'codigo': resultado.exit_status,
+                'segundos': round(time.perf_counter() - inicio, 3)
+            }
+
+    async def ejecutar_script(
+        self, conexion, host: str, script: str, idempotente: bool = False
+    ) -> Tuple[bytes, str, int]:
+        """
+        Envía un script por stdin a `sh -s` y devuelve stdout en bytes,
+        stderr y código; como en ejecutar, el tiempo agotado solo se
+        reintenta si idempotente es True.
+        """
+        async with self._semaforo_host(host):
+            self._metricas['comandos'] += 1
+            resultado = await self.con_reintentos(
+                lambda: conexion.run(
+                    'sh -s',
+                    input=script.encode('utf-8'),
+                    check=False,
+                    encoding=None
+                ),
+                self.limites.timeout_comando,
+                'sh -s',
+                _ERRORES_LECTURA if idempotente else _ERRORES_CANAL
+            )
+            error = (resultado.stderr or b'').decode('utf-8', errors='replace')
+            return resultado.stdout or b'', error, resultado.exit_status
+
+    async def con_reintentos(
+        self,
+        operacion: Callable[[], Awaitable[T]],
+        timeout: float,
+        descripcion: str,
+        reintentables: Optional[Tuple[type, ...]] = None
+    ) -> T:
+        """
+        Ejecuta una operación con tiempo máximo y reintentos.
+
+        Por defecto se reintentan los errores de red y de SSH salvo la
+        autenticación rechazada. Entre intentos se espera un tiempo
+        aleatorio entre 0 y espera_base * 2^intento (con tope espera_max),
+        para que cientos de tareas que fallan a la vez no reintenten todas
+        al mismo tiempo.
+        """
+        intento = 0
+        while True:
+            try:
+                return await asyncio.wait_for(operacion(), timeout)
+            except (OSError, asyncssh.Error, asyncio.TimeoutError) as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    self._metricas['timeouts'] += 1
+                if (
+                    intento >= self.limites.reintentos
+                    or isinstance(e, asyncssh.PermissionDenied)
+                    or (
+                        reintentables is not None
+                        and not isinstance(e, reintentables)
+                    )
+                ):
+                    raise
+                espera = random.uniform(0, min(
+                    self.limites.espera_max,
+                    self.limites.espera_base * 2 ** intento
+                ))
+                logging.info(
+                    f"Reintento {intento + 1} de {descripcion} en "
+                    f"{espera:.2f}s: {str(e) or type(e).__name__}"
+                )
+                self._metricas['reintentos'] += 1
+                intento += 1
+                await asyncio.sleep(espera)
+
+    async def cerrar_todo(self):
+        """Cierra todas las conexiones abiertas"""
+        conexiones = list(self._conexiones.values())
+        self._conexiones.clear()
+        self._referencias.clear()
+        await asyncio.gather(
+            *(self._cerrar(conexion) for conexion in conexiones)
+        )
+
+    def metricas(self) -> Dict:
+        """Conexiones, reintentos, timeouts y tiempo medio de conexión"""
+        metricas = dict(self._metricas)
+        metricas['abiertas'] = self._abiertas
+        metricas['media_segundos_conexion'] = round(
+            metricas['segundos_conexion'] / metricas['conexiones'], 4
+        ) if metricas['conexiones'] else 0.0
+        metricas['segundos_conexion'] = round(metricas['segundos_conexion'], 4)
+        return metricas
+
+    def _cupo_global(self) -> asyncio.Semaphore:
+        if self._global is None:
+            self._global = asyncio.Semaphore(self.limites.max_conexiones)
+        return self._global
+
+    async def _abrir(
+        self, host: str, usuario: str, password: Optional[str], puerto: int
+    ):
+        inicio = time.perf_counter()
+        conexion = await asyncssh.connect(
+            host,
+            port=puerto,
+            username=usuario,
+            password=password,
+            # Igual que AutoAddPolicy en el conector síncrono
+            known_hosts=None,
+            keepalive_interval=self.limites.keepalive
+        )
+        duracion = time.perf_counter() - inicio
+        self._metricas['conexiones'] += 1
+        self._metricas['segundos_conexion'] += duracion
+        self._abiertas += 1
+        self._metricas['max_abiertas'] = max(
+            self._metricas['max_abiertas'], self._abiertas
+        )
+        logging.info(
+            f"Conexión SSH asíncrona con {usuario}@{host}:{puerto} "
+            f"en {duracion:.3f}s"
+        )
+        return conexion
+
+    async def _cerrar(self, conexion):
+        try:
+            conexion.close()
+            await conexion.wait_closed()
+        except Exception as e:
+            logging.warning(f"Error al cerrar conexión SSH: {str(e)}")
+        finally:
+            self._abiertas -= 1
+            self._global.release()
+
+    def _semaforo_host(self, host: str) -> asyncio.Semaphore:
+        if host not in self._por_host:
+            self._por_host[host] = asyncio.Semaphore(self.limites.max_por_host)
+        return self._por_host[host]
+
+
+class AsyncHostingerConnector:
+    """
+    Versión asíncrona de HostingerConnector.
+
+    Los métodos tienen los mismos nombres y devuelven lo mismo, pero son
+    corrutinas. Varios conectores pueden compartir un AsyncSSHEngine para
+    aplicar los límites de toda la flota.
+    """
+
+    def __init__(
+        self, config, ui: UIHelper, motor: Optional[AsyncSSHEngine] = None
+    ):
+        self.config = config
+        self.ui = ui
+        self.motor = motor or AsyncSSHEngine()
+        self.ssh = None
+        self.is_connected = False
+
+    async def test_connection(self) -> bool:
+        """Prueba la conexión SSH al servidor"""
+        try:
+            if self.ssh is None:
+                self.ssh = await self.motor.conectar(
+                    self.config.host,
+                    self.config.usuario,
+                    self.config.password,
+                    self._puerto
+                )
+            self.is_connected = True
+            return True
+
+        except Exception as e:
+            self.ssh = None
+            motivo = str(e) or type(e).__name__
+            self.ui.print_error(
+                f"Error de conexión con {self.config.host}: {motivo}"
+            )
+            logging.error(
+                f"Error al conectar con {self.config.host}: {motivo}"
+            )
+            return False
+
+    async def ejecutar_comando(self, comando: str) -> Tuple[bool, str]:
+        """Ejecuta un comando en el servidor remoto"""
+        try:
+            if not self.is_connected:
+                raise Exception("No hay conexión activa")
+
+            resultado = await self.motor.ejecutar(
+                self.ssh, self.config.host, comando
+            )
+            if resultado['error']:
+                return False, resultado['error']
+
+            return True, resultado['salida']
+
+        except Exception as e:
+            return False, str(e) or type(e).__name__
+
+    async def ejecutar_comandos(
+        self, comandos: List[str], idempotente: bool = False
+    ) -> List[Dict]:
+        """
+        Ejecuta varios comandos a la vez y devuelve los resultados en el
+        mismo orden; idempotente permite reintentarlos si se agota el tiempo.
+        """
+        async def _ejecutar(comando: str) -> Dict:
+            if not self.is_connected:
+                return self._resultado(comando, "No hay conexión activa")
+            try:
+                return await self.motor.ejecutar(
+                    self.ssh, self.config.host, comando, idempotente
+                )
+            except Exception as e:
+                return self._resultado(comando, str(e) or type(e).__name__)
+
+        return list(await asyncio.gather(
+            *(_ejecutar(comando) for comando in comandos)
+        ))
+
+    async def ejecutar_lote(
+        self, sondas: Dict[str, str], idempotente: bool = False
+    ) -> Dict[str, Tuple[bool, str]]:
+        """
+        Ejecuta muchas sondas pequeñas en un único script remoto;
+        idempotente permite reintentarlo si se agota el tiempo.
+        """
+        if not self.is_connected:
+            return {
+                nombre: (False, "No hay conexión activa") for nombre in sondas
+            }
+
+        nombres = list(sondas)
+        try:
+            salida, error, _ = await self.motor.ejecutar_script(
+                self.ssh,
+                self.config.host,
+                script_lote([sondas[nombre] for nombre in nombres]),
+                idempotente
+            )
+        except Exception as e:
+            motivo = str(e) or type(e).__name__
+            return {nombre: (False, motivo) for nombre in nombres}
+        return parsear_lote(salida, nombres, error)
+
+    async def obtener_logs(self) -> Dict[str, str]:
+        """Obtiene logs remotos del servidor"""
+        try:
+            logs = {}
+            raiz = self.config.ruta_remota
+            comandos = [
+                f"cat {shlex.quote(ruta_log_remota(raiz, archivo))}"
+                for archivo in ARCHIVOS_LOG
+            ]
+            resultados = await self.ejecutar_comandos(
+                comandos, idempotente=True
+            )
+            for archivo, resultado in zip(ARCHIVOS_LOG, resultados):
+                if (
+                    resultado['exito']
+                    and not resultado['error']
+                    and resultado['salida'].strip()
+                ):
+                    logs[archivo] = resultado['salida']
+
+            return logs
+
+        except Exception as e:
+            self.ui.print_error(f"Error al obtener logs: {str(e)}")
+            return {}
+
+    async def obtener_info_tema(self) -> Dict:
+        """Obtiene información del tema activo"""
+        try:
+            ruta = shlex.quote(self.config.ruta_remota)
+            resultados = await self.ejecutar_lote({
+                'tema': (
+                    f"cd {ruta} && "
+                    "wp theme list --status=active --format=json"
+                ),
+                'version_wp': f"cd {ruta} && wp core version"
+            }, idempotente=True)
+            success, output = resultados['tema']
+
+            if success:
+                info = {'tema_info': json.loads(output)}
+                if resultados['version_wp'][0]:
+                    info['version_wp'] = resultados['version_wp'][1].strip()
+                return info
+            return {'error': output}
+
+        except Exception as e:
+            return {'error': str(e)}
+
+    async def verificar_permisos(self) -> Dict[str, bool]:
+        """Verifica permisos de directorios críticos"""
+        directorios = [
+            'wp-content',
+            'wp-content/themes',
+            'wp-content/plugins',
+            'wp-content/uploads'
+        ]
+
+        ruta = self.config.ruta_remota.rstrip('/')
+        resultados = await self.ejecutar_lote({
+            dir: f"test -w {shlex.quote(f'{ruta}/{dir}')}"
+            for dir in directorios
+        }, idempotente=True)
+        return {dir: resultados[dir][0] for dir in directorios}
+
+    async def cerrar_conexion(self, descartar: bool = False):
+        """Suelta la conexión compartida del motor"""
+        try:
+            if self.ssh is not None:
+                await self.motor.soltar(
+                    self.config.host,
+                    self.config.usuario,
+                    self._puerto,
+                    descartar
+                )
+        except Exception:
+            pass
+        finally:
+            self.ssh = None
+            self.is_connected = False
+
+    @property
+    def _puerto(self) -> int:
+        return getattr(self.config, 'puerto', 22)
+
+    @staticmethod
+    def _resultado(comando: str, error: str) -> Dict:
+        return {
+            'comando': comando,
+            'exito': False,
+            'salida': '',
+            'error': error,
+            'codigo': None,
+            'segundos': 0.0
+        }
@@ -0,0 +1,315 @@
+"""
+Verificación nativa de la integridad del core de WordPress.
+
+Equivale a `wp core verify-checksums` sin PHP ni conexión: los manifiestos
+de checksums se guardan en caché por versión y locale (los de una versión
+publicada no cambian), los archivos se hashean en paralelo en un pool de
+procesos y los que no cambiaron desde la última verificación se saltan por
+su huella de stat (tamaño, mtime_ns).
+"""
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .scan_cache import DIRECTORIO_CACHE, ScanCache
+
+DIRECTORIO_MANIFIESTOS = DIRECTORIO_CACHE / 'checksums'
+
+URL_CHECKSUMS = 'https://api.wordpress.org/core/checksums/1.0/?{consulta}'
+TIMEOUT_DESCARGA = 10
+
+# Lecturas de 1 MiB; a partir de 8 MiB el archivo se mapea en memoria
+TAMANO_LECTURA = 1024 * 1024
+UMBRAL_MMAP = 8 * 1024 * 1024
+
+# Por debajo de estos archivos o bytes pendientes se hashea en el propio
+# proceso
+MIN_ARCHIVOS_PARALELO = 256
+MIN_BYTES_PARALELO = 16 * 1024 * 1024
+
+_VERSION_WP = re.compile(r"""\$wp_version\s*=\s*['"]([^'"]+)['"]""")
+_LOCALE_WP = re.compile(r"""\$wp_local_package\s*=\s*['"]([^'"]+)['"]""")
+
+# Igual que `wp core verify-checksums`: los plugins y temas incluidos no
+# cuentan
+PREFIJOS_EXCLUIDOS = ('wp-content/plugins/', 'wp-content/themes/')
+
+
+def hash_archivo(ruta: str, algoritmo: str = 'md5') -> str:
+    """
+    Hash de un archivo con lecturas grandes, o mapeado en memoria si es
+    grande.
+    """
+    huella = hashlib.new(algoritmo)
+    with open(ruta, 'rb') as f:
+        if os.fstat(f.fileno()).st_size >= UMBRAL_MMAP:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+                huella.update(mapa)
+            return huella.hexdigest()
+        while True:
+            bloque = f.read(TAMANO_LECTURA)
+            if not bloque:
+                break
+            huella.update(bloque)
+    return huella.hexdigest()
+
+
+def _hash_o_error(
+    ruta: str, algoritmo: str
+) -> Tuple[Optional[str], Optional[str]]:
+    try:
+        return hash_archivo(ruta, algoritmo), None
+    except OSError as e:
+        return None, str(e)
+
+
+def hashear_archivos(
+    rutas: List[str],
+    algoritmo: str = 'md5',
+    max_workers: Optional[int] = None,
+    bytes_totales: int = 0
+) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+    """
+    Hashea varios archivos y devuelve (hash, error) por ruta.
+
+    Con pocos archivos y pocos bytes se hace en el propio proceso, porque
+    arrancar el pool costaría más que el hash; si no, se reparten entre
+    todos los núcleos en lotes.
+    """
+    if (
+        len(rutas) < MIN_ARCHIVOS_PARALELO
+        and bytes_totales < MIN_BYTES_PARALELO
+    ):
+        return {ruta: _hash_o_error(ruta, algoritmo) for ruta in rutas}
+
+    max_workers = max_workers or os.cpu_count() or 1
+    lote = max(1, len(rutas) // (max_workers * 8))
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            resultados = list(executor.map(
+                _hash_o_error, rutas, [algoritmo] * len(rutas), chunksize=lote
+            ))
+    except (OSError, BrokenProcessPool) as e:
+        logging.warning(f"Hash de archivos sin paralelismo: {str(e)}")
+        resultados = [_hash_o_error(ruta, algoritmo) for ruta in rutas]
+    return dict(zip(rutas, resultados))
+
+
+def version_instalada(raiz: Path) -> Tuple[Optional[str], str]:
+    """Versión y locale de WordPress según wp-includes/version.php"""
+    try:
+        contenido = (Path(raiz) / 'wp-includes/version.php').read_text(
+            encoding='utf-8', errors='ignore'
+        )
+    except OSError:
+        return None, 'en_US'
+    version = _VERSION_WP.search(contenido)
+    locale = _LOCALE_WP.search(contenido)
+    return (
+        version.group(1) if version else None,
+        locale.group(1) if locale else 'en_US'
+    )
+
+
+def ruta_manifiesto(version: str, locale: str) -> Path:
+    """Archivo de caché del manifiesto de checksums de una versión y locale"""
+    return DIRECTORIO_MANIFIESTOS / f"core-{version}-{locale}.json"
+
+
+def guardar_manifiesto(version: str, locale: str, checksums: Dict[str, str]):
+    """
+    Guarda un manifiesto en la caché (por ejemplo, uno copiado de otra
+    máquina para trabajar sin conexión).
+    """
+    archivo = ruta_manifiesto(version, locale)
+    archivo.parent.mkdir(parents=True, exist_ok=True)
+    temporal = archivo.with_suffix('.tmp')
+    temporal.write_text(
+        json.dumps(checksums, separators=(',', ':')), encoding='utf-8'
+    )
+    os.replace(temporal, archivo)
+
+
+def _descargar_manifiesto(version: str, locale: str):
+    """Pide el manifiesto de checksums a api.wordpress.org"""
+    # urllib.request arrastra http.client y ssl; solo se importa para descargar
+    import urllib.parse
+    import urllib.request
+
+    consulta = urllib.parse.urlencode({'version': version, 'locale': locale})
+    url = URL_CHECKSUMS.format(consulta=consulta)
+    with urllib.request.urlopen(url, timeout=TIMEOUT_DESCARGA) as respuesta:
+        return json.loads(respuesta.read().decode('utf-8')).get('checksums')
+
+
+def cargar_manifiesto(
+    version: str, locale: str = 'en_US', descargar: bool = True
+) -> Optional[Dict[str, str]]:
+    """
+    Manifiesto de checksums MD5 del core por ruta relativa.
+
+    Se usa la copia en caché si existe; si no y descargar=True se pide a
+    api.wordpress.org y se guarda. Si el locale no tiene manifiesto se usa
+    el de en_US, como hace WordPress.
+    """
+    for candidato in dict.fromkeys((locale, 'en_US')):
+        archivo = ruta_manifiesto(version, candidato)
+        try:
+            if archivo.exists():
+                return json.loads(archivo.read_text(encoding='utf-8'))
+        except (OSError, ValueError) as e:
+            logging.warning(
+                f"Manifiesto de checksums descartado ({archivo}): {str(e)}"
+            )
+        if not descargar:
+            continue
+        try:
+            checksums = _descargar_manifiesto(version, candidato)
+        except (OSError, ValueError) as e:
+            logging.warning(
+                "No se pudo descargar el manifiesto de WordPress "
+                f"{version} ({candidato}): {str(e)}"
+            )
+            continue
+        if isinstance(checksums, dict) and checksums:
+            try:
+                guardar_manifiesto(version, candidato, checksums)
+            except OSError as e:
+                logging.warning(
+                    "No se pudo guardar el manifiesto de checksums: "
+                    f"{str(e)}"
+                )
+            return checksums
+    return None
+
+
+class CoreIntegrityChecker:
+    """
+    Compara los archivos del core de una instalación con su manifiesto.
+
+    Da el mismo resultado que la parte 'core' de la sonda PHP: archivos
+    modificados, faltantes y ajenos al core en wp-admin y wp-includes. El
+    MD5 de cada archivo se guarda en una ScanCache, así que en la siguiente
+    verificación solo se hashean los archivos cuyo tamaño o mtime cambió.
+    """
+
+    def __init__(
+        self,
+        raiz: Path,
+        descargar: bool = True,
+        max_workers: Optional[int] = None
+    ):
+        self.raiz = Path(raiz)
+        self.descargar = descargar
+        self.max_workers = max_workers
+
+    def verificar(self) -> Dict:
+        """
+        Returns:
+            Diccionario con ok, disponible (si había manifiesto), versión,
+            locale, archivos verificados, listas de modificados, faltantes y
+            extra, archivos hasheados, estadísticas de la caché y segundos
+        """
+        inicio = time.perf_counter()
+        version, locale = version_instalada(self.raiz)
+        if not version:
+            return {
+                'ok': False,
+                'mensaje': "No se pudo leer la versión de "
+                           "wp-includes/version.php"
+            }
+        checksums = cargar_manifiesto(version, locale, self.descargar)
+        if checksums is None:
+            return {
+                'ok': True,
+                'disponible': False,
+                'version': version,
+                'locale': locale
+            }
+
+        esperados = {
+            archivo: suma for archivo, suma in checksums.items()
+            if not archivo.startswith(PREFIJOS_EXCLUIDOS)
+        }
+        cache = ScanCache.para_raiz(self.raiz, 'core-md5')
+        hashes: Dict[str, str] = {}
+        pendientes: Dict[str, Tuple[str, os.stat_result]] = {}
+        faltantes = []
+        for archivo in esperados:
+            ruta = self.raiz / archivo
+            try:
+                st = os.stat(ruta)
+            except OSError:
+                faltantes.append(archivo)
+                continue
+            conocido = cache.consultar(ruta, st)
+            if conocido is not None:
+                hashes[archivo] = conocido
+            else:
+                pendientes[archivo] = (str(ruta), st)
+
+        calculados = hashear_archivos(
+            [ruta for ruta, _ in pendientes.values()],
+            max_workers=self.max_workers,
+            bytes_totales=sum(st.st_size for _, st in pendientes.values())
+        )
+        errores = {}
+        for archivo, (ruta, st) in pendientes.items():
+            suma, error = calculados[ruta]
+            if error:
+                errores[archivo] = error
+                continue
+            hashes[archivo] = suma
+            cache.registrar(Path(ruta), st, suma, suma)
+
+        cache.evictar()
+        cache.guardar()
+
+        modificados = sorted(
+            archivo for archivo, suma in hashes.items()
+            if suma != esperados[archivo]
+        ) + sorted(errores)
+        extra = sorted(
+            archivo for archivo in self._archivos_core()
+            if archivo not in esperados
+        )
+        return {
+            'ok': not modificados and not faltantes,
+            'disponible': True,
+            'version': version,
+            'locale': locale,
+            'verificados': len(esperados),
+            'modificados': modificados,
+            'faltantes': sorted(faltantes),
+            'extra': extra,
+            'errores': errores,
+            'hasheados': len(pendientes),
+            'cache': cache.estadisticas(),
+            'segundos': round(time.perf_counter() - inicio, 3)
+        }
+
+    def _archivos_core(self) -> Iterable[str]:
+        """Archivos presentes en wp-admin y wp-includes"""
+        for directorio in ('wp-admin', 'wp-includes'):
+            pendientes = [self.raiz / directorio]
+            while pendientes:
+                actual = pendientes.pop()
+                try:
+                    entradas = list(os.scandir(actual))
+                except OSError:
+                    continue
+                for entrada in entradas:
+                    if entrada.is_dir(follow_symlinks=False):
+                        pendientes.append(Path(entrada.path))
+                    elif entrada.is_file():
+                        relativa = Path(entrada.path).relative_to(self.raiz)
+                        yield relativa.as_posix()
@@ -0,0 +1,433 @@
+"""
+Comprobaciones del diagnóstico completo de WordPress.
+
+La sonda PHP resuelve todas las comprobaciones con un solo arranque de
+WordPress (`wp eval-file`) y devuelve JSON compacto; en remoto cuesta un
+único viaje de ida y vuelta. Si la sonda no se puede ejecutar se recurre a
+los comandos WP-CLI de CHECKS_DIAGNOSTICO, uno por comprobación. En una
+instalación local los checksums del core se verifican en Python (ver
+core_integrity) en lugar de en PHP. Las usan WordPressManager y
+HostingerConnector sobre cualquier transporte.
+"""
+
+import json
+import logging
+from typing import Dict, Optional
+
+# Se ejecutan en la raíz de la instalación; en remoto van en un solo lote
+CHECKS_DIAGNOSTICO = [
+    ('core', ['wp', 'core', 'verify-checksums']),
+    ('db', ['wp', 'db', 'check']),
+    ('plugins', ['wp', 'plugin', 'status']),
+    ('temas', ['wp', 'theme', 'status']),
+    ('permisos', ['wp', 'eval', "echo wp_is_writable(ABSPATH)"]),
+    ('updates', ['wp', 'core', 'check-update']),
+    ('ssl', ['wp', 'eval', "echo is_ssl() ? 'SSL activo' : 'Sin SSL'"])
+]
+
+# Plugins y temas no se cargan: la sonda solo lee cabeceras y opciones, y
+# un plugin roto no debe impedir el diagnóstico
+ARGUMENTOS_SONDA = ['--skip-plugins', '--skip-themes']
+
+# Argumento posicional (llega a la sonda en $args) para no verificar el core
+ARGUMENTO_SIN_CORE = 'sin-core'
+
+# Prefijo de la línea con el JSON; lo que impriman otros componentes se ignora
+MARCA_SONDA = '@@WG-SONDA '
+
+# Máximo de archivos listados por categoría en la verificación del core
+MAX_ARCHIVOS_CORE = 50
+
+SONDA_PHP = r"""<?php
+// Sonda de diagnóstico de WebGenesis: un solo arranque de WordPress y
+// salida JSON
+
+function webgenesis_sonda_core()
+{
+    global $wp_version, $wp_local_package;
+    require_once ABSPATH . 'wp-admin/includes/update.php';
+    $locale = isset($wp_local_package) ? $wp_local_package : 'en_US';
+    $sumas = get_core_checksums($wp_version, $locale);
+    if (!is_array($sumas) && $locale !== 'en_US') {
+        $sumas = get_core_checksums($wp_version, 'en_US');
+    }
+    if (!is_array($sumas)) {
+        return array(
+            'ok' => true, 'disponible' => false, 'version' => $wp_version
+        );
+    }
+    $modificados = array();
+    $faltantes = array();
+    $verificados = 0;
+    foreach ($sumas as $archivo => $suma) {
+        // Igual que `wp core verify-checksums`: los plugins y temas
+        // incluidos no cuentan
+        if (strpos($archivo, 'wp-content/plugins/') === 0
+            || strpos($archivo, 'wp-content/themes/') === 0) {
+            continue;
+        }
+        $ruta = ABSPATH . $archivo;
+        if (!file_exists($ruta)) {
+            $faltantes[] = $archivo;
+        } elseif (md5_file($ruta) !== $suma) {
+            $modificados[] = $archivo;
+        }
+        $verificados++;
+    }
+    $extra = array();
+    foreach (array('wp-admin', 'wp-includes') as $directorio) {
+        $iterador = new RecursiveIteratorIterator(
+            new RecursiveDirectoryIterator(
+                ABSPATH . $directorio, FilesystemIterator::SKIP_DOTS
+            )
+        );
+        foreach ($iterador as $info) {
+            $relativa = substr($info->getPathname(), strlen(ABSPATH));
+            $clave = str_replace('\\', '/', $relativa);
+            if ($info->isFile() && !isset($sumas[$clave])) {
+                $extra[] = $relativa;
+            }
+        }
+    }
+    sort($extra);
+    return array(
+        'ok' => !$modificados && !$faltantes,
+        'disponible' => true,
+        'version' => $wp_version,
+        'locale' => $locale,
+        'verificados' => $verificados,
+        'modificados' => $modificados,
+        'faltantes' => $faltantes,
+        'extra' => $extra
+    );
+}
+
+function webgenesis_sonda_db()
+{
+    global $wpdb;
+    $tablas = $wpdb->get_col($wpdb->prepare(
+        'SHOW TABLES LIKE %s', $wpdb->esc_like($wpdb->base_prefix) . '%'
+    ));
+    if ($wpdb->last_error) {
+        return array('ok' => false, 'mensaje' => $wpdb->last_error);
+    }
+    $problemas = array();
+    if ($tablas) {
+        $filas = $wpdb->get_results(
+            'CHECK TABLE `' . implode('`, `', $tablas) . '`', ARRAY_A
+        );
+        foreach ((array) $filas as $fila) {
+            // Las filas 'note' (motor sin soporte de CHECK) no son errores
+            if ($fila['Msg_type'] === 'error'
+                || ($fila['Msg_type'] === 'status'
+                    && $fila['Msg_text'] !== 'OK')) {
+                $problemas[] = $fila['Table'] . ': ' . $fila['Msg_text'];
+            }
+        }
+    }
+    return array(
+        'ok' => !$problemas,
+        'tablas' => count($tablas),
+        'problemas' => $problemas
+    );
+}
+
+function webgenesis_sonda_plugins()
+{
+    require_once ABSPATH . 'wp-admin/includes/plugin.php';
+    $actualizaciones = get_site_transient('update_plugins');
+    $plugins = array();
+    foreach (get_plugins() as $archivo => $datos) {
+        if (is_plugin_active_for_network($archivo)) {
+            $estado = 'active-network';
+        } elseif (is_plugin_active($archivo)) {
+            $estado = 'active';
+        } else {
+            $estado = 'inactive';
+        }
+        $plugins[] = array(
+            'file' => $archivo,
+            'title' => $datos['Name'],
+            'version' => $datos['Version'],
+            'status' => $estado,
+            'update' => isset($actualizaciones->response[$archivo])
+                ? $actualizaciones->response[$archivo]->new_version : null
+        );
+    }
+    foreach (get_mu_plugins() as $archivo => $datos) {
+        $plugins[] = array(
+            'file' => $archivo,
+            'title' => $datos['Name'],
+            'version' => $datos['Version'],
+            'status' => 'must-use',
+            'update' => null
+        );
+    }
+    return array('ok' => true, 'plugins' => $plugins);
+}
+
+function webgenesis_sonda_temas()
+{
+    $actualizaciones = get_site_transient('update_themes');
+    $activo = get_stylesheet();
+    $padre = get_template();
+    $temas = array();
+    foreach (wp_get_themes() as $slug => $tema) {
+        if ($slug === $activo) {
+            $estado = 'active';
+        } elseif ($slug === $padre) {
+            $estado = 'parent';
+        } else {
+            $estado = 'inactive';
+        }
+        $temas[] = array(
+            'name' => $slug,
+            'title' => $tema->get('Name'),
+            'version' => $tema->get('Version'),
+            'status' => $estado,
+            'update' => isset($actualizaciones->response[$slug])
+                ? $actualizaciones->response[$slug]['new_version'] : null
+        );
+    }
+    return array(
+        'ok' => true, 'activo' => $activo, 'padre' => $padre, 'temas' => $temas
+    );
+}
+
+function webgenesis_sonda_updates()
+{
+    require_once ABSPATH . 'wp-admin/includes/update.php';
+    wp_version_check();
+    $versiones = array();
+    foreach ((array) get_core_updates() as $actualizacion) {
+        if (is_object($actualizacion)
+            && $actualizacion->response === 'upgrade') {
+            $versiones[] = $actualizacion->current;
+        }
+    }
+    return array(
+        'ok' => true, 'versiones' => array_values(array_unique($versiones))
+    );
+}
+
+$webgenesis_sonda = array(
+    'entorno' => array(
+        'wp' => $GLOBALS['wp_version'],
+        'php' => PHP_VERSION,
+        'multisitio' => is_multisite()
+    ),
+    'permisos' => array(
+        'ok' => true, 'escribible' => (bool) wp_is_writable(ABSPATH)
+    ),
+    // Desde WP-CLI is_ssl() siempre es falso; se informa también del
+    // esquema de la URL del sitio
+    'ssl' => array(
+        'ok' => true,
+        'is_ssl' => is_ssl(),
+        'https' => strpos(home_url(), 'https://') === 0
+    )
+);
+$webgenesis_nombres = array('core', 'db', 'plugins', 'temas', 'updates');
+if (isset($args) && in_array('sin-core', (array) $args, true)) {
+    // El core ya se verificó con los checksums en caché, sin pasar por PHP
+    $webgenesis_nombres = array_diff($webgenesis_nombres, array('core'));
+}
+foreach ($webgenesis_nombres as $webgenesis_nombre) {
+    try {
+        $webgenesis_sonda[$webgenesis_nombre] = call_user_func(
+            'webgenesis_sonda_' . $webgenesis_nombre
+        );
+    } catch (Exception $e) {
+        $webgenesis_sonda[$webgenesis_nombre] = array(
+            'ok' => false, 'mensaje' => $e->getMessage()
+        );
+    } catch (Throwable $e) {
+        $webgenesis_sonda[$webgenesis_nombre] = array(
+            'ok' => false, 'mensaje' => $e->getMessage()
+        );
+    }
+}
+echo "\n@@WG-SONDA " . json_encode($webgenesis_sonda) . "\n";
+"""
+
+
+def parsear_sonda(salida: str) -> Optional[Dict]:
+    """
+    Extrae el JSON de la sonda de la salida de `wp eval-file`, o None si no
+    está.
+    """
+    for linea in reversed(salida.splitlines()):
+        if linea.startswith(MARCA_SONDA):
+            try:
+                return json.loads(linea[len(MARCA_SONDA):])
+            except ValueError:
+                return None
+    return None
+
+
+def _lista(elementos, limite: int = MAX_ARCHIVOS_CORE) -> str:
+    texto = ', '.join(elementos[:limite])
+    if len(elementos) > limite:
+        texto += f" (y {len(elementos) - limite} más)"
+    return texto
+
+
+def _texto_componentes(componentes) -> str:
+    """Una línea por plugin o tema, como `wp plugin status`"""
+    return '\n'.join(
+        f"{c['status']:<14} {c.get('file') or c['name']} {c['version']}"
+        + (f" (actualización {c['update']})" if c.get('update') else '')
+        for c in componentes
+    )
+
+
+def _incorporar(diagnosticos: Dict, nombre: str, parte: Dict):
+    """
+    Añade a los errores, advertencias e info el resultado de una
+    comprobación de la sonda.
+    """
+    if not parte['ok'] and 'mensaje' in parte:
+        diagnosticos['errores'].append(
+            {'componente': nombre, 'mensaje': parte['mensaje']}
+        )
+        return
+
+    if nombre == 'core':
+        if not parte['disponible']:
+            diagnosticos['advertencias'].append(
+                "No se pudieron obtener los checksums de WordPress "
+                f"{parte['version']}"
+            )
+            return
+        if parte['modificados']:
+            diagnosticos['errores'].append({
+                'componente': nombre,
+                'mensaje': "Archivos del core modificados: "
+                           f"{_lista(parte['modificados'])}"
+            })
+        if parte['faltantes']:
+            diagnosticos['errores'].append({
+                'componente': nombre,
+                'mensaje': "Archivos del core faltantes: "
+                           f"{_lista(parte['faltantes'])}"
+            })
+        if parte['extra']:
+            diagnosticos['advertencias'].append(
+                "Archivos ajenos al core en wp-admin/wp-includes: "
+                f"{_lista(parte['extra'])}"
+            )
+        if parte['ok']:
+            diagnosticos['info'][nombre] = (
+                f"WordPress {parte['version']} ({parte['locale']}): "
+                f"{parte['verificados']} archivos verificados"
+            )
+    elif nombre == 'db':
+        if parte['problemas']:
+            diagnosticos['errores'].append({
+                'componente': nombre,
+                'mensaje': '\n'.join(parte['problemas'])
+            })
+        else:
+            diagnosticos['info'][nombre] = (
+                f"{parte['tablas']} tablas sin errores"
+            )
+    elif nombre == 'plugins':
+        diagnosticos['info'][nombre] = _texto_componentes(parte['plugins'])
+    elif nombre == 'temas':
+        diagnosticos['info'][nombre] = _texto_componentes(parte['temas'])
+    elif nombre == 'permisos':
+        diagnosticos['info'][nombre] = (
+            'Escritura OK' if parte['escribible'] else 'Sin escritura'
+        )
+        if not parte['escribible']:
+            diagnosticos['advertencias'].append(
+                "ABSPATH no tiene permisos de escritura"
+            )
+    elif nombre == 'updates':
+        diagnosticos['info'][nombre] = (
+            f"Actualizaciones disponibles: {', '.join(parte['versiones'])}"
+            if parte['versiones'] else "WordPress está actualizado"
+        )
+    elif nombre == 'ssl':
+        diagnosticos['info'][nombre] = (
+            'SSL activo' if parte['is_ssl'] or parte['https'] else 'Sin SSL'
+        )
+
+
+def diagnostico_desde_sonda(datos: Dict) -> Dict:
+    """
+    Convierte la respuesta de la sonda en el formato de
+    ejecutar_diagnostico_completo.
+    """
+    diagnosticos = {
+        'estado': 'pendiente', 'errores': [], 'advertencias': [], 'info': {}
+    }
+    for nombre, _ in CHECKS_DIAGNOSTICO:
+        parte = datos.get(nombre) or {
+            'ok': False,
+            'mensaje': 'La sonda no devolvió esta comprobación'
+        }
+        _incorporar(diagnosticos, nombre, parte)
+    diagnosticos['estado'] = 'error' if diagnosticos['errores'] else 'ok'
+    diagnosticos['sonda'] = datos
+    return diagnosticos
+
+
+def diagnostico_por_comandos(transporte, core: Optional[Dict] = None) -> Dict:
+    """
+    Diagnóstico con un comando WP-CLI por comprobación (un arranque de
+    WordPress cada uno).
+
+    Si se pasa la verificación nativa del core no se ejecuta
+    `wp core verify-checksums`.
+    """
+    diagnosticos = {
+        'estado': 'pendiente', 'errores': [], 'advertencias': [], 'info': {}
+    }
+    comandos = dict(CHECKS_DIAGNOSTICO)
+    if core is not None:
+        del comandos['core']
+        _incorporar(diagnosticos, 'core', core)
+    resultados = transporte.ejecutar_lote(comandos)
+    for nombre, (success, output) in resultados.items():
+        if success:
+            diagnosticos['info'][nombre] = output.strip()
+        else:
+            diagnosticos['errores'].append(
+                {'componente': nombre, 'mensaje': output.strip()}
+            )
+    diagnosticos['estado'] = 'error' if diagnosticos['errores'] else 'ok'
+    return diagnosticos
+
+
+def diagnosticar(transporte, sonda: bool = True) -> Dict:
+    """
+    Ejecuta el diagnóstico completo sobre un transporte.
+
+    Con sonda=True todas las comprobaciones se resuelven en un solo
+    `wp eval-file`; si la sonda falla se repiten con los comandos WP-CLI.
+    El resultado indica en 'modo' cuál de los dos caminos se usó.
+
+    Si el transporte verifica el core por sí mismo (instalación local) la
+    sonda no hashea los archivos del core y se usa ese resultado.
+    """
+    core = transporte.verificar_core()
+    if sonda:
+        argumentos = list(ARGUMENTOS_SONDA)
+        if core is not None:
+            argumentos.append(ARGUMENTO_SIN_CORE)
+        success, output = transporte.evaluar_php(SONDA_PHP, argumentos)
+        datos = parsear_sonda(output) if success else None
+        if datos is not None:
+            if core is not None:
+                datos['core'] = core
+            diagnosticos = diagnostico_desde_sonda(datos)
+            diagnosticos['modo'] = 'sonda'
+            return diagnosticos
+        logging.warning(
+            "Sonda de diagnóstico no disponible, se usan comandos WP-CLI: "
+            f"{output.strip()[:500]}"
+        )
+    diagnosticos = diagnostico_por_comandos(transporte, core)
+    diagnosticos['modo'] = 'comandos'
+    return diagnosticos
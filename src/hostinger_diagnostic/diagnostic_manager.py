@@ -4,11 +4,20 @@ Gestiona la ejecución de diagnósticos y generación de reportes.
 """
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from ..utils.ui_helper import UIHelper
-from .hostinger_connector import HostingerConnector
+from .theme_analyzer import ThemeAnalyzer
+from .transport import LocalTransport, Transport
+
+# La pila remota (paramiko, cryptography, asyncio, asyncssh) se importa al
+# usarla por primera vez: el trabajo solo local arranca rápido y no necesita
+# paramiko
+if TYPE_CHECKING:
+    from .async_connector import LimitesAsync
+    from .ssh_pool import SSHConnectionPool
 
 @dataclass
 class DiagnosticConfig:
@@ -18,13 +27,30 @@ class DiagnosticConfig:
     host: Optional[str] = None
     usuario: Optional[str] = None
     password: Optional[str] = None
+    ruta_remota: Optional[str] = None
+    puerto: int = 22
 
 class HostingerDiagnosticManager:
-    def __init__(self, ui: UIHelper):
+    def __init__(
+        self, ui: UIHelper, pool: Optional['SSHConnectionPool'] = None
+    ):
         self.ui = ui
         self.config = None
+        self.remote = None
+        self._pool = pool
         logging.info("Inicializando HostingerDiagnosticManager")
 
+    @property
+    def pool(self) -> 'SSHConnectionPool':
+        """
+        Pool de conexiones SSH; se crea (e importa paramiko) al primer uso
+        remoto.
+        """
+        if self._pool is None:
+            from .ssh_pool import pool_compartido
+            self._pool = pool_compartido()
+        return self._pool
+
     def run_diagnostics(self) -> Tuple[bool, Dict]:
         """Punto de entrada principal para ejecutar diagnósticos"""
         logging.info("Iniciando diagnóstico de WordPress")
@@ -32,17 +58,61 @@ class HostingerDiagnosticManager:
             if not self.config:
                 self.config = self._solicitar_configuracion()
 
-            resultados = {
-                'estado': 'pendiente',
-                'timestamp': None,
-                'errores': [],
-                'recomendaciones': []
-            }
-
-            # TODO: Implementar lógica de diagnóstico
             self.ui.print_step("Ejecutando diagnóstico...")
-            
-            return True, resultados
+            return self.ejecutar_diagnostico_completo()
+
+        except Exception as e:
+            logging.error(f"Error en diagnóstico: {str(e)}")
+            return False, {'estado': 'error', 'mensaje': str(e)}
+
+    def transporte(self) -> Transport:
+        """
+        Transporte de la instalación configurada; en remoto abre la conexión
+        SSH si hace falta.
+        """
+        if self.config.modo != 'remoto':
+            return LocalTransport(self.config.ruta_local, self.ui)
+        if self.remote is None:
+            from .hostinger_connector import HostingerConnector
+            self.remote = HostingerConnector(self.config, self.ui, self.pool)
+        if not self.remote.is_connected and not self.remote.test_connection():
+            raise ConnectionError(f"No se pudo conectar a {self.config.host}")
+        return self.remote.transporte()
+
+    def ejecutar_diagnostico_completo(self) -> Tuple[bool, Dict]:
+        """
+        Diagnóstico de WordPress y del tema activo de la instalación
+        configurada.
+
+        Local y remoto usan el mismo código a través del transporte: en
+        remoto WP-CLI se ejecuta por la conexión SSH y los archivos se
+        analizan sobre el espejo local de plugins y temas. Los reportes se
+        escriben en la instalación local o, en remoto, en el directorio actual.
+        """
+        try:
+            transporte = self.transporte()
+            if self.config.modo == 'remoto':
+                ruta_reportes = Path.cwd()
+            else:
+                ruta_reportes = self.config.ruta_local
+            # Importado aquí: wp_manager importa módulos de este paquete
+            from ..wordpress.wp_manager import WordPressManager
+            success, diagnostico = WordPressManager(
+                self.ui, ruta_reportes, transporte
+            ).ejecutar_diagnostico_completo()
+            if not success:
+                return False, diagnostico
+
+            tema = ThemeAnalyzer(self.ui).analizar(transporte)
+            diagnostico['tema'] = tema
+            diagnostico['errores'].extend(
+                {'componente': 'tema', 'mensaje': error}
+                for error in tema.get('errores', [])
+            )
+            diagnostico['advertencias'].extend(tema.get('advertencias', []))
+            if diagnostico['errores']:
+                diagnostico['estado'] = 'error'
+            return True, diagnostico
 
         except Exception as e:
             logging.error(f"Error en diagnóstico: {str(e)}")
@@ -60,7 +130,11 @@ class HostingerDiagnosticManager:
                     modo='remoto',
                     host=input("Host: ").strip(),
                     usuario=input("Usuario: ").strip(),
-                    password=input("Contraseña: ").strip()
+                    password=input("Contraseña: ").strip(),
+                    ruta_remota=(
+                        input("Ruta remota de WordPress: ").strip()
+                        or 'public_html'
+                    )
                 )
         except Exception as e:
             logging.error(f"Error al solicitar configuración: {str(e)}")
@@ -80,9 +154,16 @@ class HostingerDiagnosticManager:
                     modo='remoto',
                     host=input("Host Hostinger: ").strip(),
                     usuario=input("Usuario: ").strip(),
-                    password=input("Contraseña: ").strip()
+                    password=input("Contraseña: ").strip(),
+                    ruta_remota=(
+                        input("Ruta remota de WordPress: ").strip()
+                        or 'public_html'
+                    )
+                )
+                from .hostinger_connector import HostingerConnector
+                self.remote = HostingerConnector(
+                    self.config, self.ui, self.pool
                 )
-                self.remote = HostingerConnector(self.config, self.ui)
                 return self.remote.test_connection()
             else:
                 self.ui.print_error("Modo no válido")
@@ -92,6 +173,102 @@ class HostingerDiagnosticManager:
             self.ui.print_error(f"Error en configuración: {str(e)}")
             return False
 
+    def diagnosticar_flota(
+        self, sitios: List[DiagnosticConfig], max_workers: int = 4
+    ) -> Dict:
+        """
+        Ejecuta las comprobaciones remotas básicas en varios sitios.
+
+        Los sitios que comparten servidor y usuario reutilizan las conexiones
+        del pool en lugar de repetir el handshake SSH.
+        """
+        from .hostinger_connector import HostingerConnector
+
+        def _diagnosticar(config: DiagnosticConfig) -> Dict:
+            conector = HostingerConnector(config, self.ui, self.pool)
+            try:
+                if not conector.test_connection():
+                    return {
+                        'sitio': config.host,
+                        'estado': 'error',
+                        'mensaje': 'Sin conexión'
+                    }
+                return {
+                    'sitio': f"{config.host}:{config.ruta_remota}",
+                    'estado': 'ok',
+                    'permisos': conector.verificar_permisos(),
+                    'tema': conector.obtener_info_tema()
+                }
+            except Exception as e:
+                logging.error(f"Error al diagnosticar {config.host}: {str(e)}")
+                return {
+                    'sitio': config.host, 'estado': 'error', 'mensaje': str(e)
+                }
+            finally:
+                conector.cerrar_conexion()
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            resultados = list(executor.map(_diagnosticar, sitios))
+        return {'sitios': resultados, 'pool': self.pool.metricas()}
+
+    def diagnosticar_flota_asincrona(
+        self,
+        sitios: List[DiagnosticConfig],
+        limites: Optional['LimitesAsync'] = None
+    ) -> Dict:
+        """
+        Igual que diagnosticar_flota pero con el motor asíncrono (asyncssh),
+        pensado para cientos de servidores: un solo hilo, conexiones limitadas
+        en total y por host, y reintentos con espera aleatoria.
+        """
+        import asyncio
+        return asyncio.run(self._diagnosticar_flota_asincrona(sitios, limites))
+
+    async def _diagnosticar_flota_asincrona(
+        self,
+        sitios: List[DiagnosticConfig],
+        limites: Optional['LimitesAsync']
+    ) -> Dict:
+        import asyncio
+        from .async_connector import AsyncHostingerConnector, AsyncSSHEngine
+
+        motor = AsyncSSHEngine(limites)
+
+        async def _diagnosticar(config: DiagnosticConfig) -> Dict:
+            conector = AsyncHostingerConnector(config, self.ui, motor)
+            try:
+                if not await conector.test_connection():
+                    return {
+                        'sitio': config.host,
+                        'estado': 'error',
+                        'mensaje': 'Sin conexión'
+                    }
+                permisos, tema = await asyncio.gather(
+                    conector.verificar_permisos(),
+                    conector.obtener_info_tema()
+                )
+                return {
+                    'sitio': f"{config.host}:{config.ruta_remota}",
+                    'estado': 'ok',
+                    'permisos': permisos,
+                    'tema': tema
+                }
+            except Exception as e:
+                logging.error(f"Error al diagnosticar {config.host}: {str(e)}")
+                return {
+                    'sitio': config.host, 'estado': 'error', 'mensaje': str(e)
+                }
+            finally:
+                await conector.cerrar_conexion()
+
+        try:
+            resultados = await asyncio.gather(
+                *(_diagnosticar(config) for config in sitios)
+            )
+        finally:
+            await motor.cerrar_todo()
+        return {'sitios': list(resultados), 'motor': motor.metricas()}
+
 if __name__ == "__main__":
     # Configurar logging
     logging.basicConfig(
@@ -0,0 +1,50 @@
+"""
+Lectura de cabeceras de archivos de WordPress (style.css, archivos principales
+de plugins), equivalente a get_file_data() de WordPress.
+"""
+
+import re
+from pathlib import Path
+from typing import Dict
+
+# WordPress solo lee los primeros 8 KB de cada archivo para buscar cabeceras
+BYTES_CABECERA = 8192
+
+
+def leer_cabeceras(
+    ruta: Path, campos: Dict[str, str], max_bytes: int = BYTES_CABECERA
+) -> Dict[str, str]:
+    """
+    Lee las cabeceras de un archivo.
+
+    Args:
+        ruta: Archivo a leer
+        campos: Mapa de clave interna a nombre de cabecera
+            (p. ej. 'version': 'Version')
+        max_bytes: Bytes iniciales del archivo que se examinan
+
+    Returns:
+        Diccionario con las claves de ``campos`` y el valor encontrado o ''
+    """
+    with open(ruta, 'rb') as f:
+        bloque = f.read(max_bytes)
+    return extraer_cabeceras(bloque.decode('utf-8', errors='ignore'), campos)
+
+
+def extraer_cabeceras(texto: str, campos: Dict[str, str]) -> Dict[str, str]:
+    """Extrae las cabeceras de un bloque de texto ya leído"""
+    texto = texto.replace('\r', '\n')
+    resultado = {}
+    for clave, cabecera in campos.items():
+        match = re.search(
+            r'^(?:[ \t]*<\?php)?[ \t/*#@]*' + re.escape(cabecera) + r':(.*)$',
+            texto,
+            re.IGNORECASE | re.MULTILINE
+        )
+        resultado[clave] = _limpiar_valor(match.group(1)) if match else ''
+    return resultado
+
+
+def _limpiar_valor(valor: str) -> str:
+    """Quita cierres de comentario y etiquetas PHP del valor de una cabecera"""
+    return re.sub(r'\s*(?:\*/|\?>).*', '', valor).strip()
@@ -0,0 +1,284 @@
+"""
+Inventario estático de registros add_action/add_filter en el tema y los
+plugins activos, con marcado de los hooks que se ejecutan en cada petición.
+"""
+
+import logging
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from ..utils.ui_helper import UIHelper
+from .active_sources import origenes_activos
+from .php_scanner import eliminar_comentarios
+from .scan_scope import ScanScope
+from .transport import Transport
+
+# Hooks que se disparan en cada petición o varias veces por página
+HOOKS_CALIENTES = {
+    'muplugins_loaded': 'cada petición',
+    'plugins_loaded': 'cada petición',
+    'setup_theme': 'cada petición',
+    'after_setup_theme': 'cada petición',
+    'init': 'cada petición',
+    'wp_loaded': 'cada petición',
+    'parse_request': 'cada petición',
+    'wp': 'cada petición',
+    'template_redirect': 'cada petición',
+    'wp_enqueue_scripts': 'cada página',
+    'wp_head': 'cada página',
+    'wp_footer': 'cada página',
+    'shutdown': 'cada petición',
+    'admin_init': 'cada petición de administración y admin-ajax',
+    'pre_get_posts': 'cada consulta',
+    'posts_results': 'cada consulta',
+    'the_posts': 'cada consulta',
+    'query': 'cada consulta SQL',
+    'the_content': 'cada entrada mostrada',
+    'the_title': 'cada título mostrado',
+    'the_excerpt': 'cada extracto mostrado',
+    'post_link': 'cada enlace generado',
+    'gettext': 'cada cadena traducida',
+    'all': 'cada hook',
+}
+
+_REGISTRO = re.compile(rb"\b(add_action|add_filter)\s*\(")
+_DELIMITADOR = re.compile(rb"[\"'()\[\]{},]")
+_LITERAL = re.compile(
+    rb"""^(?:'((?:[^'\\]|\\.)*)'|"((?:[^"\\]|\\.)*)")$""", re.DOTALL
+)
+_CALLBACK_ARRAY = re.compile(
+    rb"""^(?:array\s*\(|\[)\s*"""
+    rb"""(\$this|__CLASS__|static::class|self::class|[\w\\]+::class"""
+    rb"""|'[^']*'|"[^"]*")"""
+    rb"""\s*,\s*(?:'([^']*)'|"([^"]*)")\s*(?:\)|\])$"""
+)
+
+
+def _literal(expresion: bytes) -> Optional[str]:
+    """Devuelve el valor de un literal de cadena, o None si no lo es"""
+    match = _LITERAL.match(expresion)
+    if not match:
+        return None
+    valor = match.group(1) if match.group(1) is not None else match.group(2)
+    return valor.decode('utf-8', errors='ignore')
+
+
+def _argumentos(codigo: bytes, inicio: int) -> List[bytes]:
+    """Divide en argumentos de primer nivel una llamada que empieza tras '('"""
+    argumentos, desde, profundidad, posicion = [], inicio, 0, inicio
+    while True:
+        match = _DELIMITADOR.search(codigo, posicion)
+        if not match:
+            return argumentos
+        caracter, posicion = match.group(), match.end()
+        if caracter in (b'"', b"'"):
+            while True:
+                cierre = codigo.find(caracter, posicion)
+                if cierre < 0:
+                    return argumentos
+                tramo = codigo[posicion:cierre]
+                barras = len(tramo) - len(tramo.rstrip(b'\\'))
+                posicion = cierre + 1
+                if barras % 2 == 0:
+                    break
+        elif caracter in b'([{':
+            profundidad += 1
+        elif caracter in b')]}':
+            if profundidad == 0:
+                argumentos.append(codigo[desde:match.start()].strip())
+                return argumentos
+            profundidad -= 1
+        elif profundidad == 0:
+            argumentos.append(codigo[desde:match.start()].strip())
+            desde = posicion
+
+
+def _describir_callback(expresion: bytes) -> str:
+    """Normaliza la expresión de un callback"""
+    literal = _literal(expresion)
+    if literal is not None:
+        return literal
+    if re.match(rb"^(?:static\s+)?function\b", expresion):
+        return 'closure'
+    if re.match(rb"^(?:static\s+)?fn\b", expresion):
+        return 'closure (fn)'
+    match = _CALLBACK_ARRAY.match(expresion)
+    if match:
+        objeto = match.group(1).decode('utf-8', errors='ignore').strip('\'"')
+        metodo = match.group(2) or match.group(3)
+        metodo = metodo.decode('utf-8', errors='ignore')
+        if objeto == '$this':
+            return f"{objeto}->{metodo}"
+        return f"{objeto}::{metodo}"
+    texto = b' '.join(expresion.split()).decode('utf-8', errors='ignore')
+    return texto if len(texto) <= 60 else texto[:57] + '...'
+
+
+def extraer_registros(contenido: bytes) -> List[Dict]:
+    """Extrae los registros add_action/add_filter de un archivo PHP"""
+    codigo = eliminar_comentarios(contenido)
+    registros, linea, posicion = [], 1, 0
+    for match in _REGISTRO.finditer(codigo):
+        # Métodos homónimos ($obj->add_action, Clase::add_filter) o su propia
+        # declaración
+        previo = codigo[max(0, match.start() - 32):match.start()].rstrip()
+        if (
+            previo.endswith((b'->', b'::'))
+            or re.search(rb'\bfunction\s*&?$', previo)
+        ):
+            continue
+        argumentos = _argumentos(codigo, match.end())
+        if len(argumentos) < 2:
+            continue
+
+        linea += codigo.count(b'\n', posicion, match.start())
+        posicion = match.start()
+        hook = _literal(argumentos[0])
+        dinamico = hook is None
+        if dinamico:
+            hook = argumentos[0].decode('utf-8', errors='ignore')
+        prioridad = '10'
+        if len(argumentos) > 2:
+            prioridad = argumentos[2].decode('utf-8', errors='ignore')
+        if re.fullmatch(r'-?\d+', prioridad):
+            prioridad = int(prioridad)
+        registros.append({
+            'tipo': match.group(1).decode('ascii'),
+            'hook': hook,
+            'dinamico': dinamico,
+            'callback': _describir_callback(argumentos[1]),
+            'prioridad': prioridad,
+            'linea': linea
+        })
+    return registros
+
+
+def _inventariar_origen(
+    origen: str, raiz: str, alcance: ScanScope
+) -> Tuple[str, List[Dict], Dict]:
+    """
+    Recorre un tema o plugin y devuelve sus registros (se ejecuta en un
+    proceso aparte).
+    """
+    registros = []
+    recorrido = alcance.recorrer(Path(raiz))
+    for archivo, _ in recorrido:
+        try:
+            contenido = archivo.read_bytes()
+        except OSError as e:
+            logging.warning(f"No se pudo leer {archivo}: {str(e)}")
+            continue
+        relativo = archivo.relative_to(raiz).as_posix()
+        for registro in extraer_registros(contenido):
+            registros.append(
+                {'origen': origen, 'archivo': relativo, **registro}
+            )
+    return origen, registros, recorrido.resumen()
+
+
+class HookInventory:
+    """Inventario de hooks registrados por el tema y los plugins activos"""
+
+    def __init__(
+        self,
+        ui: UIHelper,
+        alcance: Optional[ScanScope] = None,
+        max_workers: Optional[int] = None
+    ):
+        self.ui = ui
+        self.alcance = alcance or ScanScope()
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+    def inventariar(
+        self,
+        ruta: Path,
+        temas: List[str],
+        plugins: Optional[List[str]] = None,
+        transporte: Optional[Transport] = None
+    ) -> Dict:
+        """
+        Inventaria los hooks de una instalación; un proceso por tema o plugin.
+
+        Si no se indican los plugins activos se consultan con WP-CLI a
+        través de transporte (por defecto, en local).
+        """
+        self.ui.print_step("Inventariando registros de hooks...")
+        advertencias = []
+        origenes = origenes_activos(
+            ruta, temas, plugins, advertencias, transporte
+        )
+        trabajos = [
+            (origen, str(raiz), self.alcance)
+            for origen, raiz in origenes.items()
+        ]
+
+        parciales = []
+        try:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                if trabajos:
+                    parciales = list(
+                        executor.map(_inventariar_origen, *zip(*trabajos))
+                    )
+        except (OSError, BrokenProcessPool) as e:
+            logging.warning(f"Inventario de hooks sin paralelismo: {str(e)}")
+            parciales = [_inventariar_origen(*trabajo) for trabajo in trabajos]
+
+        registros = [
+            registro for _, lista, _ in parciales for registro in lista
+        ]
+        por_hook = self._tabla_por_hook(registros)
+        return {
+            'registros': registros,
+            'por_hook': por_hook,
+            'calientes': [fila for fila in por_hook if fila['caliente']],
+            'por_origen': {
+                origen: len(lista) for origen, lista, _ in parciales
+            },
+            'alcance': {origen: resumen for origen, _, resumen in parciales},
+            'advertencias': advertencias
+        }
+
+    def _tabla_por_hook(self, registros: List[Dict]) -> List[Dict]:
+        """Agrupa los registros por hook, con los hooks calientes primero"""
+        tabla: Dict[str, Dict] = {}
+        for registro in registros:
+            fila = tabla.setdefault(registro['hook'], {
+                'hook': registro['hook'],
+                'registros': 0,
+                'origenes': [],
+                'caliente': registro['hook'] in HOOKS_CALIENTES,
+                'frecuencia': HOOKS_CALIENTES.get(registro['hook']),
+                'callbacks': []
+            })
+            fila['registros'] += 1
+            if registro['origen'] not in fila['origenes']:
+                fila['origenes'].append(registro['origen'])
+            fila['callbacks'].append({
+                'origen': registro['origen'],
+                'callback': registro['callback'],
+                'prioridad': registro['prioridad'],
+                'ubicacion': f"{registro['archivo']}:{registro['linea']}"
+            })
+        return sorted(
+            tabla.values(),
+            key=lambda f: (not f['caliente'], -f['registros'], f['hook'])
+        )
+
+
+def formatear_tabla_hooks(por_hook: List[Dict], limite: int = 50) -> List[str]:
+    """Formatea la tabla por hook como líneas Markdown para el reporte"""
+    lineas = [
+        "| Hook | Registros | Orígenes | Frecuencia |",
+        "|------|-----------|----------|------------|",
+    ]
+    for fila in por_hook[:limite]:
+        frecuencia = f"⚠ {fila['frecuencia']}" if fila['caliente'] else '-'
+        lineas.append(
+            f"| `{fila['hook']}` | {fila['registros']} | "
+            f"{', '.join(fila['origenes'])} | {frecuencia} |"
+        )
+    return lineas
@@ -4,12 +4,29 @@ Maneja conexiones SSH y operaciones remotas.
 """
 
 import logging
+import shlex
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Tuple, List, Optional
+from typing import Dict, Iterable, Iterator, Tuple, List, Optional
 from dataclasses import dataclass
 import json
 from ..utils.ui_helper import UIHelper
 from ..utils.command_runner import CommandRunner
+from .log_analyzer import LogAnalyzer
+from .remote_batch import parsear_lote, script_lote
+from .remote_logs import ARCHIVOS_LOG, IncrementalLogFetcher, ruta_log_remota
+from .remote_mirror import RemoteMirror
+from .remote_transfer import (
+    FlujoComprimido,
+    acumular_estadisticas,
+    codecs_locales,
+    comando_comprimido,
+    leer_canal
+)
+from .ssh_pool import SSHConnectionPool, pool_compartido
+from .transport import SSHTransport
+from .diagnostic_checks import diagnosticar
 
 try:
     import paramiko
@@ -19,68 +36,405 @@ except ImportError:
         "Instálelo con: pip install paramiko"
     )
 
+# Por debajo del MaxSessions por defecto de OpenSSH (10)
+MAX_CANALES = 8
+
+# Primera línea del manifiesto remoto, emitida tras entrar en el directorio
+MARCA_LISTADO = '@@WG listado'
+
 class HostingerConnector:
-    def __init__(self, config: Dict, ui: UIHelper):
+    def __init__(
+        self,
+        config: Dict,
+        ui: UIHelper,
+        pool: Optional[SSHConnectionPool] = None,
+        compresion: str = 'auto',
+        nivel_compresion: Optional[int] = None
+    ):
         self.config = config
         self.ui = ui
-        self.ssh = paramiko.SSHClient()
-        self.ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        # Las conexiones se toman prestadas del pool y se devuelven al cerrar
+        self.pool = pool or pool_compartido()
+        self.ssh = None
         self.sftp = None
         self.is_connected = False
+        # 'auto' elige zstd o gzip según lo disponible; 'ninguno' desactiva la
+        # compresión
+        self.compresion = compresion
+        self.nivel_compresion = nivel_compresion
+        self._codec: Optional[str] = None
+        self._codec_detectado = False
+        self.transferencias: Dict[str, Dict] = {}
+        self._transporte: Optional[SSHTransport] = None
 
     def test_connection(self) -> bool:
         """Prueba la conexión SSH al servidor"""
         try:
             self.ui.print_step("Conectando a servidor Hostinger...")
-            self.ssh.connect(
-                hostname=self.config.host,
-                username=self.config.usuario,
-                password=self.config.password,
-                timeout=10
-            )
+            if self.ssh is None:
+                self.ssh = self.pool.obtener(
+                    self.config.host,
+                    self.config.usuario,
+                    self.config.password,
+                    getattr(self.config, 'puerto', 22)
+                )
             self.sftp = self.ssh.open_sftp()
             self.is_connected = True
             self.ui.print_success("Conexión establecida con Hostinger")
             return True
 
         except Exception as e:
+            self.cerrar_conexion(descartar=True)
             self.ui.print_error(f"Error de conexión: {str(e)}")
             logging.error(f"Error al conectar con Hostinger: {str(e)}")
             return False
 
+    def transporte(self) -> SSHTransport:
+        """
+        Transporte SSH de esta conexión, para los analizadores comunes a
+        local y remoto.
+        """
+        if self._transporte is None:
+            self._transporte = SSHTransport(self)
+        return self._transporte
+
     def ejecutar_comando(self, comando: str) -> Tuple[bool, str]:
         """Ejecuta un comando en el servidor remoto"""
         try:
             if not self.is_connected:
                 raise Exception("No hay conexión activa")
-                
-            stdin, stdout, stderr = self.ssh.exec_command(comando)
-            error = stderr.read().decode('utf-8')
-            
-            if error:
-                return False, error
-                
-            return True, stdout.read().decode('utf-8')
-            
+
+            resultado = self._ejecutar_en_canal(comando)
+            if resultado['error']:
+                return False, resultado['error']
+
+            return True, resultado['salida']
+
         except Exception as e:
             return False, str(e)
 
+    def ejecutar_comandos(
+        self,
+        comandos: List[str],
+        max_canales: int = MAX_CANALES,
+        timeout: Optional[float] = None
+    ) -> List[Dict]:
+        """
+        Ejecuta varios comandos a la vez, cada uno en su propio canal del
+        mismo transporte SSH, y devuelve los resultados en el mismo orden.
+
+        Cada resultado incluye comando, exito, salida, error, codigo y
+        segundos. Si el servidor rechaza abrir más canales, esos comandos se
+        repiten uno a uno al terminar el lote.
+        """
+        if not self.is_connected:
+            return [
+                self._resultado(c, error="No hay conexión activa")
+                for c in comandos
+            ]
+
+        def _ejecutar(comando: str) -> Dict:
+            try:
+                return self._ejecutar_en_canal(comando, timeout)
+            except paramiko.ChannelException as e:
+                return self._resultado(comando, error=str(e), rechazado=True)
+            except Exception as e:
+                return self._resultado(comando, error=str(e))
+
+        hilos = max(1, min(max_canales, len(comandos)))
+        with ThreadPoolExecutor(max_workers=hilos) as executor:
+            resultados = list(executor.map(_ejecutar, comandos))
+
+        for indice, resultado in enumerate(resultados):
+            if resultado.pop('rechazado', False):
+                logging.info(
+                    "Canal SSH rechazado, se repite en serie: "
+                    f"{resultado['comando']}"
+                )
+                resultados[indice] = _ejecutar(resultado['comando'])
+                resultados[indice].pop('rechazado', None)
+        return resultados
+
+    def _ejecutar_en_canal(
+        self, comando: str, timeout: Optional[float] = None
+    ) -> Dict:
+        """Abre un canal en el transporte compartido y ejecuta un comando"""
+        inicio = time.perf_counter()
+        transporte = self.ssh.get_transport()
+        try:
+            canal = transporte.open_session(timeout=timeout)
+        except paramiko.ChannelException:
+            raise
+        except paramiko.SSHException as e:
+            # Con varios canales abriéndose a la vez paramiko puede informar
+            # del rechazo del servidor como un SSHException genérico
+            if transporte.is_active():
+                raise paramiko.ChannelException(4, str(e)) from e
+            raise
+        try:
+            if timeout:
+                canal.settimeout(timeout)
+            canal.exec_command(comando)
+            salida, error = leer_canal(canal)
+            codigo = canal.recv_exit_status()
+        finally:
+            canal.close()
+        return {
+            'comando': comando,
+            'exito': codigo == 0,
+            'salida': salida.decode('utf-8', errors='replace'),
+            'error': error.decode('utf-8', errors='replace'),
+            'codigo': codigo,
+            'segundos': round(time.perf_counter() - inicio, 3)
+        }
+
+    def ejecutar_lote(
+        self, sondas: Dict[str, str]
+    ) -> Dict[str, Tuple[bool, str]]:
+        """
+        Ejecuta muchas sondas pequeñas en un único script remoto (un solo
+        viaje de ida y vuelta).
+
+        Cada sonda corre en su propia subshell y su salida vuelve en una
+        sección con cabecera de longitudes, por lo que el contenido puede
+        incluir cualquier byte. Devuelve (éxito, salida) por sonda; si la
+        sonda falla la salida es su stderr, o su stdout si stderr está vacío.
+        """
+        if not self.is_connected:
+            return {
+                nombre: (False, "No hay conexión activa") for nombre in sondas
+            }
+
+        nombres = list(sondas)
+        script = script_lote([sondas[nombre] for nombre in nombres])
+        try:
+            salida, error, _ = self._ejecutar_script(script)
+        except Exception as e:
+            return {nombre: (False, str(e)) for nombre in nombres}
+        return parsear_lote(salida, nombres, error)
+
+    def _ejecutar_script(self, script: str) -> Tuple[bytes, str, int]:
+        """
+        Envía un script por stdin a `sh -s` y devuelve stdout en bytes,
+        stderr y código.
+        """
+        canal = self.ssh.get_transport().open_session()
+        try:
+            canal.exec_command('sh -s')
+            canal.sendall(script.encode('utf-8'))
+            canal.shutdown_write()
+            salida, error = leer_canal(canal)
+            return (
+                salida,
+                error.decode('utf-8', errors='replace'),
+                canal.recv_exit_status()
+            )
+        finally:
+            canal.close()
+
+    def codec_remoto(self) -> Optional[str]:
+        """
+        Códec de compresión a usar: el preferido disponible en ambos
+        extremos, o None.
+        """
+        if self.compresion == 'ninguno':
+            return None
+        if not self._codec_detectado:
+            candidatos = [
+                codec for codec in codecs_locales()
+                if self.compresion in ('auto', codec)
+            ]
+            disponibles = self.ejecutar_lote({
+                codec: f"command -v {codec}" for codec in candidatos
+            })
+            self._codec = next(
+                (codec for codec in candidatos if disponibles[codec][0]), None
+            )
+            self._codec_detectado = True
+        return self._codec
+
+    def flujo_remoto(
+        self, comando: str, comprimir: bool = True
+    ) -> FlujoComprimido:
+        """
+        Ejecuta un comando y devuelve su salida como flujo de bytes
+        descomprimidos.
+
+        La salida se comprime en el servidor si hay códec disponible; las
+        estadísticas de cada transferencia se acumulan en self.transferencias.
+        Si el comando falla, la iteración termina lanzando OSError.
+        """
+        codec = self.codec_remoto() if comprimir else None
+        canal = self.ssh.get_transport().open_session()
+        canal.exec_command(
+            comando_comprimido(comando, codec, self.nivel_compresion)
+        )
+        return FlujoComprimido(
+            canal,
+            codec,
+            lambda estadisticas: acumular_estadisticas(
+                self.transferencias, estadisticas
+            ),
+            comando
+        )
+
+    def listar_archivos(self, ruta: str) -> Iterator[Dict]:
+        """
+        Lista en flujo los archivos bajo una ruta remota con tamaño y mtime
+        (OSError si find falla).
+        """
+        comando = (
+            f"find {shlex.quote(ruta)} -type f -printf '%P\\t%s\\t%T@\\n'"
+        )
+        for linea in self._lineas(self.flujo_remoto(comando)):
+            partes = linea.split('\t')
+            if len(partes) == 3:
+                yield {
+                    'ruta': partes[0],
+                    'tamano': int(partes[1]),
+                    'mtime': float(partes[2])
+                }
+
+    def manifiesto_checksums(self, ruta: str) -> Dict[str, str]:
+        """
+        Calcula en remoto el MD5 de cada archivo bajo una ruta y lo recibe
+        comprimido (OSError si falla).
+        """
+        comando = (
+            f"cd {shlex.quote(ruta)} && "
+            "find . -type f -print0 | xargs -0 -r md5sum"
+        )
+        manifiesto = {}
+        for linea in self._lineas(self.flujo_remoto(comando)):
+            huella, _, archivo = linea.partition('  ')
+            if archivo:
+                if archivo.startswith('./'):
+                    archivo = archivo[2:]
+                manifiesto[archivo] = huella
+        return manifiesto
+
+    def manifiesto_remoto(
+        self, ruta: str, hashes: bool = False
+    ) -> Dict[str, Dict]:
+        """
+        Inventario de todos los archivos bajo una ruta remota en una sola
+        ejecución.
+
+        Devuelve por ruta relativa el tamaño, el mtime (texto de `%T@`, exacto
+        hasta el nanosegundo) y, con hashes=True, el MD5 del contenido.
+        Lanza OSError si la ruta no existe, alguno de los find falla o no
+        llega la marca de inicio del listado; un directorio vacío devuelve
+        un manifiesto vacío.
+        """
+        listado = "find . -type f -printf '%P\\t%s\\t%T@\\n'"
+        if hashes:
+            # Separados con ';' para pedir los hashes aunque el listado falle;
+            # sale con el primer error
+            listado = (
+                f"{{ {listado}; codigo=$?; printf '@@WG md5\\n'; "
+                "find . -type f -print0 | xargs -0 -r md5sum; codigo_md5=$?; "
+                "[ $codigo -ne 0 ] || codigo=$codigo_md5; exit $codigo; }"
+            )
+        # La marca solo se emite si el cd funcionó: distingue un directorio
+        # vacío de un listado que no llegó a ejecutarse
+        comando = (
+            f"cd {shlex.quote(ruta)} && printf '{MARCA_LISTADO}\\n' && "
+            f"{listado}"
+        )
+        manifiesto = {}
+        listado_iniciado = False
+        en_hashes = False
+        for linea in self._lineas(self.flujo_remoto(comando)):
+            if linea == MARCA_LISTADO and not listado_iniciado:
+                listado_iniciado = True
+            elif linea == '@@WG md5':
+                en_hashes = True
+            elif en_hashes:
+                huella, _, archivo = linea.partition('  ')
+                archivo = archivo[2:] if archivo.startswith('./') else archivo
+                if archivo in manifiesto:
+                    manifiesto[archivo]['md5'] = huella
+            else:
+                partes = linea.rsplit('\t', 2)
+                if len(partes) == 3:
+                    manifiesto[partes[0]] = {
+                        'tamano': int(partes[1]), 'mtime': partes[2]
+                    }
+        if not listado_iniciado:
+            raise OSError(f"No llegó el listado de {ruta}")
+        return manifiesto
+
+    def sincronizar_espejo(
+        self, ruta: str = 'wp-content', hashes: bool = False
+    ) -> Dict:
+        """
+        Actualiza la copia local de una ruta remota descargando solo lo que
+        cambió.
+        """
+        try:
+            return RemoteMirror(self).sincronizar(ruta, hashes)
+        except Exception as e:
+            self.ui.print_error(f"Error al sincronizar espejo: {str(e)}")
+            return {'error': str(e)}
+
+    def estadisticas_transferencia(self) -> Dict[str, Dict]:
+        """Relación de compresión y rendimiento acumulados por códec"""
+        return self.transferencias
+
+    @staticmethod
+    def _lineas(fragmentos: Iterable[bytes]) -> Iterator[str]:
+        """Divide un flujo de bytes en líneas de texto"""
+        pendiente = b''
+        for fragmento in fragmentos:
+            lineas = (pendiente + fragmento).split(b'\n')
+            pendiente = lineas.pop()
+            for linea in lineas:
+                yield linea.decode('utf-8', errors='replace')
+        if pendiente:
+            yield pendiente.decode('utf-8', errors='replace')
+
+    def ejecutar_diagnostico_remoto(self, sonda: bool = True) -> Dict:
+        """
+        Ejecuta en remoto las comprobaciones del diagnóstico completo de
+        WordPress.
+
+        Con sonda=True se sube una sonda PHP y se ejecuta con un solo
+        `wp eval-file`: un viaje de ida y vuelta y un arranque de WordPress.
+        Si falla, los comandos WP-CLI se ejecutan en un solo lote.
+        """
+        return diagnosticar(self.transporte(), sonda)
+
+    @staticmethod
+    def _resultado(comando: str, error: str, rechazado: bool = False) -> Dict:
+        resultado = {
+            'comando': comando,
+            'exito': False,
+            'salida': '',
+            'error': error,
+            'codigo': None,
+            'segundos': 0.0
+        }
+        if rechazado:
+            resultado['rechazado'] = True
+        return resultado
+
     def obtener_logs(self) -> Dict[str, str]:
         """Obtiene logs remotos del servidor"""
         try:
             logs = {}
-            archivos_log = [
-                'wp-content/debug.log',
-                'error.log',
-                'php_error.log',
-                '/var/log/php_errors.log'
+            raiz = self.config.ruta_remota
+            comandos = [
+                f"cat {shlex.quote(ruta_log_remota(raiz, archivo))}"
+                for archivo in ARCHIVOS_LOG
             ]
-
-            for archivo in archivos_log:
-                ruta_completa = f"{self.config.ruta_remota}/{archivo}"
-                success, contenido = self.ejecutar_comando(f"cat {ruta_completa}")
-                if success and contenido.strip():
-                    logs[archivo] = contenido
+            resultados = self.ejecutar_comandos(comandos)
+            for archivo, resultado in zip(ARCHIVOS_LOG, resultados):
+                if (
+                    resultado['exito']
+                    and not resultado['error']
+                    and resultado['salida'].strip()
+                ):
+                    logs[archivo] = resultado['salida']
                     self.ui.print_success(f"Log obtenido: {archivo}")
 
             return logs
@@ -89,16 +443,59 @@ class HostingerConnector:
             self.ui.print_error(f"Error al obtener logs: {str(e)}")
             return {}
 
+    def obtener_logs_incrementales(
+        self,
+        analizador: LogAnalyzer,
+        archivos: Optional[List[str]] = None
+    ) -> Dict:
+        """Analiza solo los bytes añadidos a cada log desde la última vez"""
+        try:
+            return IncrementalLogFetcher(self.transporte()).obtener(
+                analizador, archivos
+            )
+        except Exception as e:
+            self.ui.print_error(f"Error al obtener logs: {str(e)}")
+            return {'error': str(e)}
+
+    def analizar_logs_remoto(
+        self,
+        analizador: LogAnalyzer,
+        archivos: Optional[List[str]] = None
+    ) -> Dict:
+        """
+        Clasifica los logs en el servidor y recibe solo los recuentos por
+        huella.
+        """
+        try:
+            resultado = IncrementalLogFetcher(
+                self.transporte()
+            ).resumir_remoto(analizador, archivos)
+            resultado['recomendaciones'] = analizador.recomendaciones_resumen(
+                resultado['resumen']
+            )
+            return resultado
+        except Exception as e:
+            self.ui.print_error(f"Error al analizar logs: {str(e)}")
+            return {'error': str(e)}
+
     def obtener_info_tema(self) -> Dict:
         """Obtiene información del tema activo"""
         try:
-            cmd = f"cd {self.config.ruta_remota} && wp theme list --status=active --format=json"
-            success, output = self.ejecutar_comando(cmd)
-            
+            resultados = self.transporte().ejecutar_lote({
+                'tema': [
+                    'wp', 'theme', 'list', '--status=active', '--format=json'
+                ],
+                'version_wp': ['wp', 'core', 'version']
+            })
+            success, output = resultados['tema']
+
             if success:
-                return {'tema_info': json.loads(output)}
+                info = {'tema_info': json.loads(output)}
+                if resultados['version_wp'][0]:
+                    info['version_wp'] = resultados['version_wp'][1].strip()
+                return info
             return {'error': output}
-            
+
         except Exception as e:
             return {'error': str(e)}
 
@@ -110,26 +507,26 @@ class HostingerConnector:
             'wp-content/plugins',
             'wp-content/uploads'
         ]
-        
-        permisos = {}
-        for dir in directorios:
-            ruta = f"{self.config.ruta_remota}/{dir}"
-            success, output = self.ejecutar_comando(f"test -w {ruta} && echo 'true' || echo 'false'")
-            permisos[dir] = output.strip() == 'true'
-            
-        return permisos
-
-    def cerrar_conexion(self):
-        """Cierra las conexiones SSH y SFTP"""
+
+        resultados = self.transporte().ejecutar_lote({
+            dir: ['test', '-w', dir] for dir in directorios
+        })
+        return {dir: resultados[dir][0] for dir in directorios}
+
+    def cerrar_conexion(self, descartar: bool = False):
+        """Cierra la sesión SFTP y devuelve la conexión SSH al pool"""
         try:
             if self.sftp:
                 self.sftp.close()
             if self.ssh:
-                self.ssh.close()
-            self.is_connected = False
-        except:
+                self.pool.devolver(self.ssh, descartar)
+        except Exception:
             pass
+        finally:
+            self.sftp = None
+            self.ssh = None
+            self.is_connected = False
 
     def __del__(self):
-        """Asegura que las conexiones se cierren al destruir el objeto"""
+        """Asegura que la conexión vuelva al pool al destruir el objeto"""
         self.cerrar_conexion()
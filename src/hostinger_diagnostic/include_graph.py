@@ -0,0 +1,326 @@
+"""
+Grafo estático de inclusiones entre los archivos de un tema WordPress.
+Resuelve get_template_part, locate_template, los cargadores de plantillas
+(get_header, get_footer...) e include/require con rutas literales.
+"""
+
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from .php_scanner import eliminar_comentarios
+from .scan_cache import ScanCache
+
+_LITERAL = rb"""(?:'([^'\\]*(?:\\.[^'\\]*)*)'|"([^"\\]*(?:\\.[^"\\]*)*)")"""
+
+_TEMPLATE_PART = re.compile(
+    rb"\bget_template_part\s*\(\s*" + _LITERAL
+    + rb"(?:\s*,\s*" + _LITERAL + rb")?"
+)
+_CARGADOR = re.compile(
+    rb"\b(get_header|get_footer|get_sidebar|get_search_form"
+    rb"|comments_template)\s*\(\s*(?:" + _LITERAL + rb")?"
+)
+_LOCATE = re.compile(
+    rb"\blocate_template\s*\(\s*(?:array\s*\(|\[)?\s*((?:"
+    + _LITERAL + rb"\s*,?\s*)+)"
+)
+# Sentencias include/require, no homónimos como $include, ->require(),
+# ::include, claves 'include' => o métodos declarados con ese nombre
+_INCLUDE = re.compile(
+    rb"(?<![\w$'\"\\])(?<!->)(?<!::)(?<!function\s)"
+    rb"(?:include|require)(?:_once)?\b(?!['\"])\s*([^;]*);"
+)
+_CUALQUIER_LITERAL = re.compile(_LITERAL)
+
+_BASE_PADRE = re.compile(
+    rb"get_template_directory\s*\(|TEMPLATEPATH"
+    rb"|get_parent_theme_file_path\s*\("
+)
+_BASE_TEMA = re.compile(
+    rb"get_stylesheet_directory\s*\(|STYLESHEETPATH|get_theme_file_path\s*\("
+)
+
+# Archivos que WordPress carga directamente según la jerarquía de plantillas
+PATRON_RAIZ = re.compile(
+    r'^(?:index|home|front-page|singular|single(?:-.*)?|page(?:-.*)?'
+    r'|archive(?:-.*)?|category(?:-.*)?|tag(?:-.*)?|taxonomy(?:-.*)?'
+    r'|author(?:-.*)?|date|search|404|attachment|embed(?:-.*)?'
+    r'|privacy-policy|image|video|audio|text|application|functions)\.php$'
+)
+
+ARCHIVOS_CARGADOR = {
+    'get_header': 'header',
+    'get_footer': 'footer',
+    'get_sidebar': 'sidebar',
+    'get_search_form': 'searchform',
+}
+
+
+def _texto_literal(match, grupo: int) -> Optional[str]:
+    """Devuelve el contenido de un literal capturado por _LITERAL"""
+    valor = match.group(grupo)
+    if valor is None:
+        valor = match.group(grupo + 1)
+    if valor is None:
+        return None
+    return valor.decode('utf-8', errors='ignore')
+
+
+def extraer_referencias(contenido: bytes) -> Dict:
+    """Extrae las referencias a otros archivos de un archivo PHP"""
+    codigo = eliminar_comentarios(contenido)
+    referencias = []
+
+    for match in _TEMPLATE_PART.finditer(codigo):
+        slug, nombre = _texto_literal(match, 1), _texto_literal(match, 3)
+        candidatos = [f"{slug}-{nombre}.php"] if nombre else []
+        referencias.append({
+            'base': 'plantilla', 'candidatos': candidatos + [f"{slug}.php"]
+        })
+
+    for match in _CARGADOR.finditer(codigo):
+        funcion = match.group(1).decode('ascii')
+        argumento = _texto_literal(match, 2)
+        if funcion == 'comments_template':
+            candidatos = [(argumento or '/comments.php').lstrip('/')]
+        else:
+            base = ARCHIVOS_CARGADOR[funcion]
+            candidatos = [f"{base}.php"]
+            if argumento:
+                candidatos.insert(0, f"{base}-{argumento}.php")
+        referencias.append({'base': 'plantilla', 'candidatos': candidatos})
+
+    for match in _LOCATE.finditer(codigo):
+        candidatos = [
+            _texto_literal(literal, 1)
+            for literal in _CUALQUIER_LITERAL.finditer(match.group(1))
+        ]
+        referencias.append({
+            'base': 'plantilla',
+            'candidatos': [c.lstrip('/') for c in candidatos]
+        })
+
+    dinamicos = 0
+    for match in _INCLUDE.finditer(codigo):
+        expresion = match.group(1)
+        literales = [
+            _texto_literal(literal, 1)
+            for literal in _CUALQUIER_LITERAL.finditer(expresion)
+        ]
+        if b'$' in expresion or not literales:
+            dinamicos += 1
+            continue
+        if _BASE_PADRE.search(expresion):
+            base = 'padre'
+        elif _BASE_TEMA.search(expresion):
+            base = 'tema'
+        else:
+            # __DIR__, dirname(__FILE__) o ruta relativa: se resuelve desde el
+            # propio archivo
+            base = 'archivo'
+        referencias.append({'base': base, 'candidatos': [''.join(literales)]})
+
+    return {
+        'referencias': referencias,
+        'dinamicos': dinamicos,
+        'plantilla_pagina': b'Template Name:' in contenido[:8192]
+    }
+
+
+class IncludeGraph:
+    """Grafo de inclusiones de un tema (y su tema padre, si lo tiene)"""
+
+    def __init__(
+        self, raices_tema: List[Path], cache: Optional[ScanCache] = None
+    ):
+        self.raices_tema = [Path(r) for r in raices_tema]
+        self.cache = cache
+        self.nodos: Dict[str, Dict] = {}
+        self.aristas: Dict[str, Set[str]] = {}
+
+    def _clave(self, ruta: Path) -> str:
+        """Nombre de un nodo: ruta relativa al directorio de temas"""
+        relativa = os.path.relpath(ruta, self.raices_tema[0].parent)
+        return Path(relativa).as_posix()
+
+    def construir(self) -> 'IncludeGraph':
+        """Recorre los archivos PHP de los temas y resuelve sus referencias"""
+        for raiz in self.raices_tema:
+            for directorio, subdirectorios, archivos in os.walk(raiz):
+                subdirectorios[:] = [
+                    d for d in subdirectorios
+                    if d not in ('node_modules', 'vendor', '.git')
+                ]
+                for nombre in archivos:
+                    if not nombre.endswith('.php'):
+                        continue
+                    ruta = Path(directorio) / nombre
+                    st = os.stat(ruta)
+                    if self.cache is not None:
+                        datos = self.cache.obtener(
+                            ruta, extraer_referencias, st
+                        )
+                    else:
+                        datos = extraer_referencias(ruta.read_bytes())
+                    self.nodos[self._clave(ruta)] = {
+                        'ruta': ruta, 'bytes': st.st_size, **datos
+                    }
+
+        for clave, nodo in self.nodos.items():
+            self.aristas[clave] = set()
+            for referencia in nodo['referencias']:
+                destino = self._resolver(nodo['ruta'], referencia)
+                if destino and destino != clave:
+                    self.aristas[clave].add(destino)
+        return self
+
+    def _resolver(self, origen: Path, referencia: Dict) -> Optional[str]:
+        """Resuelve una referencia al primer archivo existente del grafo"""
+        if referencia['base'] == 'archivo':
+            bases = [origen.parent] + self.raices_tema
+        elif referencia['base'] == 'padre':
+            bases = self.raices_tema[-1:]
+        else:
+            bases = self.raices_tema
+
+        for candidato in referencia['candidatos']:
+            for base in bases:
+                ruta = Path(os.path.normpath(base / candidato.lstrip('/')))
+                clave = self._clave(ruta)
+                if clave in self.nodos:
+                    return clave
+        return None
+
+    def raices(self) -> List[str]:
+        """Archivos cargados directamente por WordPress"""
+        return sorted(
+            clave for clave, nodo in self.nodos.items()
+            if (
+                nodo['ruta'].parent in self.raices_tema
+                and PATRON_RAIZ.match(nodo['ruta'].name)
+            )
+            or nodo['plantilla_pagina']
+        )
+
+    def componentes(self) -> List[List[str]]:
+        """
+        Componentes fuertemente conexos (Tarjan iterativo), en orden
+        topológico inverso.
+        """
+        indice, bajo, en_pila = {}, {}, set()
+        pila, resultado, contador = [], [], 0
+        for inicio in sorted(self.nodos):
+            if inicio in indice:
+                continue
+            trabajo = [(inicio, iter(sorted(self.aristas[inicio])))]
+            indice[inicio] = bajo[inicio] = contador
+            contador += 1
+            pila.append(inicio)
+            en_pila.add(inicio)
+            while trabajo:
+                nodo, sucesores = trabajo[-1]
+                avanzo = False
+                for sucesor in sucesores:
+                    if sucesor not in indice:
+                        indice[sucesor] = bajo[sucesor] = contador
+                        contador += 1
+                        pila.append(sucesor)
+                        en_pila.add(sucesor)
+                        trabajo.append(
+                            (sucesor, iter(sorted(self.aristas[sucesor])))
+                        )
+                        avanzo = True
+                        break
+                    if sucesor in en_pila:
+                        bajo[nodo] = min(bajo[nodo], indice[sucesor])
+                if avanzo:
+                    continue
+                trabajo.pop()
+                if trabajo:
+                    padre = trabajo[-1][0]
+                    bajo[padre] = min(bajo[padre], bajo[nodo])
+                if bajo[nodo] == indice[nodo]:
+                    componente = []
+                    while True:
+                        miembro = pila.pop()
+                        en_pila.discard(miembro)
+                        componente.append(miembro)
+                        if miembro == nodo:
+                            break
+                    resultado.append(sorted(componente))
+        return resultado
+
+    def ciclos(self) -> List[List[str]]:
+        """Grupos de archivos que se incluyen mutuamente"""
+        return [
+            c for c in self.componentes()
+            if len(c) > 1 or c[0] in self.aristas[c[0]]
+        ]
+
+    def alcanzables(self, raices: List[str]) -> Set[str]:
+        """Archivos alcanzables desde las raíces dadas"""
+        vistos, pendientes = set(raices), list(raices)
+        while pendientes:
+            for sucesor in self.aristas[pendientes.pop()]:
+                if sucesor not in vistos:
+                    vistos.add(sucesor)
+                    pendientes.append(sucesor)
+        return vistos
+
+    def cadenas_mas_pesadas(self, limite: int = 10) -> List[Dict]:
+        """
+        Cadenas de inclusión con mayor tamaño total de código, desde cada
+        raíz.
+        """
+        componentes = self.componentes()
+        componente_de = {
+            nodo: i for i, c in enumerate(componentes) for nodo in c
+        }
+        peso, siguiente = {}, {}
+        # Tarjan devuelve los componentes en orden topológico inverso: los
+        # sucesores primero
+        for i, componente in enumerate(componentes):
+            sucesores = {
+                componente_de[s]
+                for nodo in componente for s in self.aristas[nodo]
+            } - {i}
+            mejor = max(sucesores, key=lambda j: peso[j], default=None)
+            peso[i] = sum(self.nodos[n]['bytes'] for n in componente)
+            if mejor is not None:
+                peso[i] += peso[mejor]
+            siguiente[i] = mejor
+
+        cadenas = []
+        for raiz in self.raices():
+            actual, cadena = componente_de[raiz], []
+            while actual is not None:
+                cadena.extend(componentes[actual])
+                actual = siguiente[actual]
+            cadenas.append({
+                'raiz': raiz,
+                'cadena': cadena,
+                'profundidad': len(cadena),
+                'bytes': peso[componente_de[raiz]]
+            })
+        cadenas.sort(key=lambda c: c['bytes'], reverse=True)
+        return cadenas[:limite]
+
+    def resumen(self) -> Dict:
+        """Resumen del grafo para el reporte de diagnóstico"""
+        raices = self.raices()
+        alcanzables = self.alcanzables(raices)
+        return {
+            'archivos': len(self.nodos),
+            'inclusiones': sum(
+                len(destinos) for destinos in self.aristas.values()
+            ),
+            'inclusiones_dinamicas': sum(
+                nodo['dinamicos'] for nodo in self.nodos.values()
+            ),
+            'raices': raices,
+            'ciclos': self.ciclos(),
+            'no_alcanzables': sorted(set(self.nodos) - alcanzables),
+            'cadenas_mas_pesadas': self.cadenas_mas_pesadas()
+        }
@@ -0,0 +1,239 @@
+"""
+Línea base de integridad de plugins y temas.
+
+Se guarda el hash de cada archivo de wp-content/plugins y wp-content/themes
+y los estados posteriores se comparan contra ella. La comparación recorre
+el árbol una sola vez con os.scandir y solo hashea los archivos cuyo
+(tamaño, mtime_ns) difiere del registrado, así que volver a verificar
+cien mil archivos sin cambios cuesta lo que el recorrido.
+"""
+
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .core_integrity import hashear_archivos
+from .scan_cache import ruta_cache
+
+DIRECTORIOS_BASELINE = ('wp-content/plugins', 'wp-content/themes')
+ALGORITMO_BASELINE = 'sha256'
+VERSION_BASELINE = '1'
+
+
+class IntegrityBaseline:
+    """
+    Crea y compara la línea base de los plugins y temas de una instalación.
+
+    Cada archivo se registra como [tamaño, mtime_ns, hash] por su ruta
+    relativa a la raíz. Un archivo tocado cuyo contenido no cambió no se
+    informa, y su nuevo mtime se guarda para no volver a hashearlo.
+    """
+
+    def __init__(
+        self,
+        raiz: Path,
+        archivo: Optional[Path] = None,
+        directorios: Tuple[str, ...] = DIRECTORIOS_BASELINE,
+        max_workers: Optional[int] = None
+    ):
+        self.raiz = Path(raiz)
+        self.archivo = archivo or ruta_cache(self.raiz, 'baseline-contenido')
+        self.directorios = directorios
+        self.max_workers = max_workers
+
+    def existe(self) -> bool:
+        return self.archivo.exists()
+
+    def crear(self) -> Dict:
+        """
+        Hashea todos los archivos y guarda la línea base en lugar de la
+        anterior.
+
+        Returns:
+            Diccionario con los archivos registrados, los bytes hasheados,
+            los errores de lectura y los segundos empleados
+        """
+        inicio = time.perf_counter()
+        actuales = self._recorrer()
+        archivos, errores = self._hashear(actuales, list(actuales))
+        self._guardar(archivos, datetime.now().isoformat())
+        return {
+            'archivos': len(archivos),
+            'bytes': sum(tamano for tamano, _ in actuales.values()),
+            'errores': errores,
+            'segundos': round(time.perf_counter() - inicio, 3)
+        }
+
+    def comparar(self, actualizar: bool = False) -> Dict:
+        """
+        Compara el estado actual con la línea base.
+
+        Args:
+            actualizar: Acepta el estado actual como nueva línea base
+
+        Returns:
+            Diccionario con ok, disponible (si había una línea base válida;
+            si no, solo ok y disponible a False), fecha de la
+            línea base, listas de modificados, añadidos y eliminados, los
+            archivos verificados y hasheados, los errores y los segundos
+        """
+        inicio = time.perf_counter()
+        base = self._cargar()
+        if base is None:
+            return {'ok': True, 'disponible': False}
+        registrados = base['archivos']
+
+        actuales = self._recorrer()
+        anadidos = sorted(ruta for ruta in actuales if ruta not in registrados)
+        eliminados = sorted(
+            ruta for ruta in registrados if ruta not in actuales
+        )
+        candidatos = [
+            ruta for ruta, (tamano, mtime_ns) in actuales.items()
+            if ruta in registrados
+            and registrados[ruta][:2] != [tamano, mtime_ns]
+        ]
+
+        calculados, errores = self._hashear(
+            actuales, candidatos + (anadidos if actualizar else [])
+        )
+        modificados = sorted(
+            ruta for ruta in candidatos
+            if ruta in calculados
+            and calculados[ruta][2] != registrados[ruta][2]
+        ) + sorted(ruta for ruta in errores if ruta in registrados)
+
+        if actualizar:
+            nuevos = {
+                ruta: calculados.get(ruta) or registrados[ruta]
+                for ruta in actuales
+                if ruta in calculados or ruta in registrados
+            }
+            self._guardar(nuevos, datetime.now().isoformat())
+        else:
+            # Solo cambió el mtime: se guarda para no volver a hashearlos
+            tocados = [
+                ruta for ruta in candidatos
+                if ruta in calculados and ruta not in modificados
+            ]
+            if tocados:
+                for ruta in tocados:
+                    registrados[ruta] = calculados[ruta]
+                self._guardar(registrados, base['creado'])
+
+        return {
+            'ok': not modificados and not anadidos and not eliminados,
+            'disponible': True,
+            'creado': base['creado'],
+            'modificados': modificados,
+            'anadidos': anadidos,
+            'eliminados': eliminados,
+            'verificados': len(actuales),
+            'hasheados': len(calculados) + len(errores),
+            'errores': errores,
+            'actualizado': actualizar,
+            'segundos': round(time.perf_counter() - inicio, 3)
+        }
+
+    def _recorrer(self) -> Dict[str, Tuple[int, int]]:
+        """(tamaño, mtime_ns) de cada archivo en un recorrido con os.scandir"""
+        actuales = {}
+        prefijo = len(str(self.raiz)) + 1
+        for directorio in self.directorios:
+            pendientes = [str(self.raiz / directorio)]
+            while pendientes:
+                actual = pendientes.pop()
+                try:
+                    with os.scandir(actual) as entradas:
+                        for entrada in entradas:
+                            if entrada.is_dir(follow_symlinks=False):
+                                pendientes.append(entrada.path)
+                            elif entrada.is_file(follow_symlinks=False):
+                                st = entrada.stat(follow_symlinks=False)
+                                ruta = entrada.path[prefijo:]
+                                actuales[ruta.replace(os.sep, '/')] = (
+                                    st.st_size, st.st_mtime_ns
+                                )
+                except FileNotFoundError:
+                    continue
+                except OSError as e:
+                    logging.warning(f"No se pudo listar {actual}: {str(e)}")
+        return actuales
+
+    def _hashear(
+        self,
+        actuales: Dict[str, Tuple[int, int]],
+        rutas: List[str]
+    ) -> Tuple[Dict[str, list], Dict[str, str]]:
+        """Entradas [tamaño, mtime_ns, hash] calculadas y errores por ruta"""
+        absolutas = {str(self.raiz / ruta): ruta for ruta in rutas}
+        resultados = hashear_archivos(
+            list(absolutas),
+            ALGORITMO_BASELINE,
+            self.max_workers,
+            sum(actuales[ruta][0] for ruta in rutas)
+        )
+        calculados, errores = {}, {}
+        for absoluta, (huella, error) in resultados.items():
+            ruta = absolutas[absoluta]
+            if error:
+                errores[ruta] = error
+            else:
+                calculados[ruta] = [*actuales[ruta], huella]
+        return calculados, errores
+
+    def _cargar(self) -> Optional[Dict]:
+        """
+        Línea base guardada; una ilegible o incompatible se borra y se
+        devuelve None.
+        """
+        try:
+            if not self.archivo.exists():
+                return None
+            contenido = json.loads(self.archivo.read_text(encoding='utf-8'))
+            if (
+                contenido.get('version') == VERSION_BASELINE
+                and contenido.get('algoritmo') == ALGORITMO_BASELINE
+            ):
+                return contenido
+            logging.warning(
+                "Línea base de integridad incompatible, "
+                f"hay que crearla de nuevo: {self.archivo}"
+            )
+        except Exception as e:
+            logging.warning(
+                "Línea base de integridad descartada "
+                f"({self.archivo}): {str(e)}"
+            )
+        try:
+            self.archivo.unlink()
+        except OSError as e:
+            logging.warning(
+                "No se pudo borrar la línea base de integridad "
+                f"{self.archivo}: {str(e)}"
+            )
+        return None
+
+    def _guardar(self, archivos: Dict[str, list], creado: str):
+        """Persiste la línea base de forma atómica"""
+        try:
+            self.archivo.parent.mkdir(parents=True, exist_ok=True)
+            temporal = self.archivo.with_suffix('.tmp')
+            temporal.write_text(
+                json.dumps({
+                    'version': VERSION_BASELINE,
+                    'algoritmo': ALGORITMO_BASELINE,
+                    'creado': creado,
+                    'archivos': archivos
+                }, separators=(',', ':')),
+                encoding='utf-8'
+            )
+            os.replace(temporal, self.archivo)
+        except OSError as e:
+            logging.error(
+                f"Error al guardar la línea base de integridad: {str(e)}"
+            )
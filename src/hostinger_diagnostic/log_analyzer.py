@@ -1,17 +1,12 @@
-import re
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterable, List, Optional, Tuple
 from ..utils.ui_helper import UIHelper
+from . import log_fingerprint
 
 class LogAnalyzer:
     def __init__(self, ui: UIHelper):
         self.ui = ui
-        self.patrones_error = {
-            'php': r'PHP (Fatal|Parse|Warning|Notice|Error)',
-            'wordpress': r'WordPress database error',
-            'plugin': r'Plugin (.*?) error',
-            'tema': r'Theme (.*?) error'
-        }
+        self.patrones_error = dict(log_fingerprint.PATRONES_ERROR)
 
     def obtener_logs_locales(self, ruta: Path) -> Dict[str, str]:
         """Obtiene logs locales de WordPress"""
@@ -31,30 +26,95 @@ class LogAnalyzer:
 
     def analizar_logs(self, logs: Dict[str, str]) -> Dict:
         """Analiza los logs buscando errores y patrones"""
-        resultados = {
+        resultados = self.nuevo_resultado()
+
+        for nombre_log, contenido in logs.items():
+            self._analizar_contenido_log(contenido, resultados)
+
+        return resultados
+
+    def nuevo_resultado(self) -> Dict:
+        """Estructura vacía de resultados de análisis"""
+        return {
             'errores': [],
             'advertencias': [],
             'recomendaciones': []
         }
 
-        for nombre_log, contenido in logs.items():
-            self._analizar_contenido_log(contenido, resultados)
+    def analizar_flujo(
+        self,
+        fragmentos: Iterable[bytes],
+        resultados: Optional[Dict] = None,
+        incluir_incompleta: bool = True
+    ) -> Tuple[Dict, int]:
+        """
+        Analiza un log que llega por fragmentos sin cargarlo entero en memoria.
 
-        return resultados
+        Args:
+            fragmentos: Bloques de bytes consecutivos del log
+            resultados: Resultados a los que se añaden los hallazgos
+            incluir_incompleta: Si se analiza la última línea sin salto final
+
+        Returns:
+            Tupla de (resultados, bytes analizados). Sin incluir_incompleta,
+            los bytes analizados terminan en el último salto de línea, de modo
+            que una línea a medio escribir se vuelve a leer en la próxima
+            pasada.
+        """
+        if resultados is None:
+            resultados = self.nuevo_resultado()
+        pendiente = b''
+        analizados = 0
+        for fragmento in fragmentos:
+            bloque = pendiente + fragmento
+            corte = bloque.rfind(b'\n') + 1
+            if corte:
+                self._analizar_contenido_log(
+                    bloque[:corte].decode('utf-8', errors='ignore'), resultados
+                )
+                analizados += corte
+            pendiente = bloque[corte:]
+        if pendiente and incluir_incompleta:
+            self._analizar_contenido_log(
+                pendiente.decode('utf-8', errors='ignore'), resultados
+            )
+            analizados += len(pendiente)
+        return resultados, analizados
 
     def _analizar_contenido_log(self, contenido: str, resultados: Dict):
         """Analiza el contenido de un log buscando errores"""
-        lineas = contenido.splitlines()
-        
-        for linea in lineas:
-            for tipo, patron in self.patrones_error.items():
-                if re.search(patron, linea):
-                    error = self._clasificar_error(tipo, linea)
-                    if error:
-                        resultados['errores'].append(error)
-                        resultados['recomendaciones'].extend(
-                            self._generar_recomendaciones(error)
-                        )
+        clasificadas = log_fingerprint.clasificar_lineas(
+            contenido, self.patrones_error
+        )
+        for tipo, linea in clasificadas:
+            error = self._clasificar_error(tipo, linea)
+            if error:
+                resultados['errores'].append(error)
+                resultados['recomendaciones'].extend(
+                    self._generar_recomendaciones(error)
+                )
+
+    def resumir(self, resultados: Dict) -> Dict:
+        """
+        Agrupa los errores de un análisis por huella (mensaje normalizado).
+
+        Produce la misma estructura que el análisis remoto de
+        HostingerConnector.analizar_logs_remoto, por lo que ambos se pueden
+        comparar o combinar.
+        """
+        resumen = log_fingerprint.nuevo_resumen()
+        for error in resultados['errores']:
+            log_fingerprint.agregar(resumen, error['tipo'], error['mensaje'])
+        return resumen
+
+    def recomendaciones_resumen(self, resumen: Dict) -> List[str]:
+        """Recomendaciones sin repetir para los tipos de error de un resumen"""
+        recomendaciones = []
+        for tipo in resumen['por_tipo']:
+            for recomendacion in self._generar_recomendaciones({'tipo': tipo}):
+                if recomendacion not in recomendaciones:
+                    recomendaciones.append(recomendacion)
+        return recomendaciones
 
     def _clasificar_error(self, tipo: str, linea: str) -> Dict:
         """Clasifica y estructura un error encontrado"""
@@ -67,16 +127,11 @@ class LogAnalyzer:
 
     def _determinar_severidad(self, linea: str) -> str:
         """Determina la severidad de un error"""
-        if 'Fatal' in linea or 'Error' in linea:
-            return 'alta'
-        elif 'Warning' in linea:
-            return 'media'
-        return 'baja'
+        return log_fingerprint.determinar_severidad(linea)
 
     def _extraer_timestamp(self, linea: str) -> str:
         """Extrae el timestamp de una línea de log"""
-        match = re.search(r'\[(.*?)\]', linea)
-        return match.group(1) if match else 'desconocido'
+        return log_fingerprint.extraer_timestamp(linea)
 
     def _generar_recomendaciones(self, error: Dict) -> List[str]:
         """Genera recomendaciones basadas en el error"""
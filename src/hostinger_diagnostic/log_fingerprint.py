@@ -0,0 +1,204 @@
+"""
+Clasificación de líneas de log y agregación por huella.
+
+Este módulo no depende del resto del paquete: HostingerConnector lo envía
+tal cual al servidor y lo ejecuta con `python3 -`, de modo que el análisis
+remoto usa exactamente el mismo código que LogAnalyzer en local y solo se
+transfieren los recuentos agregados. Por eso solo usa la biblioteca
+estándar y evita f-strings (compatible con Python 3.4).
+"""
+
+import json
+import os
+import re
+import sys
+
+PATRONES_ERROR = {
+    'php': r'PHP (Fatal|Parse|Warning|Notice|Error)',
+    'wordpress': r'WordPress database error',
+    'plugin': r'Plugin (.*?) error',
+    'tema': r'Theme (.*?) error'
+}
+
+# Longitud máxima de la línea de ejemplo de cada huella
+MAX_EJEMPLO = 500
+
+TAMANO_BLOQUE = 65536
+
+_TIMESTAMP = re.compile(r'\[(.*?)\]')
+_NORMALIZAR = (
+    (re.compile(r'^\s*\[[^\]]*\]\s*'), ''),
+    (re.compile(r'0x[0-9a-fA-F]+'), '0x?'),
+    (re.compile(r"'[^']*'|\"[^\"]*\""), "'?'"),
+    (re.compile(r'\d+'), 'N'),
+    (re.compile(r'\s+'), ' '),
+)
+
+
+def determinar_severidad(linea):
+    """Determina la severidad de un error"""
+    if 'Fatal' in linea or 'Error' in linea:
+        return 'alta'
+    elif 'Warning' in linea:
+        return 'media'
+    return 'baja'
+
+
+def extraer_timestamp(linea):
+    """Extrae el timestamp de una línea de log"""
+    match = _TIMESTAMP.search(linea)
+    return match.group(1) if match else 'desconocido'
+
+
+def huella(linea):
+    """Mensaje normalizado sin fecha, números, direcciones ni literales"""
+    for patron, sustituto in _NORMALIZAR:
+        linea = patron.sub(sustituto, linea)
+    return linea.strip()
+
+
+def clasificar_lineas(contenido, patrones):
+    """Genera (tipo, línea) por cada patrón que coincide con cada línea"""
+    for linea in contenido.splitlines():
+        for tipo, patron in patrones.items():
+            if re.search(patron, linea):
+                yield tipo, linea
+
+
+def nuevo_resumen():
+    """Estructura vacía de recuentos por huella"""
+    return {'huellas': {}, 'por_tipo': {}, 'por_severidad': {}, 'total': 0}
+
+
+def agregar(resumen, tipo, linea):
+    """Suma una línea clasificada al resumen"""
+    severidad = determinar_severidad(linea)
+    timestamp = extraer_timestamp(linea)
+    normalizada = huella(linea)
+    clave = tipo + '\t' + normalizada
+    entrada = resumen['huellas'].get(clave)
+    if entrada is None:
+        entrada = resumen['huellas'][clave] = {
+            'tipo': tipo,
+            'severidad': severidad,
+            'huella': normalizada,
+            'ocurrencias': 0,
+            'primera': timestamp,
+            'ultima': timestamp,
+            'ejemplo': linea[:MAX_EJEMPLO]
+        }
+    entrada['ocurrencias'] += 1
+    entrada['ultima'] = timestamp
+    resumen['por_tipo'][tipo] = resumen['por_tipo'].get(tipo, 0) + 1
+    por_severidad = resumen['por_severidad']
+    por_severidad[severidad] = por_severidad.get(severidad, 0) + 1
+    resumen['total'] += 1
+
+
+def combinar(resumen, otro):
+    """Añade a un resumen los recuentos de otro posterior"""
+    for clave, entrada in otro['huellas'].items():
+        actual = resumen['huellas'].get(clave)
+        if actual is None:
+            resumen['huellas'][clave] = dict(entrada)
+            continue
+        actual['ocurrencias'] += entrada['ocurrencias']
+        actual['ultima'] = entrada['ultima']
+    for campo in ('por_tipo', 'por_severidad'):
+        for clave, valor in otro[campo].items():
+            resumen[campo][clave] = resumen[campo].get(clave, 0) + valor
+    resumen['total'] += otro['total']
+    return resumen
+
+
+def resumir_flujo(fragmentos, patrones, resumen, incluir_incompleta=True):
+    """
+    Agrega un log que llega por fragmentos de bytes y devuelve los bytes
+    analizados.
+
+    Corta y decodifica igual que LogAnalyzer.analizar_flujo, así que el
+    resultado no depende del tamaño de los fragmentos.
+    """
+    pendiente = b''
+    analizados = 0
+    for fragmento in fragmentos:
+        bloque = pendiente + fragmento
+        corte = bloque.rfind(b'\n') + 1
+        if corte:
+            texto = bloque[:corte].decode('utf-8', errors='ignore')
+            for tipo, linea in clasificar_lineas(texto, patrones):
+                agregar(resumen, tipo, linea)
+            analizados += corte
+        pendiente = bloque[corte:]
+    if pendiente and incluir_incompleta:
+        texto = pendiente.decode('utf-8', errors='ignore')
+        for tipo, linea in clasificar_lineas(texto, patrones):
+            agregar(resumen, tipo, linea)
+        analizados += len(pendiente)
+    return analizados
+
+
+def _bloques(archivo, restante):
+    while restante > 0:
+        datos = archivo.read(min(TAMANO_BLOQUE, restante))
+        if not datos:
+            break
+        restante -= len(datos)
+        yield datos
+
+
+def analizar_archivos(peticion):
+    """
+    Analiza los rangos nuevos de varios logs.
+
+    La petición contiene los patrones y, por log, su ruta, el desplazamiento
+    y el inodo de la pasada anterior. Igual que IncrementalLogFetcher, si el
+    inodo cambió o el archivo encogió se vuelve a leer desde el principio,
+    y el rango leído termina en el último salto de línea.
+    """
+    patrones = peticion['patrones']
+    resumen = nuevo_resumen()
+    logs = {}
+    for archivo in peticion['archivos']:
+        nombre, ruta = archivo['nombre'], archivo['ruta']
+        try:
+            st = os.stat(ruta)
+        except OSError as e:
+            logs[nombre] = {'error': str(e)}
+            continue
+        desde = archivo.get('desde') or 0
+        inodo_previo = archivo.get('inodo')
+        rotado = inodo_previo is not None and (
+            inodo_previo != st.st_ino or st.st_size < desde
+        )
+        if rotado:
+            desde = 0
+        analizados = 0
+        if st.st_size > desde:
+            parcial = nuevo_resumen()
+            try:
+                with open(ruta, 'rb') as f:
+                    f.seek(desde)
+                    analizados = resumir_flujo(
+                        _bloques(f, st.st_size - desde),
+                        patrones,
+                        parcial,
+                        incluir_incompleta=False
+                    )
+            except OSError as e:
+                logs[nombre] = {'error': str(e)}
+                continue
+            combinar(resumen, parcial)
+        logs[nombre] = {
+            'inodo': st.st_ino,
+            'tamano': st.st_size,
+            'desde': desde,
+            'hasta': desde + analizados,
+            'bytes': analizados,
+            'rotado': rotado
+        }
+    return {'resumen': resumen, 'logs': logs}
+
+
+if __name__ == '__main__':
+    json.dump(analizar_archivos(json.loads(sys.argv[1])), sys.stdout)
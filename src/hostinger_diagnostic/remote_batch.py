@@ -0,0 +1,69 @@
+"""
+Script de lote para ejecutar muchas sondas remotas en un solo viaje de ida
+y vuelta. Lo comparten los conectores síncrono y asíncrono.
+"""
+
+import re
+import shlex
+from typing import Dict, List, Tuple
+
+# Cabecera de cada sección del lote: índice, código de salida y longitudes de
+# stdout y stderr
+_CABECERA_LOTE = re.compile(rb'@@WG (\d+) (\d+) (\d+) (\d+)\n')
+
+_PREAMBULO_LOTE = """__wg_o=$(mktemp) || exit 1
+__wg_e=$(mktemp) || exit 1
+trap 'rm -f "$__wg_o" "$__wg_e"' EXIT
+__wg() {
+    ( eval "$2" ) </dev/null >"$__wg_o" 2>"$__wg_e"
+    __wg_c=$?
+    printf '@@WG %s %s %s %s\\n' "$1" "$__wg_c" \\
+        "$(wc -c <"$__wg_o" | tr -d ' ')" "$(wc -c <"$__wg_e" | tr -d ' ')"
+    cat "$__wg_o" "$__wg_e"
+}
+"""
+
+
+def script_lote(comandos: List[str]) -> str:
+    """Script de `sh -s` que ejecuta cada comando en su propia subshell"""
+    return _PREAMBULO_LOTE + ''.join(
+        f"__wg {indice} {shlex.quote(comando)}\n"
+        for indice, comando in enumerate(comandos)
+    )
+
+
+def parsear_lote(
+    salida: bytes, nombres: List[str], error: str = ''
+) -> Dict[str, Tuple[bool, str]]:
+    """
+    Separa la salida del script en (éxito, salida) por sonda.
+
+    Si la sonda falla la salida es su stderr, o su stdout si stderr está
+    vacío. Las sondas sin sección (script interrumpido) reciben el stderr
+    del propio script.
+    """
+    resultados = {}
+    posicion = 0
+    while True:
+        cabecera = _CABECERA_LOTE.match(salida, posicion)
+        if not cabecera:
+            break
+        indice, codigo, largo_salida, largo_error = (
+            int(valor) for valor in cabecera.groups()
+        )
+        inicio = cabecera.end()
+        fin_salida = inicio + largo_salida
+        posicion = fin_salida + largo_error
+        stdout = salida[inicio:fin_salida].decode('utf-8', errors='replace')
+        stderr = salida[fin_salida:posicion].decode('utf-8', errors='replace')
+        if indice < len(nombres):
+            resultados[nombres[indice]] = (
+                codigo == 0, stdout if codigo == 0 else (stderr or stdout)
+            )
+
+    for nombre in nombres:
+        if nombre not in resultados:
+            resultados[nombre] = (
+                False, error.strip() or "La sonda no devolvió resultado"
+            )
+    return resultados
@@ -0,0 +1,211 @@
+"""
+Lectura incremental de logs por desplazamiento de bytes.
+Solo se leen los bytes añadidos desde la última pasada y se analizan en
+flujo, sin cargar el log completo en memoria. Funciona sobre cualquier
+transporte, local o SSH.
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .log_analyzer import LogAnalyzer
+
+ARCHIVOS_LOG = [
+    'wp-content/debug.log',
+    'error.log',
+    'php_error.log',
+    '/var/log/php_errors.log'
+]
+
+
+def ruta_log_remota(ruta_wp: str, archivo: str) -> str:
+    """Ruta remota de un log (las absolutas no dependen de la instalación)"""
+    if archivo.startswith('/'):
+        return archivo
+    return f"{ruta_wp.rstrip('/')}/{archivo}"
+
+
+class IncrementalLogFetcher:
+    """
+    Lee y analiza solo la parte nueva de cada log de una instalación.
+
+    El desplazamiento, el inodo y el tamaño de cada log se guardan en la
+    caché local. Si el inodo cambia o el archivo es más pequeño que el
+    desplazamiento guardado, el log se rotó y se lee desde el principio.
+    """
+
+    def __init__(self, transporte, archivo_estado: Optional[Path] = None):
+        self.transporte = transporte
+        self.archivo_estado = (
+            archivo_estado or transporte.archivo_estado('logs')
+        )
+        self.estado: Dict[str, Dict] = self._cargar_estado()
+
+    def obtener(
+        self, analizador: LogAnalyzer, archivos: Optional[List[str]] = None
+    ) -> Dict:
+        """
+        Analiza los bytes nuevos de cada log y actualiza los desplazamientos.
+
+        Returns:
+            Diccionario con los resultados del analizador, por log el rango
+            leído (desde, hasta), los bytes transferidos y si se detectó
+            rotación, y los errores de lectura por log (su desplazamiento no
+            avanza, así que se vuelven a leer en la siguiente ejecución)
+        """
+        archivos = archivos or ARCHIVOS_LOG
+        # Por SSH el inodo y el tamaño de todos los logs llegan en un solo
+        # viaje de ida y vuelta
+        stats = self.transporte.stats(archivos)
+
+        resultados = analizador.nuevo_resultado()
+        logs = {}
+        errores = {}
+        for archivo in archivos:
+            st = stats[archivo]
+            if st is None:
+                continue
+            inodo, tamano = st['inodo'], st['tamano']
+
+            previo = self.estado.get(archivo)
+            desde = previo['offset'] if previo else 0
+            rotado = bool(previo) and (
+                previo['inodo'] != inodo or tamano < desde
+            )
+            if rotado:
+                logging.info(
+                    f"Log rotado, se lee desde el principio: {archivo}"
+                )
+                desde = 0
+
+            analizados = 0
+            if tamano > desde:
+                try:
+                    _, analizados = analizador.analizar_flujo(
+                        self.transporte.leer_rango(archivo, desde, tamano),
+                        resultados,
+                        incluir_incompleta=False
+                    )
+                except Exception as e:
+                    logging.error(f"Error al leer {archivo}: {str(e)}")
+                    errores[archivo] = str(e)
+                    continue
+
+            self.estado[archivo] = {
+                'inodo': inodo, 'offset': desde + analizados, 'tamano': tamano
+            }
+            logs[archivo] = {
+                'desde': desde,
+                'hasta': desde + analizados,
+                'bytes': analizados,
+                'rotado': rotado
+            }
+            if analizados and self.transporte.ui:
+                self.transporte.ui.print_success(
+                    f"Log leído: {archivo} (+{analizados:,} bytes)"
+                )
+
+        self._guardar_estado()
+        return {'resultados': resultados, 'logs': logs, 'errores': errores}
+
+    def resumir_remoto(
+        self, analizador: LogAnalyzer, archivos: Optional[List[str]] = None
+    ) -> Dict:
+        """
+        Analiza los bytes nuevos de cada log junto a los propios logs.
+
+        Por SSH se envía log_fingerprint.py con los patrones del analizador
+        y solo vuelven los recuentos por huella, idénticos a los de
+        LogAnalyzer.resumir sobre los mismos bytes. Si el transporte no
+        puede analizar en origen (instalación local o servidor sin python3)
+        se leen los bytes nuevos y se resumen aquí.
+
+        Returns:
+            Diccionario con el resumen por huella, el rango leído de cada log,
+            el modo usado ('remoto' o 'local') y los bytes recibidos
+        """
+        archivos = archivos or ARCHIVOS_LOG
+        peticion = {
+            'patrones': analizador.patrones_error,
+            'archivos': [
+                {
+                    'nombre': archivo,
+                    'ruta': self.transporte.ruta(archivo),
+                    'desde': self.estado.get(archivo, {}).get('offset', 0),
+                    'inodo': self.estado.get(archivo, {}).get('inodo')
+                }
+                for archivo in archivos
+            ]
+        }
+        analisis = self.transporte.analizar_logs(peticion)
+        if analisis is None:
+            obtenido = self.obtener(analizador, archivos)
+            return {
+                'resumen': analizador.resumir(obtenido['resultados']),
+                'logs': obtenido['logs'],
+                'modo': 'local',
+                'bytes_recibidos': sum(
+                    log['bytes'] for log in obtenido['logs'].values()
+                ),
+                'errores': obtenido['errores']
+            }
+
+        respuesta, recibidos = analisis
+        logs = {}
+        for archivo, log in respuesta['logs'].items():
+            if 'error' in log:
+                continue
+            if log['rotado']:
+                logging.info(
+                    f"Log rotado, se lee desde el principio: {archivo}"
+                )
+            self.estado[archivo] = {
+                'inodo': log['inodo'],
+                'offset': log['hasta'],
+                'tamano': log['tamano']
+            }
+            logs[archivo] = {
+                clave: log[clave]
+                for clave in ('desde', 'hasta', 'bytes', 'rotado')
+            }
+            if log['bytes'] and self.transporte.ui:
+                self.transporte.ui.print_success(
+                    f"Log analizado en el servidor: {archivo} "
+                    f"(+{log['bytes']:,} bytes)"
+                )
+        self._guardar_estado()
+        return {
+            'resumen': respuesta['resumen'],
+            'logs': logs,
+            'modo': 'remoto',
+            'bytes_recibidos': recibidos
+        }
+
+    def reiniciar(self, archivo: Optional[str] = None):
+        """Olvida los desplazamientos guardados (de un log o de todos)"""
+        if archivo:
+            self.estado.pop(archivo, None)
+        else:
+            self.estado = {}
+        self._guardar_estado()
+
+    def _cargar_estado(self) -> Dict[str, Dict]:
+        try:
+            if self.archivo_estado.exists():
+                return json.loads(
+                    self.archivo_estado.read_text(encoding='utf-8')
+                )
+        except Exception as e:
+            logging.warning(f"Estado de logs descartado: {str(e)}")
+        return {}
+
+    def _guardar_estado(self):
+        try:
+            self.archivo_estado.parent.mkdir(parents=True, exist_ok=True)
+            self.archivo_estado.write_text(
+                json.dumps(self.estado), encoding='utf-8'
+            )
+        except OSError as e:
+            logging.error(f"Error al guardar estado de logs: {str(e)}")
@@ -0,0 +1,268 @@
+"""
+Copia local incremental de archivos remotos para analizarlos sin conexión.
+Se compara el manifiesto remoto con el de la última sincronización y solo
+se descargan, por SFTP con lecturas en paralelo, los archivos que cambiaron.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .scan_cache import directorio_espejo
+
+ARCHIVO_ESTADO = '.webgenesis-manifiesto.json'
+
+# Descargas simultáneas, cada una con su propio canal SFTP
+MAX_DESCARGAS = 4
+
+TAMANO_BLOQUE = 32768
+
+
+def mtime_ns(mtime: str) -> int:
+    """Convierte un mtime de `find -printf %T@` en nanosegundos sin pérdida"""
+    segundos, _, fraccion = mtime.partition('.')
+    return int(segundos) * 1_000_000_000 + int((fraccion + '000000000')[:9])
+
+
+class RemoteMirror:
+    """
+    Espejo local de una instalación remota.
+
+    El espejo reproduce la estructura de la instalación (wp-content/...) y
+    conserva el mtime remoto de cada archivo, de modo que los analizadores
+    locales pueden usarlo como raíz de WordPress y sus cachés por
+    (ruta, tamaño, mtime) siguen siendo válidas entre sincronizaciones.
+    """
+
+    def __init__(self, conector, destino: Optional[Path] = None):
+        self.conector = conector
+        config = conector.config
+        self.destino = Path(destino) if destino else directorio_espejo(
+            config.host, config.usuario, config.ruta_remota
+        )
+        self.archivo_estado = self.destino / ARCHIVO_ESTADO
+        self._local = threading.local()
+        self._canales: List = []
+        self._bloqueo = threading.Lock()
+        # Un SFTPClient de paramiko no admite peticiones desde varios hilos a
+        # la vez
+        self._bloqueo_compartido = threading.Lock()
+
+    def sincronizar(
+        self, ruta: str = 'wp-content', hashes: bool = False
+    ) -> Dict:
+        """
+        Descarga los archivos nuevos o modificados y borra los eliminados.
+
+        Con hashes=True un archivo con otro mtime pero el mismo MD5 no se
+        descarga; solo se actualiza su mtime local. Si el manifiesto remoto
+        falla se lanza OSError sin modificar nada; un manifiesto vacío de un
+        listado correcto vacía también el espejo.
+
+        Returns:
+            Diccionario con la raíz del espejo y el recuento de archivos
+            descargados, eliminados, sin cambios y con error
+        """
+        inicio = time.perf_counter()
+        relativa = ruta.strip('/')
+        remota = f"{self.conector.config.ruta_remota.rstrip('/')}/{relativa}"
+        manifiesto = self.conector.manifiesto_remoto(remota, hashes)
+        estado = self._cargar_estado()
+        anterior = estado.get(relativa, {})
+
+        pendientes, tocados = [], []
+        for archivo, info in manifiesto.items():
+            previo = anterior.get(archivo)
+            local = self.destino / relativa / archivo
+            if (
+                previo
+                and previo['tamano'] == info['tamano']
+                and self._coincide_local(local, previo)
+            ):
+                if previo['mtime'] == info['mtime']:
+                    continue
+                md5 = info.get('md5')
+                if hashes and md5 and previo.get('md5') == md5:
+                    tocados.append(archivo)
+                    continue
+            pendientes.append(archivo)
+
+        eliminados = [
+            archivo for archivo in anterior if archivo not in manifiesto
+        ]
+        for archivo in eliminados:
+            try:
+                (self.destino / relativa / archivo).unlink()
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logging.warning(
+                    f"No se pudo eliminar {archivo} del espejo: {str(e)}"
+                )
+
+        for archivo in tocados:
+            mtime = mtime_ns(manifiesto[archivo]['mtime'])
+            os.utime(self.destino / relativa / archivo, ns=(mtime, mtime))
+
+        errores = {}
+        bytes_descargados = 0
+        if pendientes:
+            self.conector.ui.print_step(
+                f"Descargando {len(pendientes)} archivos al espejo..."
+            )
+            hilos = min(MAX_DESCARGAS, len(pendientes))
+            try:
+                with ThreadPoolExecutor(max_workers=hilos) as executor:
+                    resultados = list(executor.map(
+                        lambda archivo: self._descargar(
+                            f"{remota}/{archivo}",
+                            self.destino / relativa / archivo,
+                            manifiesto[archivo]
+                        ),
+                        pendientes
+                    ))
+            finally:
+                self._cerrar_canales()
+            for archivo, error in zip(pendientes, resultados):
+                if error:
+                    errores[archivo] = error
+                else:
+                    bytes_descargados += manifiesto[archivo]['tamano']
+
+        # Los archivos que fallaron conservan su entrada anterior y se
+        # reintentan en la próxima pasada
+        estado[relativa] = {
+            archivo: anterior[archivo] if archivo in errores else info
+            for archivo, info in manifiesto.items()
+            if archivo not in errores or archivo in anterior
+        }
+        self._guardar_estado(estado)
+
+        resultado = {
+            'raiz': str(self.destino),
+            'archivos': len(manifiesto),
+            'descargados': len(pendientes) - len(errores),
+            'actualizados': len(tocados),
+            'eliminados': len(eliminados),
+            'sin_cambios': len(manifiesto) - len(pendientes) - len(tocados),
+            'bytes': bytes_descargados,
+            'errores': errores,
+            'segundos': round(time.perf_counter() - inicio, 3)
+        }
+        self.conector.ui.print_success(
+            f"Espejo actualizado: {resultado['descargados']} descargados, "
+            f"{resultado['eliminados']} eliminados, "
+            f"{resultado['sin_cambios']} sin cambios"
+        )
+        return resultado
+
+    @staticmethod
+    def _coincide_local(local: Path, info: Dict) -> bool:
+        """Comprueba que la copia local siga siendo la que se descargó"""
+        try:
+            st = local.stat()
+        except OSError:
+            return False
+        return (
+            st.st_size == info['tamano']
+            and st.st_mtime_ns == mtime_ns(info['mtime'])
+        )
+
+    def _sftp(self):
+        """
+        Canal SFTP propio del hilo actual y el bloqueo que exige, si es
+        compartido.
+        """
+        sftp = getattr(self._local, 'sftp', None)
+        if sftp is None:
+            try:
+                sftp = self.conector.ssh.open_sftp()
+            except Exception as e:
+                # El servidor no admite más canales: se usa el SFTP del
+                # conector, de uno en uno
+                if self.conector.sftp is None:
+                    raise
+                logging.info(
+                    "Canal SFTP rechazado, se comparte el del conector: "
+                    f"{str(e)}"
+                )
+                self._local.sftp = self.conector.sftp
+                self._local.bloqueo = self._bloqueo_compartido
+                return self._local.sftp, self._local.bloqueo
+            self._local.sftp = sftp
+            self._local.bloqueo = None
+            with self._bloqueo:
+                self._canales.append(sftp)
+        return sftp, self._local.bloqueo
+
+    def _cerrar_canales(self):
+        with self._bloqueo:
+            for sftp in self._canales:
+                try:
+                    sftp.close()
+                except Exception as e:
+                    logging.warning(f"Error al cerrar canal SFTP: {str(e)}")
+            self._canales = []
+        self._local = threading.local()
+
+    def _descargar(
+        self, remota: str, local: Path, info: Dict
+    ) -> Optional[str]:
+        """
+        Descarga un archivo con lecturas anticipadas; devuelve el error o
+        None.
+        """
+        temporal = local.with_name(f".{local.name}.wg-parcial")
+        try:
+            local.parent.mkdir(parents=True, exist_ok=True)
+            sftp, bloqueo = self._sftp()
+            with bloqueo or nullcontext(), sftp.open(remota, 'rb') as origen:
+                with open(temporal, 'wb') as copia:
+                    # prefetch envía todas las peticiones de lectura sin
+                    # esperar a cada respuesta
+                    origen.prefetch(info['tamano'])
+                    # Se lee el tamaño exacto del manifiesto para no pedir un
+                    # bloque extra solo para ver el EOF
+                    restante = info['tamano']
+                    while restante > 0:
+                        datos = origen.read(min(TAMANO_BLOQUE, restante))
+                        if not datos:
+                            break
+                        copia.write(datos)
+                        restante -= len(datos)
+            mtime = mtime_ns(info['mtime'])
+            os.utime(temporal, ns=(mtime, mtime))
+            os.replace(temporal, local)
+            return None
+        except Exception as e:
+            logging.error(f"Error al descargar {remota}: {str(e)}")
+            try:
+                temporal.unlink()
+            except OSError:
+                pass
+            return str(e)
+
+    def _cargar_estado(self) -> Dict[str, Dict]:
+        try:
+            if self.archivo_estado.exists():
+                return json.loads(
+                    self.archivo_estado.read_text(encoding='utf-8')
+                )
+        except Exception as e:
+            logging.warning(f"Manifiesto del espejo descartado: {str(e)}")
+        return {}
+
+    def _guardar_estado(self, estado: Dict[str, Dict]):
+        try:
+            self.destino.mkdir(parents=True, exist_ok=True)
+            self.archivo_estado.write_text(
+                json.dumps(estado), encoding='utf-8'
+            )
+        except OSError as e:
+            logging.error(f"Error al guardar manifiesto del espejo: {str(e)}")
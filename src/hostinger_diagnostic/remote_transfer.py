@@ -0,0 +1,213 @@
+"""
+Transferencia comprimida de la salida de comandos remotos.
+La salida se comprime en el servidor (zstd o gzip) y se descomprime en
+flujo localmente; si no hay compresor disponible se transfiere sin comprimir.
+"""
+
+import select
+import socket
+import time
+import zlib
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Orden de preferencia y nivel por defecto de cada códec
+CODECS = {
+    'zstd': {'comando': 'zstd -q -c -{nivel}', 'nivel': 3},
+    'gzip': {'comando': 'gzip -c -{nivel}', 'nivel': 1},
+}
+
+TAMANO_BLOQUE = 65536
+
+# El estado de una tubería es el del compresor: el del comando se envía por
+# stderr tras esta marca
+MARCA_CODIGO = '@@WG codigo '
+
+
+def codecs_locales() -> list:
+    """
+    Códecs que se pueden descomprimir en esta máquina, por orden de
+    preferencia.
+    """
+    return [
+        codec for codec in CODECS
+        if codec != 'zstd' or zstandard is not None
+    ]
+
+
+def comando_comprimido(
+    comando: str, codec: Optional[str], nivel: Optional[int] = None
+) -> str:
+    """Añade la compresión remota a un comando de shell"""
+    if not codec:
+        return comando
+    nivel = nivel if nivel is not None else CODECS[codec]['nivel']
+    compresor = CODECS[codec]['comando'].format(nivel=nivel)
+    return (
+        f"( ( {comando} ); echo \"{MARCA_CODIGO}$?\" >&2 ) | {compresor}"
+    )
+
+
+def separar_codigo(error: str) -> Tuple[Optional[int], str]:
+    """
+    Extrae de stderr el código que añade comando_comprimido y devuelve
+    (código, resto).
+    """
+    lineas = error.split('\n')
+    for i in range(len(lineas) - 1, -1, -1):
+        if lineas[i].startswith(MARCA_CODIGO):
+            try:
+                codigo = int(lineas[i][len(MARCA_CODIGO):])
+            except ValueError:
+                break
+            return codigo, '\n'.join(lineas[:i] + lineas[i + 1:])
+    return None, error
+
+
+def recibir(canal) -> Iterator[Tuple[bytes, bytes]]:
+    """
+    Lee a la vez stdout y stderr de un canal SSH y devuelve (salida, error)
+    por bloques.
+
+    Leer un flujo entero antes que el otro puede bloquearse: si el comando
+    llena la ventana del que no se está leyendo, deja de escribir en ambos.
+    """
+    while True:
+        # El EOF llega después de todos los datos: si ya estaba y no queda
+        # nada, se terminó
+        fin = canal.eof_received or canal.closed
+        salida = error = b''
+        if canal.recv_ready():
+            salida = canal.recv(TAMANO_BLOQUE)
+        if canal.recv_stderr_ready():
+            error = canal.recv_stderr(TAMANO_BLOQUE)
+        if salida or error:
+            yield salida, error
+        elif fin:
+            return
+        elif not select.select([canal], [], [], canal.gettimeout())[0]:
+            raise socket.timeout(
+                "Tiempo de espera agotado leyendo el canal SSH"
+            )
+
+
+def leer_canal(canal) -> Tuple[bytes, bytes]:
+    """Salida y error completos de un canal SSH, leídos a la vez"""
+    salida, error = bytearray(), bytearray()
+    for bloque, bloque_error in recibir(canal):
+        salida += bloque
+        error += bloque_error
+    return bytes(salida), bytes(error)
+
+
+def _descompresor(codec: Optional[str]):
+    """Objeto con decompress()/flush() para descomprimir por fragmentos"""
+    if codec == 'gzip':
+        return zlib.decompressobj(16 + zlib.MAX_WBITS)
+    if codec == 'zstd':
+        return zstandard.ZstdDecompressor().decompressobj()
+    return None
+
+
+class FlujoComprimido:
+    """
+    Salida descomprimida de un comando remoto, leída por bloques de un
+    canal SSH.
+
+    Al terminar de iterar, estadisticas() devuelve los bytes transferidos,
+    los bytes descomprimidos, la relación de compresión y el rendimiento
+    efectivo (bytes útiles por segundo). Si el comando o el compresor
+    terminan con error, la iteración acaba lanzando OSError con su stderr.
+    """
+
+    def __init__(
+        self,
+        canal,
+        codec: Optional[str],
+        al_terminar: Optional[Callable[[Dict], None]] = None,
+        comando: str = ''
+    ):
+        self.canal = canal
+        self.codec = codec
+        self.comando = comando
+        self.al_terminar = al_terminar
+        self.bytes_transferidos = 0
+        self.bytes_descomprimidos = 0
+        self.segundos = 0.0
+        self.codigo: Optional[int] = None
+        self.error = ''
+
+    def __iter__(self) -> Iterator[bytes]:
+        inicio = time.perf_counter()
+        descompresor = _descompresor(self.codec)
+        error = bytearray()
+        try:
+            for datos, bloque_error in recibir(self.canal):
+                error += bloque_error
+                if not datos:
+                    continue
+                self.bytes_transferidos += len(datos)
+                if descompresor is not None:
+                    datos = descompresor.decompress(datos)
+                if datos:
+                    self.bytes_descomprimidos += len(datos)
+                    yield datos
+            if descompresor is not None and hasattr(descompresor, 'flush'):
+                resto = descompresor.flush()
+                if resto:
+                    self.bytes_descomprimidos += len(resto)
+                    yield resto
+            codigo_comando, self.error = separar_codigo(
+                error.decode('utf-8', errors='replace')
+            )
+            self.codigo = self.canal.recv_exit_status()
+            if codigo_comando:
+                self.codigo = codigo_comando
+        finally:
+            self.canal.close()
+            self.segundos = time.perf_counter() - inicio
+            if self.al_terminar is not None:
+                self.al_terminar(self.estadisticas())
+        if self.codigo != 0:
+            raise OSError(
+                f"'{self.comando}' terminó con código {self.codigo}: "
+                f"{self.error.strip() or 'sin salida de error'}"
+            )
+
+    def estadisticas(self) -> Dict:
+        """Relación de compresión y rendimiento de la transferencia"""
+        descomprimidos = self.bytes_descomprimidos
+        return {
+            'codec': self.codec or 'ninguno',
+            'bytes_transferidos': self.bytes_transferidos,
+            'bytes': descomprimidos,
+            'ratio': round(descomprimidos / self.bytes_transferidos, 2)
+            if self.bytes_transferidos else 0.0,
+            'segundos': round(self.segundos, 3),
+            'mb_por_segundo': round(descomprimidos / self.segundos / 1e6, 2)
+            if self.segundos else 0.0
+        }
+
+
+def acumular_estadisticas(totales: Dict[str, Dict], estadisticas: Dict):
+    """Suma una transferencia a los totales por códec"""
+    total = totales.setdefault(estadisticas['codec'], {
+        'transferencias': 0,
+        'bytes_transferidos': 0,
+        'bytes': 0,
+        'segundos': 0.0
+    })
+    total['transferencias'] += 1
+    total['bytes_transferidos'] += estadisticas['bytes_transferidos']
+    total['bytes'] += estadisticas['bytes']
+    total['segundos'] = round(total['segundos'] + estadisticas['segundos'], 3)
+    total['ratio'] = round(
+        total['bytes'] / total['bytes_transferidos'], 2
+    ) if total['bytes_transferidos'] else 0.0
+    total['mb_por_segundo'] = round(
+        total['bytes'] / total['segundos'] / 1e6, 2
+    ) if total['segundos'] else 0.0
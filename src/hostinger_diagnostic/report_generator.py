@@ -2,6 +2,7 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict
 from ..utils.ui_helper import UIHelper
+from .hook_inventory import formatear_tabla_hooks
 
 class ReportGenerator:
     def __init__(self, ui: UIHelper):
@@ -30,6 +31,12 @@ class ReportGenerator:
                 "\n## Recomendaciones",
                 *[f"- {r}" for r in diagnostico.get('recomendaciones', [])]
             ]
+
+            if diagnostico.get('hooks'):
+                contenido.extend([
+                    "\n## Hooks Registrados",
+                    *formatear_tabla_hooks(diagnostico['hooks']['por_hook'])
+                ])
             
             report_path.write_text('\n'.join(contenido), encoding='utf-8')
             self.ui.print_success(f"Reporte generado en: {report_path}")
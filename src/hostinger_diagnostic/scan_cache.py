@@ -0,0 +1,187 @@
+"""
+Caché persistente de resultados de análisis por archivo.
+Evita volver a analizar archivos que no cambiaron entre diagnósticos.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional
+
+DIRECTORIO_CACHE = Path.home() / '.modulo_webgenesis' / 'cache'
+
+
+def huella_contenido(contenido: bytes) -> str:
+    """Calcula la huella de contenido usada como respaldo de la caché"""
+    return hashlib.blake2b(contenido, digest_size=16).hexdigest()
+
+
+def _clave(texto: str) -> str:
+    """Clave corta y estable para nombrar archivos de caché"""
+    return hashlib.sha1(texto.encode('utf-8')).hexdigest()[:12]
+
+
+def ruta_cache(raiz: Path, nombre: str) -> Path:
+    """Devuelve la ruta del archivo de caché para una raíz y un nombre"""
+    clave = _clave(str(Path(raiz).resolve()))
+    return DIRECTORIO_CACHE / f"{nombre}-{clave}.json"
+
+
+def ruta_cache_remota(host: str, usuario: str, ruta: str, nombre: str) -> Path:
+    """Devuelve la ruta del archivo de caché para una instalación remota"""
+    clave = _clave(f"{usuario}@{host}:{ruta}")
+    return DIRECTORIO_CACHE / f"{nombre}-{clave}.json"
+
+
+def directorio_espejo(host: str, usuario: str, ruta: str) -> Path:
+    """Directorio de la copia local de una instalación remota"""
+    return DIRECTORIO_CACHE / 'espejos' / _clave(f"{usuario}@{host}:{ruta}")
+
+
+class ScanCache:
+    """
+    Caché de hallazgos por archivo indexada por (ruta, tamaño, mtime_ns).
+
+    Si el tamaño y el mtime no coinciden se compara la huella del contenido,
+    de modo que un archivo tocado pero no modificado no se vuelve a analizar.
+    Los datos se guardan una sola vez por huella de contenido.
+    """
+
+    def __init__(self, archivo: Path, version: str = '1'):
+        self.archivo = archivo
+        self.version = version
+        self._entradas: Dict[str, list] = {}
+        self._datos: Dict[str, Any] = {}
+        self._vistos = set()
+        self.aciertos = 0
+        self.aciertos_hash = 0
+        self.fallos = 0
+        self.evictados = 0
+        self._cargar()
+
+    @classmethod
+    def para_raiz(
+        cls, raiz: Path, espacio: str, version: str = '1'
+    ) -> 'ScanCache':
+        """Crea la caché de un espacio de análisis para una raíz WordPress"""
+        return cls(ruta_cache(raiz, espacio), version)
+
+    def _cargar(self):
+        """Carga la caché desde disco si existe y es de la misma versión"""
+        try:
+            if not self.archivo.exists():
+                return
+            contenido = json.loads(self.archivo.read_text(encoding='utf-8'))
+            if contenido.get('version') != self.version:
+                return
+            self._entradas = contenido.get('entradas', {})
+            self._datos = contenido.get('datos', {})
+        except Exception as e:
+            logging.warning(
+                f"Caché de análisis descartada ({self.archivo}): {str(e)}"
+            )
+            self._entradas, self._datos = {}, {}
+
+    def consultar(self, ruta: Path, st: os.stat_result) -> Optional[Any]:
+        """Datos de un archivo si no cambiaron su tamaño ni su mtime"""
+        clave = str(ruta)
+        self._vistos.add(clave)
+        entrada = self._entradas.get(clave)
+        if (
+            entrada
+            and entrada[0] == st.st_size
+            and entrada[1] == st.st_mtime_ns
+            and entrada[2] in self._datos
+        ):
+            self.aciertos += 1
+            return self._datos[entrada[2]]
+        return None
+
+    def por_huella(self, huella: str) -> Optional[Any]:
+        """Devuelve los datos guardados para una huella de contenido"""
+        return self._datos.get(huella)
+
+    def registrar(
+        self,
+        ruta: Path,
+        st: os.stat_result,
+        huella: str,
+        datos: Any,
+        analizado: bool = True
+    ):
+        """Registra los datos de un archivo que no estaba en la caché"""
+        if analizado:
+            self.fallos += 1
+        else:
+            self.aciertos_hash += 1
+        self._vistos.add(str(ruta))
+        self._entradas[str(ruta)] = [st.st_size, st.st_mtime_ns, huella]
+        self._datos[huella] = datos
+
+    def obtener(
+        self,
+        ruta: Path,
+        analizar: Callable[[bytes], Any],
+        st: Optional[os.stat_result] = None
+    ) -> Any:
+        """Devuelve los hallazgos de un archivo, analizándolo solo si cambió"""
+        st = st or os.stat(ruta)
+        datos = self.consultar(ruta, st)
+        if datos is not None:
+            return datos
+
+        contenido = Path(ruta).read_bytes()
+        huella = huella_contenido(contenido)
+        datos = self.por_huella(huella)
+        analizado = datos is None
+        if analizado:
+            datos = analizar(contenido)
+        self.registrar(ruta, st, huella, datos, analizado)
+        return datos
+
+    def evictar(self, vistos: Optional[Iterable[str]] = None) -> int:
+        """Quita las entradas de archivos que ya no existen o no se vieron"""
+        vistos = set(vistos) if vistos is not None else self._vistos
+        ausentes = [clave for clave in self._entradas if clave not in vistos]
+        for clave in ausentes:
+            del self._entradas[clave]
+
+        referenciadas = {entrada[2] for entrada in self._entradas.values()}
+        for huella in [h for h in self._datos if h not in referenciadas]:
+            del self._datos[huella]
+
+        self.evictados += len(ausentes)
+        return len(ausentes)
+
+    def guardar(self):
+        """Persiste la caché en disco de forma atómica"""
+        try:
+            self.archivo.parent.mkdir(parents=True, exist_ok=True)
+            temporal = self.archivo.with_suffix('.tmp')
+            temporal.write_text(
+                json.dumps({
+                    'version': self.version,
+                    'entradas': self._entradas,
+                    'datos': self._datos
+                }, separators=(',', ':')),
+                encoding='utf-8'
+            )
+            os.replace(temporal, self.archivo)
+        except Exception as e:
+            logging.error(f"Error al guardar caché de análisis: {str(e)}")
+
+    def estadisticas(self) -> Dict:
+        """Devuelve métricas de uso de la caché"""
+        consultas = self.aciertos + self.aciertos_hash + self.fallos
+        return {
+            'archivos': consultas,
+            'aciertos': self.aciertos,
+            'aciertos_hash': self.aciertos_hash,
+            'analizados': self.fallos,
+            'evictados': self.evictados,
+            'ratio_aciertos': round(
+                (self.aciertos + self.aciertos_hash) / consultas, 3
+            ) if consultas else 0.0
+        }
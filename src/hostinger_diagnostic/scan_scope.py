@@ -0,0 +1,181 @@
+"""
+Alcance de los escaneos de código: patrones de inclusión y exclusión con
+poda temprana de directorios y presupuestos por raíz de escaneo.
+"""
+
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+# Directorios que nunca contienen código relevante para el análisis
+EXCLUSIONES_POR_DEFECTO = [
+    'wp-content/uploads',
+    'wp-content/upgrade',
+    'wp-content/cache',
+    'wp-content/updraft',
+    'wp-content/ai1wm-backups',
+    'node_modules',
+    'vendor',
+    'bower_components',
+    '.git',
+    '.svn',
+    'cache',
+    '*-cache',
+    '*backup*',
+    '*.bak',
+]
+
+
+@dataclass
+class ScanScope:
+    """Configuración del alcance de un escaneo"""
+    incluir: List[str] = field(default_factory=lambda: ['*.php'])
+    excluir: List[str] = field(
+        default_factory=lambda: list(EXCLUSIONES_POR_DEFECTO)
+    )
+    max_archivos: Optional[int] = 20000
+    max_bytes: Optional[int] = 256 * 1024 * 1024
+    max_segundos: Optional[float] = 60.0
+
+    def con_inclusiones(self, *patrones: str) -> 'ScanScope':
+        """Devuelve una copia del alcance con otros patrones de inclusión"""
+        return ScanScope(
+            incluir=list(patrones),
+            excluir=list(self.excluir),
+            max_archivos=self.max_archivos,
+            max_bytes=self.max_bytes,
+            max_segundos=self.max_segundos
+        )
+
+    def excluye(self, relativa: str, nombre: str) -> bool:
+        """
+        Indica si un directorio debe podarse.
+
+        relativa es la ruta respecto a la base del recorrido, de modo que
+        patrones como 'wp-content/uploads' se anclan a la raíz de WordPress.
+        """
+        return any(
+            fnmatch(nombre, patron) or fnmatch(relativa, patron)
+            for patron in self.excluir
+        )
+
+    def incluye(self, relativa: str, nombre: str) -> bool:
+        """Indica si un archivo entra en el escaneo"""
+        return any(
+            fnmatch(nombre, patron) or fnmatch(relativa, patron)
+            for patron in self.incluir
+        )
+
+    def recorrer(
+        self, raiz: Path, base: Optional[Path] = None
+    ) -> 'RecorridoEscaneo':
+        """
+        Crea un recorrido de la raíz dentro de este alcance.
+
+        Con base (la raíz de WordPress) los patrones se comparan con la ruta
+        relativa a ella y no a la raíz del escaneo.
+        """
+        return RecorridoEscaneo(Path(raiz), self, base)
+
+
+class RecorridoEscaneo:
+    """
+    Recorrido de una raíz de escaneo que poda directorios excluidos antes de
+    descender en ellos y se detiene al agotar cualquiera de los presupuestos.
+    """
+
+    def __init__(
+        self, raiz: Path, alcance: ScanScope, base: Optional[Path] = None
+    ):
+        self.raiz = raiz
+        self.alcance = alcance
+        self.base = base
+        self.archivos = 0
+        self.bytes = 0
+        self.directorios_podados = 0
+        self.truncado = False
+        self.motivo = None
+        self.segundos = 0.0
+
+    def __iter__(self) -> Iterator[Tuple[Path, os.stat_result]]:
+        inicio = time.monotonic()
+        prefijo = ''
+        if self.base is not None and self.raiz != self.base:
+            prefijo = self.raiz.relative_to(self.base).as_posix()
+        pendientes = [(self.raiz, prefijo)]
+        try:
+            while pendientes:
+                directorio, relativa = pendientes.pop()
+                try:
+                    entradas = sorted(
+                        os.scandir(directorio), key=lambda e: e.name
+                    )
+                except OSError as e:
+                    logging.warning(f"No se pudo leer {directorio}: {str(e)}")
+                    continue
+
+                subdirectorios = []
+                for entrada in entradas:
+                    nombre = entrada.name
+                    ruta_relativa = (
+                        f"{relativa}/{nombre}" if relativa else nombre
+                    )
+                    if entrada.is_dir(follow_symlinks=False):
+                        if self.alcance.excluye(ruta_relativa, nombre):
+                            self.directorios_podados += 1
+                        else:
+                            subdirectorios.append(
+                                (Path(entrada.path), ruta_relativa)
+                            )
+                        continue
+                    if (
+                        not entrada.is_file()
+                        or not self.alcance.incluye(ruta_relativa, nombre)
+                    ):
+                        continue
+
+                    motivo = self._presupuesto_agotado(inicio)
+                    if motivo:
+                        self.truncado, self.motivo = True, motivo
+                        logging.warning(
+                            f"Escaneo de {self.raiz} truncado: {motivo}"
+                        )
+                        return
+
+                    st = entrada.stat()
+                    self.archivos += 1
+                    self.bytes += st.st_size
+                    yield Path(entrada.path), st
+
+                pendientes.extend(reversed(subdirectorios))
+        finally:
+            self.segundos = time.monotonic() - inicio
+
+    def _presupuesto_agotado(self, inicio: float) -> Optional[str]:
+        """Devuelve el presupuesto agotado, si lo hay"""
+        alcance = self.alcance
+        maximo = alcance.max_archivos
+        if maximo is not None and self.archivos >= maximo:
+            return f"máximo de {maximo} archivos"
+        if alcance.max_bytes is not None and self.bytes >= alcance.max_bytes:
+            return f"máximo de {alcance.max_bytes} bytes"
+        maximo = alcance.max_segundos
+        if maximo is not None and time.monotonic() - inicio >= maximo:
+            return f"máximo de {maximo} segundos"
+        return None
+
+    def resumen(self) -> dict:
+        """Devuelve las métricas del recorrido"""
+        return {
+            'raiz': str(self.raiz),
+            'archivos': self.archivos,
+            'bytes': self.bytes,
+            'directorios_podados': self.directorios_podados,
+            'segundos': round(self.segundos, 3),
+            'truncado': self.truncado,
+            'motivo': self.motivo
+        }
@@ -0,0 +1,307 @@
+"""
+Pool de conexiones SSH reutilizables entre diagnósticos y sitios.
+Evita repetir el handshake TCP, el intercambio de claves y la autenticación
+cada vez que se abre una sesión con el mismo servidor.
+"""
+
+import atexit
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    import paramiko
+except ImportError:
+    raise ImportError(
+        "El módulo 'paramiko' es necesario para conexiones SSH. "
+        "Instálelo con: pip install paramiko"
+    )
+
+ClavePool = Tuple[str, str, int]
+
+
+@dataclass(eq=False)
+class ConexionPool:
+    """Conexión SSH gestionada por el pool"""
+    clave: ClavePool
+    cliente: Optional[paramiko.SSHClient]
+    creada: float = field(default_factory=time.monotonic)
+    ultimo_uso: float = field(default_factory=time.monotonic)
+    usos: int = 0
+    en_uso: bool = False
+
+
+class SSHConnectionPool:
+    """
+    Pool de clientes paramiko indexado por (host, usuario, puerto).
+
+    Las conexiones se prestan en exclusiva y se devuelven al terminar. Antes
+    de prestar una conexión ociosa se comprueba que el transporte siga activo
+    y, si lleva tiempo sin usarse, se sondea con un paquete de control. Las
+    conexiones ociosas durante más de ``inactividad_max`` segundos se cierran.
+    """
+
+    def __init__(
+        self,
+        max_por_host: int = 4,
+        inactividad_max: float = 300.0,
+        keepalive: int = 30,
+        timeout: float = 10.0,
+        verificar_tras: float = 60.0
+    ):
+        self.max_por_host = max_por_host
+        self.inactividad_max = inactividad_max
+        self.keepalive = keepalive
+        self.timeout = timeout
+        self.verificar_tras = verificar_tras
+        self._conexiones: Dict[ClavePool, List[ConexionPool]] = {}
+        self._prestadas: Dict[int, ConexionPool] = {}
+        self._condicion = threading.Condition()
+        self._metricas = {
+            'prestamos': 0,
+            'reutilizadas': 0,
+            'creadas': 0,
+            'fallos_conexion': 0,
+            'descartadas_salud': 0,
+            'evictadas': 0,
+            'esperas': 0,
+            'segundos_conexion': 0.0,
+            'max_segundos_conexion': 0.0
+        }
+
+    def obtener(
+        self,
+        host: str,
+        usuario: str,
+        password: Optional[str] = None,
+        puerto: int = 22,
+        espera_max: Optional[float] = None
+    ) -> paramiko.SSHClient:
+        """
+        Presta un cliente conectado, reutilizando uno ocioso si lo hay.
+
+        Si el host ya tiene ``max_por_host`` conexiones en uso se espera a
+        que se devuelva alguna (hasta ``espera_max`` segundos).
+        """
+        clave = (host, usuario, puerto)
+        if espera_max is None:
+            espera_max = self.timeout * 3
+        limite = time.monotonic() + espera_max
+        with self._condicion:
+            self._metricas['prestamos'] += 1
+            self._evictar_inactivas()
+            while True:
+                conexion = self._ociosa_sana(clave)
+                if conexion is not None:
+                    self._metricas['reutilizadas'] += 1
+                    return self._prestar(conexion)
+                if self._abiertas_host(host) < self.max_por_host:
+                    break
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    raise TimeoutError(
+                        f"Sin conexiones SSH libres para {host} "
+                        f"(máximo {self.max_por_host})"
+                    )
+                self._metricas['esperas'] += 1
+                self._condicion.wait(restante)
+            # Se reserva el hueco antes de conectar para no superar el máximo
+            # por host
+            reserva = ConexionPool(clave, None, en_uso=True)
+            self._conexiones.setdefault(clave, []).append(reserva)
+
+        try:
+            cliente = self._conectar(host, usuario, password, puerto)
+        except Exception:
+            with self._condicion:
+                conexiones = self._conexiones.get(clave, [])
+                if reserva in conexiones:
+                    conexiones.remove(reserva)
+                if not conexiones:
+                    self._conexiones.pop(clave, None)
+                self._metricas['fallos_conexion'] += 1
+                self._condicion.notify()
+            raise
+
+        with self._condicion:
+            reserva.cliente = cliente
+            reserva.creada = time.monotonic()
+            return self._prestar(reserva)
+
+    def devolver(self, cliente: paramiko.SSHClient, descartar: bool = False):
+        """Devuelve un cliente al pool; con descartar=True se cierra"""
+        with self._condicion:
+            conexion = self._prestadas.pop(id(cliente), None)
+            if conexion is None:
+                return
+            conexion.en_uso = False
+            conexion.ultimo_uso = time.monotonic()
+            if descartar or not self._activa(conexion):
+                self._cerrar(conexion)
+            self._condicion.notify()
+
+    @contextmanager
+    def prestar(
+        self,
+        host: str,
+        usuario: str,
+        password: Optional[str] = None,
+        puerto: int = 22
+    ) -> Iterator[paramiko.SSHClient]:
+        """Presta un cliente durante un bloque with y lo devuelve al salir"""
+        cliente = self.obtener(host, usuario, password, puerto)
+        descartar = False
+        try:
+            yield cliente
+        except (paramiko.SSHException, OSError):
+            descartar = True
+            raise
+        finally:
+            self.devolver(cliente, descartar)
+
+    def evictar_inactivas(self) -> int:
+        """Cierra las conexiones ociosas más de inactividad_max segundos"""
+        with self._condicion:
+            return self._evictar_inactivas()
+
+    def cerrar_todo(self):
+        """Cierra todas las conexiones del pool, incluidas las prestadas"""
+        with self._condicion:
+            for conexiones in list(self._conexiones.values()):
+                for conexion in list(conexiones):
+                    if conexion.cliente is not None:
+                        self._cerrar(conexion)
+            self._prestadas.clear()
+            self._condicion.notify_all()
+
+    def metricas(self) -> Dict:
+        """Tasa de reutilización, tiempos de conexión y estado del pool"""
+        with self._condicion:
+            metricas = dict(self._metricas)
+            creadas = metricas['creadas']
+            for clave in ('segundos_conexion', 'max_segundos_conexion'):
+                metricas[clave] = round(metricas[clave], 4)
+            metricas['ratio_aciertos'] = round(
+                metricas['reutilizadas'] / metricas['prestamos'], 3
+            ) if metricas['prestamos'] else 0.0
+            metricas['media_segundos_conexion'] = round(
+                metricas['segundos_conexion'] / creadas, 4
+            ) if creadas else 0.0
+            metricas['abiertas'] = sum(
+                len(c) for c in self._conexiones.values()
+            )
+            metricas['en_uso'] = len(self._prestadas)
+            return metricas
+
+    def _conectar(
+        self, host: str, usuario: str, password: Optional[str], puerto: int
+    ) -> paramiko.SSHClient:
+        """Abre una conexión nueva y registra cuánto tardó"""
+        inicio = time.perf_counter()
+        cliente = paramiko.SSHClient()
+        cliente.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        cliente.connect(
+            hostname=host,
+            port=puerto,
+            username=usuario,
+            password=password,
+            timeout=self.timeout
+        )
+        transporte = cliente.get_transport()
+        if transporte is not None and self.keepalive:
+            transporte.set_keepalive(self.keepalive)
+        duracion = time.perf_counter() - inicio
+        with self._condicion:
+            self._metricas['creadas'] += 1
+            self._metricas['segundos_conexion'] += duracion
+            self._metricas['max_segundos_conexion'] = max(
+                self._metricas['max_segundos_conexion'], duracion
+            )
+        logging.info(
+            f"Conexión SSH abierta con {usuario}@{host}:{puerto} "
+            f"en {duracion:.3f}s"
+        )
+        return cliente
+
+    def _prestar(self, conexion: ConexionPool) -> paramiko.SSHClient:
+        conexion.en_uso = True
+        conexion.usos += 1
+        self._prestadas[id(conexion.cliente)] = conexion
+        return conexion.cliente
+
+    def _ociosa_sana(self, clave: ClavePool) -> Optional[ConexionPool]:
+        """Devuelve la conexión ociosa usada más recientemente que siga viva"""
+        ociosas = sorted(
+            (c for c in self._conexiones.get(clave, []) if not c.en_uso),
+            key=lambda c: c.ultimo_uso,
+            reverse=True
+        )
+        for conexion in ociosas:
+            inactiva = time.monotonic() - conexion.ultimo_uso
+            if self._activa(conexion, sondear=inactiva > self.verificar_tras):
+                return conexion
+            self._metricas['descartadas_salud'] += 1
+            self._cerrar(conexion)
+        return None
+
+    def _activa(self, conexion: ConexionPool, sondear: bool = False) -> bool:
+        """Comprueba que el transporte siga activo; opcionalmente lo sondea"""
+        transporte = None
+        if conexion.cliente is not None:
+            transporte = conexion.cliente.get_transport()
+        if transporte is None or not transporte.is_active():
+            return False
+        if sondear:
+            try:
+                transporte.send_ignore()
+            except (paramiko.SSHException, OSError, EOFError):
+                return False
+        return True
+
+    def _abiertas_host(self, host: str) -> int:
+        return sum(
+            len(conexiones)
+            for clave, conexiones in self._conexiones.items()
+            if clave[0] == host
+        )
+
+    def _evictar_inactivas(self) -> int:
+        ahora = time.monotonic()
+        evictadas = 0
+        for conexiones in list(self._conexiones.values()):
+            for conexion in list(conexiones):
+                inactiva = ahora - conexion.ultimo_uso
+                if not conexion.en_uso and inactiva > self.inactividad_max:
+                    self._cerrar(conexion)
+                    evictadas += 1
+        self._metricas['evictadas'] += evictadas
+        return evictadas
+
+    def _cerrar(self, conexion: ConexionPool):
+        """Cierra una conexión y la quita del pool"""
+        conexiones = self._conexiones.get(conexion.clave, [])
+        if conexion in conexiones:
+            conexiones.remove(conexion)
+        if not conexiones:
+            self._conexiones.pop(conexion.clave, None)
+        try:
+            conexion.cliente.close()
+        except Exception as e:
+            logging.warning(f"Error al cerrar conexión SSH: {str(e)}")
+
+
+_pool_compartido: Optional[SSHConnectionPool] = None
+_bloqueo_pool = threading.Lock()
+
+
+def pool_compartido() -> SSHConnectionPool:
+    """Pool común a todos los conectores del proceso; se cierra al salir"""
+    global _pool_compartido
+    with _bloqueo_pool:
+        if _pool_compartido is None:
+            _pool_compartido = SSHConnectionPool()
+            atexit.register(_pool_compartido.cerrar_todo)
+        return _pool_compartido
@@ -1,16 +1,37 @@
-import re
+import json
+import logging
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List, Optional
 from ..utils.ui_helper import UIHelper
-from ..utils.command_runner import CommandRunner
+from .asset_analyzer import AssetAnalyzer
+from .include_graph import IncludeGraph
+from .php_scanner import PHPDeprecationScanner
+from .scan_cache import ScanCache
+from .scan_scope import ScanScope
+from .theme_catalog import ThemeCatalog
+from .transport import LocalTransport, Transport
+from .version_constraints import evaluar_requisitos
 
 class ThemeAnalyzer:
-    def __init__(self, ui: UIHelper):
+    def __init__(self, ui: UIHelper, alcance: Optional[ScanScope] = None):
         self.ui = ui
+        self.alcance = alcance or ScanScope()
         self.required_files = ['style.css', 'index.php', 'functions.php']
+        self.php_scanner = PHPDeprecationScanner()
+        self._catalogos: Dict[Path, ThemeCatalog] = {}
+        self.asset_analyzer = AssetAnalyzer(ui)
 
     def analizar_tema_local(self, ruta: Path) -> Dict:
         """Analiza un tema WordPress local"""
+        return self.analizar(LocalTransport(ruta, self.ui))
+
+    def analizar(self, transporte: Transport) -> Dict:
+        """
+        Analiza el tema activo de una instalación local o remota.
+
+        WP-CLI se ejecuta por el transporte y el análisis de archivos se hace
+        sobre su raíz local (en remoto, el espejo incremental de wp-content).
+        """
         try:
             tema_info = {
                 'estado': 'pendiente',
@@ -23,14 +44,33 @@ class ThemeAnalyzer:
             }
 
             # Obtener información del tema activo
-            success, output = CommandRunner.execute_command(
-                ['wp', 'theme', 'list', '--status=active', '--format=json'],
-                cwd=ruta
+            success, output = transporte.ejecutar(
+                ['wp', 'theme', 'list', '--status=active', '--format=json']
             )
             
             if success:
-                tema_info.update(self._analizar_archivos_tema(ruta))
-                tema_info.update(self._verificar_compatibilidad_php(ruta))
+                ruta = transporte.raiz_local()
+                tema_activo = self._obtener_tema_activo(output)
+                if tema_activo:
+                    tema_info['nombre'] = tema_activo.get('name')
+                    tema_info['version'] = tema_activo.get('version')
+                nombre = tema_info['nombre']
+                self._fusionar(
+                    tema_info, self._analizar_archivos_tema(ruta, nombre)
+                )
+                self._fusionar(
+                    tema_info, self._verificar_compatibilidad_php(ruta, nombre)
+                )
+                if nombre:
+                    self._fusionar(
+                        tema_info, self._analizar_includes(ruta, nombre)
+                    )
+                herencia = self.catalogo(ruta).cadena_herencia(nombre)
+                activos = self.asset_analyzer.analizar(
+                    ruta, herencia, transporte=transporte
+                )
+                tema_info['advertencias'].extend(activos.pop('advertencias'))
+                tema_info['activos'] = activos
                 tema_info['estado'] = 'error' if tema_info['errores'] else 'ok'
                 
             return tema_info
@@ -38,7 +78,45 @@ class ThemeAnalyzer:
         except Exception as e:
             return {'estado': 'error', 'errores': [str(e)]}
 
-    def _analizar_archivos_tema(self, ruta: Path) -> Dict:
+    def _fusionar(self, tema_info: Dict, parcial: Dict):
+        """Incorpora un resultado parcial acumulando las incidencias"""
+        for clave, valor in parcial.items():
+            if clave in ('archivos_faltantes', 'errores', 'advertencias'):
+                tema_info[clave].extend(valor)
+            else:
+                tema_info[clave] = valor
+
+    def _obtener_tema_activo(self, output: str) -> Optional[Dict]:
+        """Extrae el tema activo de la salida de wp theme list"""
+        try:
+            temas = json.loads(output)
+            return temas[0] if temas else None
+        except (ValueError, IndexError, KeyError):
+            return None
+
+    def _raiz_escaneo(self, ruta: Path, tema: Optional[str] = None) -> Path:
+        """
+        Devuelve la raíz del escaneo: el tema activo si se conoce, o
+        wp-content.
+        """
+        if tema and (ruta / 'wp-content/themes' / tema).is_dir():
+            return ruta / 'wp-content/themes' / tema
+        if (ruta / 'wp-content').is_dir():
+            return ruta / 'wp-content'
+        return ruta
+
+    def catalogo(self, ruta: Path) -> ThemeCatalog:
+        """
+        Devuelve el catálogo de temas de una instalación, reutilizándolo
+        entre llamadas.
+        """
+        if ruta not in self._catalogos:
+            self._catalogos[ruta] = ThemeCatalog(ruta)
+        return self._catalogos[ruta]
+
+    def _analizar_archivos_tema(
+        self, ruta: Path, tema: Optional[str] = None
+    ) -> Dict:
         """Verifica archivos requeridos y estructura del tema"""
         resultados = {
             'archivos_faltantes': [],
@@ -46,66 +124,222 @@ class ThemeAnalyzer:
             'advertencias': []
         }
 
-        tema_path = ruta / 'wp-content/themes'
-        if not tema_path.exists():
+        catalogo = self.catalogo(ruta)
+        if not catalogo.directorio.exists():
             resultados['errores'].append("Directorio de temas no encontrado")
             return resultados
 
-        # Verificar archivos requeridos
+        if not tema:
+            resultados['advertencias'].append(
+                "No se pudo determinar el tema activo"
+            )
+            return resultados
+
+        info = catalogo.tema(tema)
+        if not info:
+            resultados['errores'].append(
+                f"El tema activo {tema} no tiene style.css"
+            )
+            return resultados
+
+        if info['padre_faltante']:
+            resultados['errores'].append(
+                f"El tema padre {info['template']} de {tema} no está instalado"
+            )
+        resultados['tema_padre'] = info['padre']
+
+        # style.css debe estar en el propio tema; el resto puede heredarse del
+        # padre
+        heredados = set()
+        for slug in catalogo.cadena_herencia(tema):
+            heredados.update(catalogo.tema(slug)['archivos'])
         for archivo in self.required_files:
-            if not (tema_path / archivo).exists():
+            if archivo == 'style.css':
+                presentes = info['archivos']
+            else:
+                presentes = heredados
+            if archivo not in presentes:
                 resultados['archivos_faltantes'].append(archivo)
 
         return resultados
 
-    def _verificar_compatibilidad_php(self, ruta: Path) -> Dict:
+    def _verificar_compatibilidad_php(
+        self, ruta: Path, tema: Optional[str] = None
+    ) -> Dict:
         """Verifica la compatibilidad de PHP en el tema"""
         resultados = {'compatibilidad': [], 'advertencias': []}
-        
-        # Verificar funciones obsoletas
-        deprecated_functions = [
-            'create_function',
-            'mysql_*',
-            'split',
-            'ereg',
-            'eregi'
-        ]
-
-        for php_file in ruta.rglob('*.php'):
-            contenido = php_file.read_text(errors='ignore')
-            for func in deprecated_functions:
-                if re.search(func, contenido):
-                    resultados['advertencias'].append(
-                        f"Función obsoleta {func} encontrada en {php_file.name}"
-                    )
 
+        # Solo se analizan los archivos nuevos o modificados desde el último
+        # diagnóstico
+        cache = ScanCache.para_raiz(ruta, 'php-obsoletas', version='2')
+        recorrido = self.alcance.recorrer(
+            self._raiz_escaneo(ruta, tema), base=ruta
+        )
+        for php_file, st in recorrido:
+            try:
+                encontradas = cache.obtener(
+                    php_file, self._buscar_funciones_obsoletas, st
+                )
+            except OSError as e:
+                logging.warning(f"No se pudo analizar {php_file}: {str(e)}")
+                continue
+            for hallazgo in encontradas:
+                resultados['compatibilidad'].append(
+                    {'archivo': str(php_file), **hallazgo}
+                )
+                resultados['advertencias'].append(
+                    f"Función obsoleta {hallazgo['funcion']} encontrada en "
+                    f"{php_file.name}:{hallazgo['linea']}"
+                    + (f" (eliminada en PHP {hallazgo['eliminada_en']})"
+                       if hallazgo['eliminada_en'] else "")
+                )
+
+        # Un recorrido truncado no ha visto todos los archivos: no se evicta
+        # nada
+        if not recorrido.truncado:
+            cache.evictar()
+        cache.guardar()
+        resultados['cache'] = cache.estadisticas()
+        resultados['alcance'] = recorrido.resumen()
+        if recorrido.truncado:
+            resultados['advertencias'].append(
+                f"Escaneo PHP incompleto ({recorrido.motivo})"
+            )
+        self.ui.print_step(
+            f"Archivos PHP: {resultados['cache']['archivos']} "
+            f"(aciertos de caché: {resultados['cache']['ratio_aciertos']:.0%})"
+        )
+        return resultados
+
+    def _buscar_funciones_obsoletas(self, contenido: bytes) -> List[Dict]:
+        """Devuelve las llamadas a funciones obsoletas de un archivo PHP"""
+        return list(self.php_scanner.escanear(contenido))
+
+    def _analizar_includes(self, ruta: Path, tema: str) -> Dict:
+        """Resume el grafo de inclusiones del tema para el diagnóstico"""
+        resultados = {'advertencias': []}
+        grafo = self.construir_grafo_includes(ruta, tema)
+        if 'error' in grafo:
+            resultados['advertencias'].append(
+                "No se pudo analizar el grafo de inclusiones: "
+                f"{grafo['error']}"
+            )
+            return resultados
+
+        resultados['includes'] = grafo
+        for ciclo in grafo['ciclos']:
+            resultados['advertencias'].append(
+                f"Inclusión cíclica entre: {', '.join(ciclo)}"
+            )
+        if grafo['no_alcanzables']:
+            resultados['advertencias'].append(
+                "Plantillas no alcanzables desde la jerarquía de plantillas: "
+                f"{len(grafo['no_alcanzables'])}"
+            )
         return resultados
 
-    def verificar_compatibilidad(self, ruta: Path, version_wp: str) -> Dict:
-        """Verifica compatibilidad con versión específica de WordPress"""
+    def construir_grafo_includes(self, ruta: Path, tema: str) -> Dict:
+        """Construye el grafo de inclusiones de un tema y de su tema padre"""
         try:
-            style_css = ruta / 'wp-content/themes/style.css'
-            if not style_css.exists():
-                return {'compatible': False, 'error': 'style.css no encontrado'}
+            catalogo = self.catalogo(ruta)
+            cadena = catalogo.cadena_herencia(tema)
+            if not cadena:
+                return {'error': f"Tema {tema} no encontrado"}
 
-            contenido = style_css.read_text(encoding='utf-8')
-            requires = re.search(r'Requires at least: ([\d.]+)', contenido)
-            
-            if requires:
-                min_version = requires.group(1)
-                return {
-                    'compatible': self._comparar_versiones(version_wp, min_version),
-                    'min_version': min_version,
-                    'current_version': version_wp
-                }
+            # Las referencias de cada archivo se reutilizan de la caché si no
+            # cambió
+            cache = ScanCache.para_raiz(ruta, 'includes', version='2')
+            grafo = IncludeGraph(
+                [Path(catalogo.tema(slug)['ruta']) for slug in cadena], cache
+            ).construir()
+            cache.evictar()
+            cache.guardar()
+
+            resumen = grafo.resumen()
+            resumen['cache'] = cache.estadisticas()
+            if resumen['ciclos']:
+                self.ui.print_warning(
+                    "Inclusiones cíclicas detectadas: "
+                    f"{len(resumen['ciclos'])}"
+                )
+            return resumen
+
+        except Exception as e:
+            logging.error(f"Error al construir grafo de inclusiones: {str(e)}")
+            return {'error': str(e)}
+
+    def verificar_compatibilidad(
+        self,
+        ruta: Path,
+        version_wp: str,
+        tema: Optional[str] = None,
+        version_php: Optional[str] = None
+    ) -> Dict:
+        """
+        Verifica compatibilidad con versión específica de WordPress (y de
+        PHP, si se indica).
+        """
+        sin_style = {'compatible': False, 'error': 'style.css no encontrado'}
+        try:
+            catalogo = self.catalogo(ruta)
+            if tema:
+                info = catalogo.tema(tema)
+                if not info:
+                    return sin_style
+                return self._compatibilidad_tema(info, version_wp, version_php)
 
-            return {'compatible': True, 'warning': 'No se encontró requisito de versión'}
+            if not catalogo.temas:
+                return sin_style
+
+            # Los requisitos de todos los temas se evalúan en lote
+            evaluaciones = evaluar_requisitos(
+                catalogo.temas, version_wp, version_php
+            )
+            temas = {
+                slug: self._formatear_compatibilidad(evaluacion, version_wp)
+                for slug, evaluacion in evaluaciones.items()
+            }
+            return {
+                'compatible': all(t['compatible'] for t in temas.values()),
+                'current_version': version_wp,
+                'temas': temas
+            }
 
         except Exception as e:
             return {'compatible': False, 'error': str(e)}
 
-    def _comparar_versiones(self, version_actual: str, version_minima: str) -> bool:
-        """Compara versiones de WordPress"""
-        actual = [int(x) for x in version_actual.split('.')]
-        minima = [int(x) for x in version_minima.split('.')]
-        return actual >= minima
+    def _compatibilidad_tema(
+        self,
+        info: Dict,
+        version_wp: str,
+        version_php: Optional[str] = None
+    ) -> Dict:
+        """Evalúa los requisitos de versión de un tema del catálogo"""
+        evaluacion = evaluar_requisitos(
+            {info['slug']: info}, version_wp, version_php
+        )[info['slug']]
+        return self._formatear_compatibilidad(evaluacion, version_wp)
+
+    def _formatear_compatibilidad(
+        self, evaluacion: Dict, version_wp: str
+    ) -> Dict:
+        """Convierte una evaluación de requisitos al formato del diagnóstico"""
+        if not evaluacion['requiere_wp']:
+            resultado = {
+                'compatible': evaluacion['compatible'],
+                'warning': 'No se encontró requisito de versión'
+            }
+        else:
+            resultado = {
+                'compatible': evaluacion['compatible'],
+                'min_version': evaluacion['requiere_wp'],
+                'current_version': version_wp
+            }
+        for clave in (
+            'probado_hasta', 'requiere_php', 'compatible_php', 'probado'
+        ):
+            if evaluacion[clave] is not None:
+                resultado[clave] = evaluacion[clave]
+        if evaluacion['avisos']:
+            resultado['avisos'] = evaluacion['avisos']
+        return resultado
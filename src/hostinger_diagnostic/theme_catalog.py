@@ -0,0 +1,137 @@
+"""
+Catálogo de temas WordPress construido a partir de las cabeceras de style.css.
+Resuelve las relaciones tema hijo/padre y se guarda en caché según los mtimes
+de los directorios de temas.
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .file_headers import leer_cabeceras
+from .scan_cache import ruta_cache
+
+CABECERAS_TEMA = {
+    'nombre': 'Theme Name',
+    'version': 'Version',
+    'requiere_wp': 'Requires at least',
+    'probado_hasta': 'Tested up to',
+    'requiere_php': 'Requires PHP',
+    'template': 'Template',
+}
+
+
+class ThemeCatalog:
+    """Índice en memoria de los temas instalados en wp-content/themes"""
+
+    VERSION = '1'
+
+    def __init__(self, ruta_wp: Path):
+        self.ruta_wp = Path(ruta_wp)
+        self.directorio = self.ruta_wp / 'wp-content/themes'
+        self.archivo_cache = ruta_cache(self.ruta_wp, 'temas')
+        self._temas: Optional[Dict[str, Dict]] = None
+        self.desde_cache = False
+
+    @property
+    def temas(self) -> Dict[str, Dict]:
+        """Temas indexados por slug (nombre del directorio)"""
+        if self._temas is None:
+            self._temas = self._cargar()
+        return self._temas
+
+    def tema(self, slug: str) -> Optional[Dict]:
+        """Devuelve la información de un tema"""
+        return self.temas.get(slug)
+
+    def cadena_herencia(self, slug: str) -> List[str]:
+        """Devuelve el tema y sus ancestros, del hijo al padre"""
+        cadena = []
+        while slug and slug in self.temas and slug not in cadena:
+            cadena.append(slug)
+            slug = self.temas[slug]['padre']
+        return cadena
+
+    def _firma(self) -> Dict[str, list]:
+        """Calcula la firma de mtimes que invalida la caché"""
+        firma = {'.': [os.stat(self.directorio).st_mtime_ns]}
+        for entrada in os.scandir(self.directorio):
+            if not entrada.is_dir():
+                continue
+            style = os.path.join(entrada.path, 'style.css')
+            try:
+                style_mtime = os.stat(style).st_mtime_ns
+            except OSError:
+                style_mtime = None
+            firma[entrada.name] = [entrada.stat().st_mtime_ns, style_mtime]
+        return firma
+
+    def _cargar(self) -> Dict[str, Dict]:
+        """Carga el catálogo de la caché o lo rehace si cambió algún tema"""
+        if not self.directorio.is_dir():
+            return {}
+
+        firma = self._firma()
+        try:
+            if self.archivo_cache.exists():
+                cache = json.loads(
+                    self.archivo_cache.read_text(encoding='utf-8')
+                )
+                if (
+                    cache.get('version') == self.VERSION
+                    and cache.get('firma') == firma
+                ):
+                    self.desde_cache = True
+                    return cache['temas']
+        except Exception as e:
+            logging.warning(f"Caché de temas descartada: {str(e)}")
+
+        temas = self._construir([slug for slug in firma if slug != '.'])
+        try:
+            self.archivo_cache.parent.mkdir(parents=True, exist_ok=True)
+            self.archivo_cache.write_text(
+                json.dumps({
+                    'version': self.VERSION, 'firma': firma, 'temas': temas
+                }),
+                encoding='utf-8'
+            )
+        except OSError as e:
+            logging.error(f"Error al guardar caché de temas: {str(e)}")
+        return temas
+
+    def _construir(self, slugs: List[str]) -> Dict[str, Dict]:
+        """Lee las cabeceras de cada tema y resuelve las herencias"""
+        temas = {}
+        for slug in sorted(slugs):
+            ruta_tema = self.directorio / slug
+            style = ruta_tema / 'style.css'
+            if not style.is_file():
+                continue
+            try:
+                info = leer_cabeceras(style, CABECERAS_TEMA)
+            except OSError as e:
+                logging.warning(f"No se pudo leer {style}: {str(e)}")
+                continue
+            info.update({
+                'slug': slug,
+                'ruta': str(ruta_tema),
+                'padre': None,
+                'padre_faltante': False,
+                'archivos': sorted(
+                    nombre
+                    for nombre in ('style.css', 'index.php', 'functions.php')
+                    if (ruta_tema / nombre).is_file()
+                )
+            })
+            temas[slug] = info
+
+        for info in temas.values():
+            template = info['template']
+            if template and template != info['slug']:
+                if template in temas:
+                    info['padre'] = template
+                else:
+                    info['padre_faltante'] = True
+        return temas
@@ -0,0 +1,400 @@
+"""
+Transporte común para instalaciones WordPress locales y remotas.
+
+Los analizadores y el gestor de WordPress trabajan contra esta interfaz
+(ejecutar comandos, leer rangos de archivos, stat y listar), de modo que el
+mismo código sirve para una instalación local y para una remota por SSH, y
+las optimizaciones de cada camino (lotes, compresión, lecturas SFTP en
+paralelo, espejo incremental) se implementan una sola vez en su transporte.
+"""
+
+import json
+import logging
+import os
+import shlex
+import shutil
+import tempfile
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ..utils.command_runner import CommandRunner
+from . import log_fingerprint
+from .remote_logs import ruta_log_remota
+from .scan_cache import directorio_espejo, ruta_cache, ruta_cache_remota
+
+# Tamaño de cada lectura y, en SFTP, de la ventana de peticiones en vuelo
+TAMANO_BLOQUE = 32768
+VENTANA_LECTURA = 8 * 1024 * 1024
+
+# Directorios de wp-content que se copian al espejo local: los que leen los
+# analizadores de código (uploads y cache pueden ocupar gigabytes y no se usan)
+DIRECTORIOS_ESPEJO = (
+    'wp-content/plugins', 'wp-content/mu-plugins', 'wp-content/themes'
+)
+
+# Código de salida del script remoto cuando el servidor no tiene python3
+SIN_PYTHON = 127
+
+_SCRIPT_ANALISIS = """command -v python3 >/dev/null 2>&1 || exit {sin_python}
+python3 - {peticion} <<'__WG_PY__'
+{codigo}
+__WG_PY__
+"""
+
+_SCRIPT_PHP = """__wg_php=$(mktemp) || exit 1
+trap 'rm -f "$__wg_php"' EXIT
+cat >"$__wg_php" <<'__WG_PHP__'
+{codigo}
+__WG_PHP__
+cd {raiz} && wp eval-file "$__wg_php" {argumentos}
+"""
+
+
+class Transport(ABC):
+    """
+    Acceso a una instalación WordPress.
+
+    Las rutas son relativas a la raíz de WordPress salvo que empiecen por
+    '/'. Los comandos se ejecutan con la raíz como directorio de trabajo.
+    """
+
+    def __init__(self, ui=None):
+        self.ui = ui
+
+    @abstractmethod
+    def ruta(self, archivo: str) -> str:
+        """Ruta completa de un archivo de la instalación"""
+
+    @abstractmethod
+    def ejecutar(self, comando: List[str]) -> Tuple[bool, str]:
+        """Ejecuta un comando en la raíz y devuelve (éxito, salida)"""
+
+    def ejecutar_lote(
+        self, comandos: Dict[str, List[str]]
+    ) -> Dict[str, Tuple[bool, str]]:
+        """Ejecuta varios comandos; los remotos los agrupan en un viaje"""
+        return {
+            nombre: self.ejecutar(comando)
+            for nombre, comando in comandos.items()
+        }
+
+    @abstractmethod
+    def evaluar_php(
+        self, codigo: str, argumentos: Optional[List[str]] = None
+    ) -> Tuple[bool, str]:
+        """Ejecuta un script PHP con `wp eval-file` en un único arranque"""
+
+    @abstractmethod
+    def stat(self, archivo: str) -> Optional[Dict]:
+        """Inodo, tamaño, mtime y modo de un archivo, o None si no existe"""
+
+    def stats(self, archivos: Iterable[str]) -> Dict[str, Optional[Dict]]:
+        """stat de varios archivos; los remotos lo hacen en un viaje"""
+        return {archivo: self.stat(archivo) for archivo in archivos}
+
+    @abstractmethod
+    def escribible(self, archivo: str) -> bool:
+        """Indica si el usuario del transporte puede escribir en la ruta"""
+
+    @abstractmethod
+    def leer_rango(
+        self, archivo: str, desde: int, hasta: int
+    ) -> Iterable[bytes]:
+        """Lee el rango de bytes [desde, hasta) de un archivo en fragmentos"""
+
+    @abstractmethod
+    def listar(self, ruta: str) -> Iterator[Dict]:
+        """
+        Lista en flujo los archivos bajo una ruta (ruta relativa, tamaño y
+        mtime).
+        """
+
+    @abstractmethod
+    def raiz_local(self) -> Path:
+        """Raíz local con los archivos de wp-content para los analizadores"""
+
+    @abstractmethod
+    def archivo_estado(self, nombre: str) -> Path:
+        """Archivo de caché local asociado a esta instalación"""
+
+    def analizar_logs(self, peticion: Dict) -> Optional[Tuple[Dict, int]]:
+        """
+        Ejecuta log_fingerprint.analizar_archivos junto a los logs.
+
+        Devuelve la respuesta y los bytes recibidos, o None si el transporte
+        no puede analizar en origen y hay que leer los rangos.
+        """
+        return None
+
+    def verificar_core(self) -> Optional[Dict]:
+        """
+        Verifica los checksums del core sin PHP (ver CoreIntegrityChecker).
+
+        Devuelve la parte 'core' del diagnóstico, o None si el transporte no
+        tiene acceso directo a los archivos y la verificación la hace
+        WordPress.
+        """
+        return None
+
+
+class LocalTransport(Transport):
+    """Instalación en el sistema de archivos local; usa CommandRunner"""
+
+    def __init__(self, raiz: Path, ui=None):
+        super().__init__(ui)
+        self.raiz = Path(raiz)
+
+    def ruta(self, archivo: str) -> str:
+        return str(self.raiz / archivo)
+
+    def ejecutar(self, comando: List[str]) -> Tuple[bool, str]:
+        return CommandRunner.execute_command(comando, cwd=self.raiz)
+
+    def evaluar_php(
+        self, codigo: str, argumentos: Optional[List[str]] = None
+    ) -> Tuple[bool, str]:
+        descriptor, ruta = tempfile.mkstemp(
+            prefix='webgenesis-', suffix='.php'
+        )
+        try:
+            with os.fdopen(descriptor, 'w', encoding='utf-8') as f:
+                f.write(codigo)
+            return self.ejecutar(
+                ['wp', 'eval-file', ruta, *(argumentos or [])]
+            )
+        finally:
+            os.unlink(ruta)
+
+    def stat(self, archivo: str) -> Optional[Dict]:
+        try:
+            st = os.stat(self.ruta(archivo))
+        except OSError:
+            return None
+        return {
+            'inodo': st.st_ino,
+            'tamano': st.st_size,
+            'mtime': st.st_mtime,
+            'modo': st.st_mode & 0o7777
+        }
+
+    def escribible(self, archivo: str) -> bool:
+        return os.access(self.ruta(archivo), os.W_OK)
+
+    def leer_rango(
+        self, archivo: str, desde: int, hasta: int
+    ) -> Iterator[bytes]:
+        with open(self.ruta(archivo), 'rb') as f:
+            f.seek(desde)
+            restante = hasta - desde
+            while restante > 0:
+                datos = f.read(min(TAMANO_BLOQUE, restante))
+                if not datos:
+                    break
+                restante -= len(datos)
+                yield datos
+
+    def listar(self, ruta: str) -> Iterator[Dict]:
+        base = Path(self.ruta(ruta))
+        pendientes = [base]
+        while pendientes:
+            directorio = pendientes.pop()
+            try:
+                entradas = list(os.scandir(directorio))
+            except OSError as e:
+                logging.warning(f"No se pudo listar {directorio}: {str(e)}")
+                continue
+            for entrada in entradas:
+                if entrada.is_dir(follow_symlinks=False):
+                    pendientes.append(Path(entrada.path))
+                elif entrada.is_file(follow_symlinks=False):
+                    st = entrada.stat(follow_symlinks=False)
+                    relativa = Path(entrada.path).relative_to(base)
+                    yield {
+                        'ruta': relativa.as_posix(),
+                        'tamano': st.st_size,
+                        'mtime': st.st_mtime
+                    }
+
+    def raiz_local(self) -> Path:
+        return self.raiz
+
+    def archivo_estado(self, nombre: str) -> Path:
+        return ruta_cache(self.raiz, nombre)
+
+    def verificar_core(self) -> Optional[Dict]:
+        from .core_integrity import CoreIntegrityChecker
+        return CoreIntegrityChecker(self.raiz).verificar()
+
+
+class SSHTransport(Transport):
+    """
+    Instalación remota a través de un HostingerConnector conectado.
+
+    Los lotes van en un solo script, las lecturas se comprimen en el
+    servidor o usan SFTP con peticiones en paralelo y los analizadores de
+    archivos trabajan sobre el espejo local incremental de plugins, mu-plugins
+    y temas.
+    """
+
+    def __init__(self, conector):
+        super().__init__(conector.ui)
+        self.conector = conector
+        self.config = conector.config
+        self._espejo: Optional[Path] = None
+
+    def ruta(self, archivo: str) -> str:
+        return ruta_log_remota(self.config.ruta_remota, archivo)
+
+    def _en_raiz(self, comando: List[str]) -> str:
+        raiz = shlex.quote(self.config.ruta_remota)
+        return f"cd {raiz} && {' '.join(shlex.quote(p) for p in comando)}"
+
+    def ejecutar(self, comando: List[str]) -> Tuple[bool, str]:
+        resultado = self.conector.ejecutar_comandos(
+            [self._en_raiz(comando)]
+        )[0]
+        if resultado['exito']:
+            return True, resultado['salida']
+        return False, resultado['error'] or resultado['salida']
+
+    def ejecutar_lote(
+        self, comandos: Dict[str, List[str]]
+    ) -> Dict[str, Tuple[bool, str]]:
+        return self.conector.ejecutar_lote({
+            nombre: self._en_raiz(comando)
+            for nombre, comando in comandos.items()
+        })
+
+    def evaluar_php(
+        self, codigo: str, argumentos: Optional[List[str]] = None
+    ) -> Tuple[bool, str]:
+        """Sube el script y lo ejecuta en el mismo canal: un solo viaje"""
+        script = _SCRIPT_PHP.format(
+            codigo=codigo,
+            raiz=shlex.quote(self.config.ruta_remota),
+            argumentos=' '.join(
+                shlex.quote(argumento) for argumento in argumentos or []
+            )
+        )
+        try:
+            salida, error, codigo_salida = self.conector._ejecutar_script(
+                script
+            )
+        except Exception as e:
+            return False, str(e)
+        salida = salida.decode('utf-8', errors='replace')
+        if codigo_salida == 0:
+            return True, salida
+        return False, error or salida
+
+    def stat(self, archivo: str) -> Optional[Dict]:
+        return self.stats([archivo])[archivo]
+
+    def stats(self, archivos: Iterable[str]) -> Dict[str, Optional[Dict]]:
+        archivos = list(archivos)
+        salidas = self.conector.ejecutar_lote({
+            archivo: f"stat -c '%i %s %Y %a' {shlex.quote(self.ruta(archivo))}"
+            for archivo in archivos
+        })
+        resultados = {}
+        for archivo in archivos:
+            success, output = salidas[archivo]
+            partes = output.split()
+            if not success or len(partes) < 4:
+                resultados[archivo] = None
+                continue
+            resultados[archivo] = {
+                'inodo': int(partes[0]),
+                'tamano': int(partes[1]),
+                'mtime': float(partes[2]),
+                'modo': int(partes[3], 8)
+            }
+        return resultados
+
+    def escribible(self, archivo: str) -> bool:
+        comando = f"test -w {shlex.quote(self.ruta(archivo))}"
+        return self.conector.ejecutar_lote({'w': comando})['w'][0]
+
+    def leer_rango(
+        self, archivo: str, desde: int, hasta: int
+    ) -> Iterable[bytes]:
+        """
+        Con compresión disponible se usa `tail -c +N` comprimido en el
+        servidor; si no, SFTP, y como último recurso tail sin comprimir.
+        """
+        ruta = self.ruta(archivo)
+        conector = self.conector
+        if conector.codec_remoto() is None and conector.sftp is not None:
+            return self._leer_sftp(ruta, desde, hasta)
+        return conector.flujo_remoto(
+            f"tail -c +{desde + 1} {shlex.quote(ruta)}"
+            f" | head -c {hasta - desde}"
+        )
+
+    def _leer_sftp(self, ruta: str, desde: int, hasta: int) -> Iterator[bytes]:
+        """Lectura por ventanas con peticiones SFTP en paralelo"""
+        with self.conector.sftp.open(ruta, 'rb') as archivo:
+            posicion = desde
+            while posicion < hasta:
+                fin = min(hasta, posicion + VENTANA_LECTURA)
+                bloques = [
+                    (inicio, min(TAMANO_BLOQUE, fin - inicio))
+                    for inicio in range(posicion, fin, TAMANO_BLOQUE)
+                ]
+                for datos in archivo.readv(bloques):
+                    yield datos
+                posicion = fin
+
+    def listar(self, ruta: str) -> Iterator[Dict]:
+        return self.conector.listar_archivos(self.ruta(ruta))
+
+    def raiz_local(self) -> Path:
+        """
+        Sincroniza el espejo de plugins, mu-plugins y temas la primera vez
+        que se pide.
+        """
+        if self._espejo is None:
+            espejo = directorio_espejo(
+                self.config.host, self.config.usuario, self.config.ruta_remota
+            )
+            for directorio, st in self.stats(DIRECTORIOS_ESPEJO).items():
+                if st is None:
+                    # No existe en el servidor (mu-plugins es opcional): se
+                    # descarta una copia anterior
+                    shutil.rmtree(espejo / directorio, ignore_errors=True)
+                    continue
+                resultado = self.conector.sincronizar_espejo(directorio)
+                if 'error' in resultado:
+                    raise OSError(
+                        f"No se pudo sincronizar el espejo de {directorio}: "
+                        f"{resultado['error']}"
+                    )
+            self._espejo = espejo
+        return self._espejo
+
+    def archivo_estado(self, nombre: str) -> Path:
+        return ruta_cache_remota(
+            self.config.host, self.config.usuario, self.config.ruta_remota,
+            nombre
+        )
+
+    def analizar_logs(self, peticion: Dict) -> Optional[Tuple[Dict, int]]:
+        """Envía log_fingerprint.py al servidor; None si no tiene python3"""
+        script = _SCRIPT_ANALISIS.format(
+            sin_python=SIN_PYTHON,
+            peticion=shlex.quote(json.dumps(peticion)),
+            codigo=Path(log_fingerprint.__file__).read_text(encoding='utf-8')
+        )
+        salida, error, codigo = self.conector._ejecutar_script(script)
+        try:
+            respuesta = json.loads(salida) if codigo == 0 else None
+        except ValueError:
+            respuesta = None
+        if respuesta is None:
+            logging.warning(
+                f"Análisis remoto no disponible (código {codigo}): "
+                f"{error.strip()}; se analiza en local"
+            )
+            return None
+        return respuesta, len(salida)
@@ -0,0 +1,410 @@
+"""
+Análisis de wp-content/uploads: duplicados exactos, originales
+sobredimensionados y variantes de miniaturas faltantes o huérfanas.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import struct
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from ..utils.ui_helper import UIHelper
+
+EXTENSIONES_IMAGEN = {'.jpg', '.jpeg', '.png', '.gif', '.webp'}
+
+# Variantes generadas por WordPress: nombre-300x200.jpg
+PATRON_VARIANTE = re.compile(r'^(?P<base>.+)-(?P<ancho>\d+)x(?P<alto>\d+)$')
+
+# Tamaños intermedios por defecto de WordPress: (ancho, alto, recorte)
+TAMANOS_WP = {
+    'thumbnail': (150, 150, True),
+    'medium': (300, 300, False),
+    'medium_large': (768, 0, False),
+    'large': (1024, 1024, False),
+}
+
+# Umbral de big_image_size_threshold de WordPress
+UMBRAL_DIMENSION = 2560
+UMBRAL_BYTES = 2 * 1024 * 1024
+
+# Bytes estimados por archivo retenido en el índice de duplicados
+BYTES_POR_REGISTRO = 160
+BLOQUE_LECTURA = 1024 * 1024
+BLOQUE_PARCIAL = 64 * 1024
+
+
+def leer_dimensiones(ruta: str) -> Optional[Tuple[int, int]]:
+    """Lee las dimensiones de una imagen leyendo solo su cabecera"""
+    try:
+        with open(ruta, 'rb') as f:
+            cabecera = f.read(32)
+            es_png = cabecera.startswith(b'\x89PNG\r\n\x1a\n')
+            if es_png and cabecera[12:16] == b'IHDR':
+                return struct.unpack('>II', cabecera[16:24])
+            if cabecera[:6] in (b'GIF87a', b'GIF89a'):
+                return struct.unpack('<HH', cabecera[6:10])
+            if cabecera[:4] == b'RIFF' and cabecera[8:12] == b'WEBP':
+                return _dimensiones_webp(cabecera + f.read(32))
+            if cabecera[:2] == b'\xff\xd8':
+                return _dimensiones_jpeg(f)
+    except (OSError, struct.error) as e:
+        logging.debug(f"No se pudieron leer dimensiones de {ruta}: {str(e)}")
+    return None
+
+
+def _dimensiones_webp(cabecera: bytes) -> Optional[Tuple[int, int]]:
+    """Dimensiones de los formatos VP8, VP8L y VP8X"""
+    formato = cabecera[12:16]
+    if formato == b'VP8 ':
+        ancho, alto = struct.unpack('<HH', cabecera[26:30])
+        return ancho & 0x3FFF, alto & 0x3FFF
+    if formato == b'VP8L':
+        b0, b1, b2, b3 = cabecera[21:25]
+        return (
+            1 + (((b1 & 0x3F) << 8) | b0),
+            1 + (((b3 & 0xF) << 10) | (b2 << 2) | ((b1 & 0xC0) >> 6))
+        )
+    if formato == b'VP8X':
+        return (
+            1 + int.from_bytes(cabecera[24:27], 'little'),
+            1 + int.from_bytes(cabecera[27:30], 'little')
+        )
+    return None
+
+
+def _dimensiones_jpeg(f) -> Optional[Tuple[int, int]]:
+    """Recorre los segmentos JPEG saltando su contenido hasta el SOF"""
+    f.seek(2)
+    while True:
+        marcador = f.read(2)
+        while marcador[:1] == b'\xff' and marcador[1:2] == b'\xff':
+            marcador = marcador[1:] + f.read(1)
+        if len(marcador) < 2 or marcador[0] != 0xFF:
+            return None
+        tipo = marcador[1]
+        if tipo in (0xD8, 0x01) or 0xD0 <= tipo <= 0xD7:
+            continue
+        longitud = struct.unpack('>H', f.read(2))[0]
+        if 0xC0 <= tipo <= 0xCF and tipo not in (0xC4, 0xC8, 0xCC):
+            alto, ancho = struct.unpack('>xHH', f.read(5))
+            return ancho, alto
+        f.seek(longitud - 2, os.SEEK_CUR)
+
+
+def dimensiones_esperadas(
+    ancho: int, alto: int, tamano: Tuple[int, int, bool]
+) -> Optional[Tuple[int, int]]:
+    """
+    Dimensiones de la variante que WordPress generaría para un tamaño, o
+    None.
+    """
+    max_ancho, max_alto, recorte = tamano
+    if recorte:
+        if ancho <= max_ancho or alto <= max_alto:
+            return None
+        return max_ancho, max_alto
+    ratios = [
+        limite / actual
+        for limite, actual in ((max_ancho, ancho), (max_alto, alto))
+        if limite
+    ]
+    ratio = min(ratios) if ratios else 1
+    if ratio >= 1:
+        return None
+    return max(1, round(ancho * ratio)), max(1, round(alto * ratio))
+
+
+class UploadsAnalyzer:
+    """
+    Recorre wp-content/uploads en paralelo (una tarea por directorio) y
+    mantiene en memoria solo el índice tamaño -> rutas necesario para la
+    detección de duplicados, limitado por ``memoria_max``.
+    """
+
+    def __init__(
+        self,
+        ui: UIHelper,
+        max_workers: Optional[int] = None,
+        memoria_max: int = 256 * 1024 * 1024,
+        tamano_minimo: int = 1024,
+        umbral_dimension: int = UMBRAL_DIMENSION,
+        umbral_bytes: int = UMBRAL_BYTES,
+        tamanos: Optional[Dict[str, Tuple[int, int, bool]]] = None,
+        excluir: Optional[List[str]] = None,
+        limite_listado: int = 500
+    ):
+        self.ui = ui
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) * 4)
+        self.memoria_max = memoria_max
+        self.tamano_minimo = tamano_minimo
+        self.umbral_dimension = umbral_dimension
+        self.umbral_bytes = umbral_bytes
+        self.tamanos = tamanos or TAMANOS_WP
+        self.excluir = excluir or []
+        self.limite_listado = limite_listado
+
+    def analizar(self, ruta: Path) -> Dict:
+        """Analiza el directorio de subidas de una instalación WordPress"""
+        raiz = ruta / 'wp-content/uploads'
+        resultados = {
+            'archivos': 0,
+            'bytes': 0,
+            'duplicados': [],
+            'sobredimensionadas': [],
+            'variantes_huerfanas': [],
+            'variantes_faltantes': [],
+            'recuperable': {'duplicados': 0, 'huerfanas': 0, 'total': 0},
+            'truncado': False,
+            'advertencias': []
+        }
+        if not raiz.is_dir():
+            resultados['advertencias'].append(
+                "Directorio de subidas no encontrado"
+            )
+            return resultados
+
+        self.ui.print_step(f"Analizando subidas en {raiz}...")
+        por_tamano: Dict[int, List[str]] = {}
+        memoria = 0
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pendientes = {
+                executor.submit(self._analizar_directorio, str(raiz), '')
+            }
+            while pendientes:
+                completadas, pendientes = wait(
+                    pendientes, return_when=FIRST_COMPLETED
+                )
+                for tarea in completadas:
+                    parcial = tarea.result()
+                    for subdirectorio, relativa in parcial['subdirectorios']:
+                        pendientes.add(executor.submit(
+                            self._analizar_directorio, subdirectorio, relativa
+                        ))
+
+                    resultados['archivos'] += parcial['archivos']
+                    resultados['bytes'] += parcial['bytes']
+                    for clave in (
+                        'sobredimensionadas',
+                        'variantes_huerfanas',
+                        'variantes_faltantes'
+                    ):
+                        self._anadir_limitado(
+                            resultados[clave], parcial[clave]
+                        )
+                    resultados['recuperable']['huerfanas'] += sum(
+                        v['bytes'] for v in parcial['variantes_huerfanas']
+                    )
+
+                    # Índice de duplicados acotado por el presupuesto de
+                    # memoria
+                    for archivo, tamano in parcial['candidatos']:
+                        if memoria >= self.memoria_max:
+                            resultados['truncado'] = True
+                            break
+                        por_tamano.setdefault(tamano, []).append(archivo)
+                        memoria += BYTES_POR_REGISTRO + len(archivo)
+
+            grupos = [rutas for rutas in por_tamano.values() if len(rutas) > 1]
+            del por_tamano
+            confirmados = self._confirmar_duplicados(executor, grupos)
+            for tamano, duplicados in confirmados:
+                recuperable = tamano * (len(duplicados) - 1)
+                resultados['recuperable']['duplicados'] += recuperable
+                self._anadir_limitado(resultados['duplicados'], [{
+                    'bytes': tamano,
+                    'recuperable': recuperable,
+                    'archivos': sorted(duplicados)
+                }])
+
+        resultados['duplicados'].sort(
+            key=lambda d: d['recuperable'], reverse=True
+        )
+        recuperable = resultados['recuperable']
+        recuperable['total'] = (
+            recuperable['duplicados'] + recuperable['huerfanas']
+        )
+        resultados['memoria_estimada'] = memoria
+        if resultados['truncado']:
+            resultados['advertencias'].append(
+                "Índice de duplicados incompleto: se alcanzó el presupuesto "
+                "de memoria"
+            )
+        self.ui.print_success(
+            f"Subidas: {resultados['archivos']} archivos, "
+            f"{recuperable['total'] // (1024 * 1024)} MB recuperables"
+        )
+        return resultados
+
+    def _anadir_limitado(self, destino: List, elementos: List):
+        """Añade elementos a un listado sin superar el límite de salida"""
+        espacio = self.limite_listado - len(destino)
+        if espacio > 0:
+            destino.extend(elementos[:espacio])
+
+    def _analizar_directorio(self, directorio: str, relativa: str) -> Dict:
+        """Analiza los archivos de un único directorio (sin descender)"""
+        parcial = {
+            'subdirectorios': [],
+            'archivos': 0,
+            'bytes': 0,
+            'candidatos': [],
+            'sobredimensionadas': [],
+            'variantes_huerfanas': [],
+            'variantes_faltantes': []
+        }
+        archivos: Dict[str, int] = {}
+        try:
+            with os.scandir(directorio) as entradas:
+                for entrada in entradas:
+                    nombre = entrada.name
+                    ruta_relativa = (
+                        f"{relativa}/{nombre}" if relativa else nombre
+                    )
+                    if entrada.is_dir(follow_symlinks=False):
+                        if not any(
+                            fnmatch(nombre, p) or fnmatch(ruta_relativa, p)
+                            for p in self.excluir
+                        ):
+                            parcial['subdirectorios'].append(
+                                (entrada.path, ruta_relativa)
+                            )
+                    elif entrada.is_file(follow_symlinks=False):
+                        st = entrada.stat(follow_symlinks=False)
+                        archivos[nombre] = st.st_size
+        except OSError as e:
+            logging.warning(f"No se pudo leer {directorio}: {str(e)}")
+            return parcial
+
+        parcial['archivos'] = len(archivos)
+        parcial['bytes'] = sum(archivos.values())
+        parcial['candidatos'] = [
+            (os.path.join(directorio, nombre), tamano)
+            for nombre, tamano in archivos.items()
+            if tamano >= self.tamano_minimo
+        ]
+        self._analizar_imagenes(directorio, archivos, parcial)
+        return parcial
+
+    def _analizar_imagenes(
+        self, directorio: str, archivos: Dict[str, int], parcial: Dict
+    ):
+        """Clasifica originales y variantes de un directorio"""
+        originales = {}
+        variantes: Dict[Tuple[str, str], List[Tuple[int, int, str]]] = {}
+        for nombre in archivos:
+            base, extension = os.path.splitext(nombre)
+            if extension.lower() not in EXTENSIONES_IMAGEN:
+                continue
+            match = PATRON_VARIANTE.match(base)
+            if match:
+                clave = (match.group('base'), extension)
+                variantes.setdefault(clave, []).append((
+                    int(match.group('ancho')),
+                    int(match.group('alto')),
+                    nombre
+                ))
+            else:
+                originales[(base, extension)] = nombre
+
+        for (base, extension), lista in variantes.items():
+            if (
+                (base, extension) in originales
+                or (f"{base}-scaled", extension) in originales
+            ):
+                continue
+            for _, _, nombre in lista:
+                parcial['variantes_huerfanas'].append({
+                    'archivo': os.path.join(directorio, nombre),
+                    'bytes': archivos[nombre]
+                })
+
+        for (base, extension), nombre in originales.items():
+            ruta = os.path.join(directorio, nombre)
+            dimensiones = leer_dimensiones(ruta)
+            if dimensiones is None:
+                continue
+            ancho, alto = dimensiones
+            if (
+                max(ancho, alto) > self.umbral_dimension
+                or archivos[nombre] > self.umbral_bytes
+            ):
+                parcial['sobredimensionadas'].append({
+                    'archivo': ruta,
+                    'ancho': ancho,
+                    'alto': alto,
+                    'bytes': archivos[nombre]
+                })
+
+            # Las variantes se generan desde la copia -scaled, no desde el
+            # original
+            if (f"{base}-scaled", extension) in originales:
+                continue
+            base_variantes = base
+            if base.endswith('-scaled'):
+                base_variantes = base[:-len('-scaled')]
+            existentes = variantes.get((base_variantes, extension), [])
+            faltan = []
+            for tamano, definicion in self.tamanos.items():
+                esperada = dimensiones_esperadas(ancho, alto, definicion)
+                if esperada and not any(
+                    abs(w - esperada[0]) <= 1 and abs(h - esperada[1]) <= 1
+                    for w, h, _ in existentes
+                ):
+                    faltan.append(tamano)
+            if faltan:
+                parcial['variantes_faltantes'].append(
+                    {'archivo': ruta, 'faltan': faltan}
+                )
+
+    def _confirmar_duplicados(
+        self, executor: ThreadPoolExecutor, grupos: List[List[str]]
+    ):
+        """
+        Cascada tamaño -> huella parcial -> huella completa sobre grupos de
+        igual tamaño.
+        """
+        for nivel in (self._huella_parcial, self._huella_completa):
+            siguientes = []
+            por_grupo = executor.map(lambda g: list(map(nivel, g)), grupos)
+            for grupo, huellas in zip(grupos, por_grupo):
+                por_huella: Dict[str, List[str]] = {}
+                for archivo, huella in zip(grupo, huellas):
+                    if huella is not None:
+                        por_huella.setdefault(huella, []).append(archivo)
+                siguientes.extend(
+                    rutas for rutas in por_huella.values() if len(rutas) > 1
+                )
+            grupos = siguientes
+
+        for grupo in grupos:
+            try:
+                yield os.stat(grupo[0]).st_size, grupo
+            except OSError:
+                continue
+
+    def _huella_parcial(self, ruta: str) -> Optional[str]:
+        """Huella de los primeros bytes del archivo"""
+        try:
+            with open(ruta, 'rb') as f:
+                return hashlib.blake2b(
+                    f.read(BLOQUE_PARCIAL), digest_size=16
+                ).hexdigest()
+        except OSError:
+            return None
+
+    def _huella_completa(self, ruta: str) -> Optional[str]:
+        """Huella del archivo completo leído en bloques de tamaño fijo"""
+        try:
+            huella = hashlib.blake2b(digest_size=20)
+            with open(ruta, 'rb') as f:
+                for bloque in iter(lambda: f.read(BLOQUE_LECTURA), b''):
+                    huella.update(bloque)
+            return huella.hexdigest()
+        except OSError:
+            return None
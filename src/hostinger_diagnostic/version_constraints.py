@@ -0,0 +1,208 @@
+"""
+Comparación de versiones de WordPress y PHP y evaluación de requisitos
+("Requires at least", "Tested up to", "Requires PHP") de temas y plugins.
+Cada cadena se analiza una sola vez y se memoriza como tupla comparable.
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Orden de las etiquetas de pre-lanzamiento: dev < alpha < beta < RC < final <
+# parche
+_RANGOS = {
+    'dev': 0,
+    'alpha': 1, 'a': 1,
+    'beta': 2, 'b': 2,
+    'rc': 3, 'pre': 3,
+    'p': 5, 'pl': 5, 'patch': 5,
+}
+_RANGO_FINAL = 4
+
+_VERSION = re.compile(
+    r'(\d+(?:\.\d+)*)'
+    r'(?:[-_.+ ]?(dev|alpha|beta|rc|pre|patch|pl|a|b|p)(?![a-z])[-_.]?(\d*))?',
+    re.IGNORECASE
+)
+
+# Requisitos de cabecera evaluados para cada componente
+CABECERAS_REQUISITOS = ('requiere_wp', 'probado_hasta', 'requiere_php')
+
+Version = Tuple[Tuple[int, ...], int, int]
+
+
+@lru_cache(maxsize=4096)
+def parsear_version(texto: Optional[str]) -> Optional[Version]:
+    """
+    Convierte una versión en una tupla comparable, o None si no la contiene.
+
+    Acepta formatos de WordPress (6.4, 6.4-RC1, 6.5-alpha-57159) y de PHP
+    (8.1.2, 8.3.0RC1, 8.1.2-1ubuntu2.14). Los ceros finales no cuentan:
+    6.4 y 6.4.0 son la misma versión.
+    """
+    if not texto:
+        return None
+    match = _VERSION.search(str(texto))
+    if not match:
+        return None
+    partes = [int(parte) for parte in match.group(1).split('.')]
+    while len(partes) > 1 and partes[-1] == 0:
+        partes.pop()
+    etiqueta = (match.group(2) or '').lower()
+    rango = _RANGOS.get(etiqueta, _RANGO_FINAL)
+    numero = int(match.group(3)) if match.group(3) else 0
+    return tuple(partes), rango, numero
+
+
+def comparar_versiones(a: str, b: str) -> int:
+    """
+    Devuelve -1, 0 o 1 como version_compare; las versiones inválidas son
+    menores.
+    """
+    va, vb = parsear_version(a), parsear_version(b)
+    if va == vb:
+        return 0
+    if va is None or vb is None:
+        return -1 if va is None else 1
+    return -1 if va < vb else 1
+
+
+def cumple_minimo(
+    actual: str, minimo: str, ignorar_prelanzamiento: bool = False
+) -> Optional[bool]:
+    """
+    Indica si una versión alcanza un mínimo; None si alguna no se puede
+    analizar.
+
+    Con ignorar_prelanzamiento, 6.5-RC1 cuenta como 6.5, igual que
+    is_wp_version_compatible() en WordPress.
+    """
+    va, vm = parsear_version(actual), parsear_version(minimo)
+    if va is None or vm is None:
+        return None
+    if ignorar_prelanzamiento:
+        va = (va[0], _RANGO_FINAL, 0)
+    return va >= vm
+
+
+def rama(version: str) -> Optional[Tuple[int, ...]]:
+    """Rama mayor.menor de una versión (6.4.3 -> (6, 4))"""
+    analizada = parsear_version(version)
+    if analizada is None:
+        return None
+    return (analizada[0] + (0,))[:2]
+
+
+@lru_cache(maxsize=65536)
+def _evaluar(
+    requiere_wp: Optional[str],
+    probado_hasta: Optional[str],
+    requiere_php: Optional[str],
+    version_wp: Optional[str],
+    version_php: Optional[str]
+) -> Tuple[Optional[bool], Optional[bool], Optional[bool]]:
+    """Evalúa una combinación de requisitos contra un par de versiones"""
+    compatible_wp = compatible_php = probado = None
+    if requiere_wp and version_wp:
+        compatible_wp = cumple_minimo(
+            version_wp, requiere_wp, ignorar_prelanzamiento=True
+        )
+    if requiere_php and version_php:
+        compatible_php = cumple_minimo(version_php, requiere_php)
+    if probado_hasta and version_wp:
+        # "Tested up to: 6.4" cubre toda la rama 6.4.x
+        rama_actual, rama_probada = rama(version_wp), rama(probado_hasta)
+        if rama_actual is not None and rama_probada is not None:
+            probado = rama_actual <= rama_probada
+    return compatible_wp, compatible_php, probado
+
+
+def evaluar_requisitos(
+    componentes: Dict[str, Dict],
+    version_wp: Optional[str] = None,
+    version_php: Optional[str] = None
+) -> Dict[str, Dict]:
+    """
+    Evalúa los requisitos de cabecera de temas o plugins en lote.
+
+    Args:
+        componentes: Información por slug con las claves requiere_wp,
+            probado_hasta y requiere_php (como ThemeCatalog)
+        version_wp: Versión de WordPress instalada u objetivo
+        version_php: Versión de PHP instalada u objetivo
+    """
+    resultados, memo = {}, {}
+    for slug, info in componentes.items():
+        requisitos = tuple(
+            info.get(clave) or None for clave in CABECERAS_REQUISITOS
+        )
+        # Muchos componentes comparten requisitos: cada combinación se evalúa
+        # una vez
+        evaluacion = memo.get(requisitos)
+        if evaluacion is None:
+            evaluacion = memo[requisitos] = _describir(
+                requisitos, version_wp, version_php
+            )
+        resultados[slug] = {**evaluacion, 'avisos': list(evaluacion['avisos'])}
+    return resultados
+
+
+def _describir(
+    requisitos: Tuple[Optional[str], ...],
+    version_wp: Optional[str],
+    version_php: Optional[str]
+) -> Dict:
+    """Resultado y avisos de una combinación de requisitos"""
+    compatible_wp, compatible_php, probado = _evaluar(
+        *requisitos, version_wp, version_php
+    )
+    avisos = []
+    if compatible_wp is False:
+        avisos.append(
+            f"Requiere WordPress {requisitos[0]} (actual {version_wp})"
+        )
+    if compatible_php is False:
+        avisos.append(f"Requiere PHP {requisitos[2]} (actual {version_php})")
+    if probado is False:
+        avisos.append(f"Probado solo hasta WordPress {requisitos[1]}")
+    for clave, valor in zip(CABECERAS_REQUISITOS, requisitos):
+        if valor and parsear_version(valor) is None:
+            avisos.append(f"Versión no reconocida en {clave}: {valor}")
+    return {
+        'compatible': (
+            compatible_wp is not False and compatible_php is not False
+        ),
+        'compatible_wp': compatible_wp,
+        'compatible_php': compatible_php,
+        'probado': probado,
+        'requiere_wp': requisitos[0],
+        'probado_hasta': requisitos[1],
+        'requiere_php': requisitos[2],
+        'avisos': avisos
+    }
+
+
+def matriz_compatibilidad(
+    componentes: Dict[str, Dict],
+    objetivos: Iterable[Tuple[Optional[str], Optional[str]]]
+) -> List[Dict]:
+    """
+    Evalúa los componentes contra varios pares (WordPress, PHP), por ejemplo
+    las versiones de toda una flota de sitios o las candidatas a actualizar.
+    """
+    matriz = []
+    for version_wp, version_php in objetivos:
+        resultados = evaluar_requisitos(componentes, version_wp, version_php)
+        matriz.append({
+            'version_wp': version_wp,
+            'version_php': version_php,
+            'incompatibles': sorted(
+                slug for slug, r in resultados.items() if not r['compatible']
+            ),
+            'no_probados': sorted(
+                slug for slug, r in resultados.items()
+                if r['probado'] is False
+            ),
+            'resultados': resultados
+        })
+    return matriz
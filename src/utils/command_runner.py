@@ -1,7 +1,8 @@
 import logging
+import os
 import subprocess
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 class CommandRunner:
     @staticmethod
@@ -9,7 +10,8 @@ class CommandRunner:
         command: List[str],
         cwd: Optional[Path] = None,
         shell: bool = False,
-        capture_output: bool = True
+        capture_output: bool = True,
+        env: Optional[Dict[str, str]] = None
     ) -> Tuple[bool, str]:
         """
         Ejecuta un comando externo de manera segura y registra su resultado.
@@ -19,6 +21,7 @@ class CommandRunner:
             cwd: Directorio de trabajo
             shell: Si se debe usar shell
             capture_output: Si se debe capturar la salida
+            env: Variables de entorno añadidas a las del proceso actual
         
         Returns:
             Tupla de (éxito, mensaje)
@@ -33,7 +36,8 @@ class CommandRunner:
                 shell=shell,
                 capture_output=capture_output,
                 text=True,
-                encoding='utf-8'
+                encoding='utf-8',
+                env={**os.environ, **env} if env else None
             )
             
             if result.returncode == 0:
@@ -0,0 +1,199 @@
+"""
+Benchmark del tiempo de importación al arrancar la CLI
+(`python -X importtime`).
+
+Sirve como comprobación de regresión del arranque: los puntos de entrada
+no deben cargar la pila remota (paramiko, cryptography, asyncssh...) hasta
+que se usa el modo remoto. Se ejecuta con
+`python -m src.utils.startup_benchmark` y termina con código 1 si detecta una
+regresión.
+
+El tiempo de importación depende de la máquina, así que por defecto solo se
+informa; con WEBGENESIS_PRESUPUESTO_ARRANQUE_MS se fija un presupuesto en ms
+que también cuenta como regresión.
+"""
+
+import logging
+import os
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+RAIZ_PROYECTO = Path(__file__).resolve().parent.parent.parent
+
+# Archivos de arranque medidos; se cargan como módulo sin ejecutar main()
+PUNTOS_ENTRADA = {
+    'cli': '__main__.py',
+    'setup': 'setup_proyecto.py'
+}
+
+# Paquetes que solo necesita el modo remoto
+MODULOS_REMOTOS = (
+    'paramiko', 'cryptography', 'nacl', 'bcrypt', 'asyncssh', 'asyncio',
+    'zstandard'
+)
+
+# Variable de entorno con la importación máxima por punto de entrada (mediana,
+# en ms)
+VARIABLE_PRESUPUESTO = 'WEBGENESIS_PRESUPUESTO_ARRANQUE_MS'
+
+_CARGAR_SIN_EJECUTAR = (
+    "import importlib.util, sys; "
+    "spec = importlib.util.spec_from_file_location("
+    "'webgenesis_arranque', sys.argv[1]); "
+    "spec.loader.exec_module(importlib.util.module_from_spec(spec))"
+)
+
+_LINEA_IMPORTTIME = re.compile(
+    r'^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$'
+)
+
+
+def parsear_importtime(salida: str) -> Dict:
+    """
+    Interpreta la salida de `-X importtime`.
+
+    Returns:
+        Diccionario con el total en ms (suma de los módulos de primer nivel),
+        el acumulado por módulo de primer nivel y todos los módulos cargados
+    """
+    modulos = {}
+    primer_nivel = {}
+    for linea in salida.splitlines():
+        coincidencia = _LINEA_IMPORTTIME.match(linea)
+        if not coincidencia:
+            continue
+        propio, acumulado, sangria, nombre = coincidencia.groups()
+        modulos[nombre] = int(propio) / 1000
+        if not sangria:
+            primer_nivel[nombre] = (
+                primer_nivel.get(nombre, 0) + int(acumulado) / 1000
+            )
+    return {
+        'total_ms': round(sum(primer_nivel.values()), 2),
+        'primer_nivel': primer_nivel,
+        'modulos': modulos
+    }
+
+
+def medir_importacion(
+    archivo: Path,
+    repeticiones: int = 5,
+    python: Optional[str] = None
+) -> Dict:
+    """
+    Mide la importación de un archivo de arranque en procesos nuevos.
+
+    Returns:
+        Diccionario con la mediana y el mínimo del total en ms, los módulos
+        de primer nivel más costosos, los módulos remotos cargados y, si la
+        importación falló, el error
+    """
+    totales: List[float] = []
+    medicion: Dict = {}
+    for _ in range(repeticiones):
+        proceso = subprocess.run(
+            [
+                python or sys.executable, '-X', 'importtime',
+                '-c', _CARGAR_SIN_EJECUTAR, str(archivo)
+            ],
+            cwd=str(RAIZ_PROYECTO),
+            capture_output=True,
+            text=True,
+            encoding='utf-8'
+        )
+        if proceso.returncode != 0:
+            error = [
+                linea for linea in proceso.stderr.splitlines()
+                if not linea.startswith('import time:')
+            ]
+            return {'archivo': str(archivo), 'error': '\n'.join(error[-5:])}
+        medicion = parsear_importtime(proceso.stderr)
+        totales.append(medicion['total_ms'])
+
+    remotos = sorted({
+        nombre.split('.')[0] for nombre in medicion['modulos']
+        if nombre.split('.')[0] in MODULOS_REMOTOS
+    })
+    costosos = sorted(
+        medicion['primer_nivel'].items(),
+        key=lambda item: item[1],
+        reverse=True
+    )
+    return {
+        'archivo': str(archivo),
+        'mediana_ms': round(statistics.median(totales), 2),
+        'minimo_ms': round(min(totales), 2),
+        'modulos': len(medicion['modulos']),
+        'mas_costosos': [
+            {'modulo': nombre, 'ms': round(ms, 2)}
+            for nombre, ms in costosos[:10]
+        ],
+        'remotos': remotos
+    }
+
+
+def presupuesto_configurado() -> Optional[float]:
+    """Presupuesto de importación en ms del entorno, o None si no se fijó"""
+    valor = os.getenv(VARIABLE_PRESUPUESTO)
+    if not valor:
+        return None
+    try:
+        return float(valor)
+    except ValueError:
+        logging.warning(f"{VARIABLE_PRESUPUESTO} no es un número: {valor}")
+        return None
+
+
+def verificar_arranque(
+    presupuesto_ms: Optional[float] = None,
+    repeticiones: int = 5
+) -> Tuple[bool, Dict[str, Dict]]:
+    """
+    Mide cada punto de entrada y marca como regresión la pila remota cargada
+    y, solo si se indica presupuesto_ms, la importación que lo supera.
+    """
+    resultados = {}
+    correcto = True
+    for nombre, archivo in PUNTOS_ENTRADA.items():
+        medicion = medir_importacion(RAIZ_PROYECTO / archivo, repeticiones)
+        medicion['regresiones'] = []
+        if 'error' in medicion:
+            medicion['regresiones'].append(
+                f"La importación falló: {medicion['error']}"
+            )
+        else:
+            if medicion['remotos']:
+                remotos = ', '.join(medicion['remotos'])
+                medicion['regresiones'].append(
+                    f"Carga módulos del modo remoto: {remotos}"
+                )
+            mediana = medicion['mediana_ms']
+            if presupuesto_ms is not None and mediana > presupuesto_ms:
+                medicion['regresiones'].append(
+                    f"Importación de {mediana} ms "
+                    f"(presupuesto {presupuesto_ms} ms)"
+                )
+        correcto = correcto and not medicion['regresiones']
+        resultados[nombre] = medicion
+    return correcto, resultados
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    correcto, resultados = verificar_arranque(presupuesto_configurado())
+    for nombre, medicion in resultados.items():
+        if 'error' in medicion:
+            print(f"{nombre}: error")
+        else:
+            print(f"{nombre}: {medicion['mediana_ms']} ms "
+                  f"(mínimo {medicion['minimo_ms']} ms, "
+                  f"{medicion['modulos']} módulos)")
+            for costoso in medicion['mas_costosos'][:5]:
+                print(f"  {costoso['modulo']:<40} {costoso['ms']:>8.2f} ms")
+        for regresion in medicion['regresiones']:
+            print(f"  ✗ {regresion}")
+    sys.exit(0 if correcto else 1)
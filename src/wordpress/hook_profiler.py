@@ -0,0 +1,579 @@
+"""
+Perfilado en tiempo de ejecución de los callbacks de acciones y filtros.
+
+Instala temporalmente un mu-plugin generado que envuelve cada callback
+registrado en $wp_filter y mide su duración durante renders de página
+lanzados con WP-CLI. Cada render escribe un JSON que se agrega aquí por
+hook, por callback y por origen (plugin, tema, mu-plugin o core).
+
+Los callbacks con parámetros por referencia no se envuelven (el envoltorio
+los recibiría como copias), así que no aparecen en el perfil.
+"""
+
+import json
+import logging
+import re
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from ..utils.command_runner import CommandRunner
+
+NOMBRE_MU_PLUGIN = 'webgenesis-hook-profiler.php'
+MARCA_MU_PLUGIN = 'webgenesis-hook-profiler'
+
+# Variable de entorno con la ruta del JSON de salida; sin ella el mu-plugin no
+# hace nada
+VARIABLE_SALIDA = 'WEBGENESIS_HOOK_PROFILE'
+
+MU_PLUGIN_PHP = r"""<?php
+/**
+ * Plugin Name: WebGenesis Hook Profiler
+ * Description: Perfilador temporal (webgenesis-hook-profiler).
+ */
+
+if (!defined('ABSPATH') || !function_exists('hrtime')) {
+    return;
+}
+$webgenesis_salida = getenv('WEBGENESIS_HOOK_PROFILE');
+if (!$webgenesis_salida) {
+    return;
+}
+
+final class WebGenesis_Hook_Timer
+{
+    public static $inicio = 0;
+    public static $tiempos = array();
+    public static $meta = array();
+    private static $pila = array();
+    private static $sin_envolver = array();
+
+    private $original;
+    private $clave;
+
+    public function __construct($hook, $original, $descripcion)
+    {
+        $this->original = $original;
+        $this->clave = $hook . "\0" . $descripcion[0] . "\0" . $descripcion[1];
+        if (!isset(self::$meta[$this->clave])) {
+            self::$meta[$this->clave] = array(
+                $hook, $descripcion[0], $descripcion[1]
+            );
+            self::$tiempos[$this->clave] = array(0, 0, 0);
+        }
+    }
+
+    public function __invoke(...$argumentos)
+    {
+        self::$pila[] = 0;
+        $inicio = hrtime(true);
+        try {
+            return call_user_func_array($this->original, $argumentos);
+        } finally {
+            $total = hrtime(true) - $inicio;
+            $hijos = array_pop(self::$pila);
+            $nivel = count(self::$pila);
+            if ($nivel) {
+                self::$pila[$nivel - 1] += $total;
+            }
+            $tiempo = &self::$tiempos[$this->clave];
+            $tiempo[0]++;
+            $tiempo[1] += $total;
+            $tiempo[2] += $total - $hijos;
+        }
+    }
+
+    private static function describir($callback)
+    {
+        try {
+            if (is_string($callback) && strpos($callback, '::') !== false) {
+                $callback = explode('::', $callback, 2);
+            }
+            if (is_array($callback)) {
+                $clase = is_object($callback[0])
+                    ? get_class($callback[0])
+                    : $callback[0];
+                $reflexion = new ReflectionMethod($clase, $callback[1]);
+                return array(
+                    $clase . '::' . $callback[1],
+                    (string) $reflexion->getFileName(),
+                    self::por_referencia($reflexion)
+                );
+            }
+            if ($callback instanceof Closure || is_string($callback)) {
+                $reflexion = new ReflectionFunction($callback);
+                $archivo = (string) $reflexion->getFileName();
+                $nombre = $callback instanceof Closure
+                    ? 'closure@' . basename($archivo) . ':'
+                        . $reflexion->getStartLine()
+                    : $callback;
+                return array(
+                    $nombre, $archivo, self::por_referencia($reflexion)
+                );
+            }
+            if (is_object($callback)) {
+                $reflexion = new ReflectionMethod($callback, '__invoke');
+                return array(
+                    get_class($callback) . '::__invoke',
+                    (string) $reflexion->getFileName(),
+                    self::por_referencia($reflexion)
+                );
+            }
+        } catch (ReflectionException $e) {
+        }
+        return array('desconocido', '', false);
+    }
+
+    private static function por_referencia($reflexion)
+    {
+        foreach ($reflexion->getParameters() as $parametro) {
+            if ($parametro->isPassedByReference()) {
+                return true;
+            }
+        }
+        return false;
+    }
+
+    public static function envolver($hook)
+    {
+        global $wp_filter;
+        if ($hook === 'all' || !isset($wp_filter[$hook])
+            || !is_object($wp_filter[$hook])) {
+            return;
+        }
+        // Se conserva el identificador del callback para que remove_filter
+        // y has_filter sigan funcionando
+        foreach ($wp_filter[$hook]->callbacks as $prioridad => $callbacks) {
+            foreach ($callbacks as $id => $callback) {
+                $clave = $hook . "\0" . $prioridad . "\0" . $id;
+                if ($callback['function'] instanceof self
+                    || isset(self::$sin_envolver[$clave])) {
+                    continue;
+                }
+                // __invoke recibe copias de los argumentos: un callback con
+                // parámetros por referencia (do_action_ref_array) se deja
+                // sin envolver ni medir para no cambiar lo que hace
+                $descripcion = self::describir($callback['function']);
+                if ($descripcion[2]) {
+                    self::$sin_envolver[$clave] = true;
+                    continue;
+                }
+                $envoltorio = new self(
+                    $hook, $callback['function'], $descripcion
+                );
+                $wp_filter[$hook]->callbacks[$prioridad][$id]['function'] =
+                    $envoltorio;
+            }
+        }
+    }
+
+    public static function escribir($salida)
+    {
+        $hooks = array();
+        foreach (self::$tiempos as $clave => $tiempo) {
+            if (!$tiempo[0]) {
+                continue;
+            }
+            $meta = self::$meta[$clave];
+            $hooks[] = array(
+                'hook' => $meta[0],
+                'callback' => $meta[1],
+                'archivo' => $meta[2],
+                'llamadas' => $tiempo[0],
+                'ns_total' => $tiempo[1],
+                'ns_propio' => $tiempo[2],
+            );
+        }
+        file_put_contents($salida, json_encode(array(
+            'url' => isset($_SERVER['REQUEST_URI'])
+                ? $_SERVER['REQUEST_URI']
+                : '',
+            'php' => PHP_VERSION,
+            'ns_peticion' => hrtime(true) - self::$inicio,
+            'hooks' => $hooks,
+        )));
+    }
+}
+
+WebGenesis_Hook_Timer::$inicio = hrtime(true);
+add_action('all', array('WebGenesis_Hook_Timer', 'envolver'));
+register_shutdown_function(
+    array('WebGenesis_Hook_Timer', 'escribir'),
+    $webgenesis_salida
+);
+"""
+
+# Código evaluado por WP-CLI: resuelve la petición de --url y carga la
+# plantilla como el front-end
+CODIGO_RENDER = (
+    "wp(); "
+    "if (!defined('WP_USE_THEMES')) { define('WP_USE_THEMES', true); } "
+    "ob_start(); require ABSPATH . WPINC . '/template-loader.php'; "
+    "echo strlen(ob_get_clean());"
+)
+
+# Sustituto mínimo del sistema de hooks de WordPress para medir el coste del
+# perfilador
+SUSTITUTO_PHP = r"""<?php
+define('ABSPATH', __DIR__ . '/');
+
+class WP_Hook
+{
+    public $callbacks = array();
+
+    public function add_filter($callback, $prioridad, $argumentos)
+    {
+        if (is_string($callback)) {
+            $id = $callback;
+        } elseif (is_array($callback)) {
+            $id = (is_object($callback[0])
+                ? spl_object_hash($callback[0])
+                : $callback[0]) . '::' . $callback[1];
+        } else {
+            $id = spl_object_hash($callback);
+        }
+        $this->callbacks[$prioridad][$id] = array(
+            'function' => $callback,
+            'accepted_args' => $argumentos
+        );
+        ksort($this->callbacks);
+    }
+
+    public function apply_filters($valor, $argumentos)
+    {
+        foreach ($this->callbacks as $callbacks) {
+            foreach ($callbacks as $the_) {
+                $argumentos[0] = $valor;
+                $valor = call_user_func_array(
+                    $the_['function'],
+                    array_slice($argumentos, 0, $the_['accepted_args'])
+                );
+            }
+        }
+        return $valor;
+    }
+}
+
+$wp_filter = array();
+
+function add_filter($hook, $callback, $prioridad = 10, $argumentos = 1)
+{
+    global $wp_filter;
+    if (!isset($wp_filter[$hook])) {
+        $wp_filter[$hook] = new WP_Hook();
+    }
+    $wp_filter[$hook]->add_filter($callback, $prioridad, $argumentos);
+    return true;
+}
+
+function add_action($hook, $callback, $prioridad = 10, $argumentos = 1)
+{
+    return add_filter($hook, $callback, $prioridad, $argumentos);
+}
+
+function apply_filters($hook, $valor)
+{
+    global $wp_filter;
+    if (isset($wp_filter['all'])) {
+        foreach ($wp_filter['all']->callbacks as $callbacks) {
+            foreach ($callbacks as $the_) {
+                call_user_func($the_['function'], $hook);
+            }
+        }
+    }
+    if (!isset($wp_filter[$hook])) {
+        return $valor;
+    }
+    return $wp_filter[$hook]->apply_filters($valor, array($valor));
+}
+
+function do_action($hook, $argumento = '')
+{
+    apply_filters($hook, $argumento);
+}
+
+if (!empty($argv[1])) {
+    require $argv[1];
+}
+$iteraciones = isset($argv[2]) ? (int) $argv[2] : 1000;
+
+function webgenesis_sustituto_texto($texto)
+{
+    return strtoupper($texto);
+}
+
+class WebGenesis_Sustituto
+{
+    public function contar($texto)
+    {
+        return $texto . strlen($texto);
+    }
+}
+
+$objeto = new WebGenesis_Sustituto();
+for ($i = 0; $i < 20; $i++) {
+    add_filter("sustituto_filtro_$i", 'webgenesis_sustituto_texto');
+    add_filter("sustituto_filtro_$i", array($objeto, 'contar'), 20);
+    add_action("sustituto_accion_$i", function ($valor) {
+        return md5($valor);
+    });
+}
+
+$inicio = hrtime(true);
+for ($n = 0; $n < $iteraciones; $n++) {
+    for ($i = 0; $i < 20; $i++) {
+        apply_filters("sustituto_filtro_$i", 'texto');
+        do_action("sustituto_accion_$i", 'x');
+    }
+}
+echo json_encode(array(
+    'ns' => hrtime(true) - $inicio,
+    'llamadas' => $iteraciones * 60
+));
+"""
+
+_ORIGENES = (
+    (re.compile(r'/wp-content/plugins/([^/]+)'), 'plugin:{}'),
+    (re.compile(r'/wp-content/mu-plugins/([^/]+?)(?:\.php)?(?:/|$)'),
+     'mu-plugin:{}'),
+    (re.compile(r'/wp-content/themes/([^/]+)'), 'tema:{}'),
+    (re.compile(r'/wp-(?:includes|admin)/'), 'core'),
+)
+
+
+def origen_de_archivo(archivo: str) -> str:
+    """Atribuye el archivo de un callback a plugin, tema, mu-plugin o core"""
+    if not archivo:
+        return 'php'
+    ruta = archivo.replace('\\', '/')
+    for patron, plantilla in _ORIGENES:
+        match = patron.search(ruta)
+        if match:
+            return plantilla.format(*match.groups())
+    return 'otro'
+
+
+def agregar_perfiles(perfiles: List[Dict]) -> Dict:
+    """
+    Agrega los JSON de varios renders en tablas de coste por hook, callback
+    y origen.
+
+    Los tiempos se promedian por render. El tiempo propio excluye los
+    callbacks anidados, por lo que la suma por origen no cuenta dos veces el
+    mismo trabajo; el tiempo total por hook sí incluye los hooks disparados
+    dentro de él.
+    """
+    renders = len(perfiles) or 1
+    por_hook: Dict[str, Dict] = {}
+    por_callback: Dict[tuple, Dict] = {}
+    por_origen: Dict[str, Dict] = {}
+
+    for perfil in perfiles:
+        for fila in perfil.get('hooks', []):
+            origen = origen_de_archivo(fila.get('archivo', ''))
+            for tabla, clave, base in (
+                (por_hook, fila['hook'],
+                 {'hook': fila['hook'], 'callbacks': set()}),
+                (por_callback, (fila['hook'], fila['callback'], origen),
+                 {'hook': fila['hook'], 'callback': fila['callback'],
+                  'origen': origen}),
+                (por_origen, origen, {'origen': origen, 'hooks': set()})
+            ):
+                total = tabla.setdefault(clave, {
+                    **base, 'llamadas': 0, 'ns_total': 0, 'ns_propio': 0
+                })
+                total['llamadas'] += fila['llamadas']
+                total['ns_total'] += fila['ns_total']
+                total['ns_propio'] += fila['ns_propio']
+            por_hook[fila['hook']]['callbacks'].add((fila['callback'], origen))
+            por_origen[origen]['hooks'].add(fila['hook'])
+
+    def _tabla(filas, conjunto: Optional[str] = None) -> List[Dict]:
+        resultado = []
+        for fila in filas:
+            fila = dict(fila)
+            if conjunto:
+                fila[conjunto] = len(fila[conjunto])
+            fila['llamadas'] = round(fila['llamadas'] / renders, 1)
+            fila['ms_total'] = round(fila.pop('ns_total') / renders / 1e6, 3)
+            fila['ms_propio'] = round(fila.pop('ns_propio') / renders / 1e6, 3)
+            resultado.append(fila)
+        return sorted(resultado, key=lambda f: f['ms_propio'], reverse=True)
+
+    return {
+        'renders': len(perfiles),
+        'ms_peticion': round(
+            sum(p.get('ns_peticion', 0) for p in perfiles) / renders / 1e6, 3
+        ),
+        'por_origen': _tabla(por_origen.values(), 'hooks'),
+        'por_hook': _tabla(por_hook.values(), 'callbacks'),
+        'callbacks': _tabla(por_callback.values())
+    }
+
+
+class HookProfiler:
+    """Instala el mu-plugin perfilador, lanza renders y agrega resultados"""
+
+    def __init__(self, ruta_wp: Path):
+        self.ruta_wp = Path(ruta_wp)
+        self.directorio_mu = self.ruta_wp / 'wp-content' / 'mu-plugins'
+        self.archivo_mu = self.directorio_mu / NOMBRE_MU_PLUGIN
+        self._directorio_creado = False
+
+    def instalar(self) -> Path:
+        """Copia el mu-plugin generado; nunca sobrescribe un archivo ajeno"""
+        if self.archivo_mu.exists():
+            contenido = self.archivo_mu.read_text(
+                encoding='utf-8', errors='ignore'
+            )
+            if MARCA_MU_PLUGIN not in contenido:
+                raise RuntimeError(
+                    f"{self.archivo_mu} ya existe y no fue generado por "
+                    f"WebGenesis"
+                )
+            logging.warning(
+                f"Se reemplaza un perfilador de hooks anterior: "
+                f"{self.archivo_mu}"
+            )
+        if not self.directorio_mu.exists():
+            self.directorio_mu.mkdir(parents=True)
+            self._directorio_creado = True
+        temporal = self.archivo_mu.with_suffix('.tmp')
+        temporal.write_text(MU_PLUGIN_PHP, encoding='utf-8')
+        temporal.replace(self.archivo_mu)
+        return self.archivo_mu
+
+    def desinstalar(self):
+        """Elimina el mu-plugin y mu-plugins/ si se creó para el perfilado"""
+        try:
+            if self.archivo_mu.exists():
+                self.archivo_mu.unlink()
+            vacio = not any(self.directorio_mu.iterdir())
+            if self._directorio_creado and vacio:
+                self.directorio_mu.rmdir()
+            self._directorio_creado = False
+        except OSError as e:
+            logging.error(
+                f"No se pudo eliminar el perfilador de hooks "
+                f"{self.archivo_mu}: {str(e)}"
+            )
+            raise
+
+    def perfilar(
+        self,
+        urls: List[str],
+        renders: int = 1,
+        comando_render: Optional[Callable[[str], List[str]]] = None
+    ) -> Dict:
+        """
+        Renderiza cada URL con el perfilador instalado y agrega los tiempos.
+
+        Args:
+            urls: URLs completas a renderizar
+            renders: Renders por URL (los tiempos se promedian)
+            comando_render: Construye el comando de render para una URL
+                (por defecto `wp --url=<url> eval` con el cargador de
+                plantillas)
+        """
+        comando_render = comando_render or (
+            lambda url: ['wp', f'--url={url}', 'eval', CODIGO_RENDER]
+        )
+        directorio_salida = Path(tempfile.mkdtemp(prefix='webgenesis-hooks-'))
+        perfiles, errores = [], []
+        self.instalar()
+        try:
+            for url in urls:
+                for numero in range(renders):
+                    indice = len(perfiles) + len(errores)
+                    salida = directorio_salida / f"render-{indice}.json"
+                    success, output = CommandRunner.execute_command(
+                        comando_render(url),
+                        cwd=self.ruta_wp,
+                        env={VARIABLE_SALIDA: str(salida)}
+                    )
+                    if not salida.exists():
+                        errores.append({
+                            'url': url,
+                            'render': numero + 1,
+                            'mensaje': output.strip()
+                        })
+                        continue
+                    try:
+                        perfil = json.loads(salida.read_text(encoding='utf-8'))
+                    except (OSError, ValueError) as e:
+                        # Render cortado a medias (límite de memoria, fatal en
+                        # el shutdown...)
+                        errores.append({
+                            'url': url,
+                            'render': numero + 1,
+                            'mensaje': f"Perfil ilegible: {str(e)}"
+                        })
+                        continue
+                    perfil['url_solicitada'] = url
+                    perfiles.append(perfil)
+        finally:
+            self.desinstalar()
+            shutil.rmtree(directorio_salida, ignore_errors=True)
+
+        resultado = agregar_perfiles(perfiles)
+        resultado['urls'] = list(urls)
+        resultado['errores'] = errores
+        return resultado
+
+    @staticmethod
+    def comparar_con_sustituto(
+        iteraciones: int = 2000, php: str = 'php'
+    ) -> Dict:
+        """
+        Mide la sobrecarga del perfilador frente a un sustituto PHP sin
+        WordPress.
+
+        Ejecuta el mismo lote de filtros y acciones sintéticos sin y con el
+        mu-plugin cargado, y devuelve los tiempos y el perfil agregado.
+        """
+        directorio = Path(tempfile.mkdtemp(prefix='webgenesis-hooks-bench-'))
+        try:
+            sustituto = directorio / 'sustituto.php'
+            mu_plugin = directorio / NOMBRE_MU_PLUGIN
+            salida = directorio / 'perfil.json'
+            sustituto.write_text(SUSTITUTO_PHP, encoding='utf-8')
+            mu_plugin.write_text(MU_PLUGIN_PHP, encoding='utf-8')
+
+            tiempos = {}
+            for modo, argumentos, env in (
+                ('base', [php, str(sustituto), '', str(iteraciones)], None),
+                ('perfilado',
+                 [php, str(sustituto), str(mu_plugin), str(iteraciones)],
+                 {VARIABLE_SALIDA: str(salida)})
+            ):
+                inicio = time.perf_counter()
+                success, output = CommandRunner.execute_command(
+                    argumentos, cwd=directorio, env=env
+                )
+                if not success:
+                    return {'error': output}
+                tiempos[modo] = {
+                    'ms_hooks': round(json.loads(output)['ns'] / 1e6, 3),
+                    'ms_proceso': round(
+                        (time.perf_counter() - inicio) * 1000, 3
+                    )
+                }
+
+            datos = json.loads(salida.read_text(encoding='utf-8'))
+            perfil = agregar_perfiles([datos])
+            llamadas = iteraciones * 60
+            return {
+                'iteraciones': iteraciones,
+                'llamadas': llamadas,
+                'tiempos': tiempos,
+                'sobrecarga_por_llamada_us': round(
+                    (tiempos['perfilado']['ms_hooks']
+                     - tiempos['base']['ms_hooks']) * 1000 / llamadas,
+                    3
+                ),
+                'perfil': perfil
+            }
+        finally:
+            shutil.rmtree(directorio, ignore_errors=True)
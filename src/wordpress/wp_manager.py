@@ -6,21 +6,50 @@ from datetime import datetime
 import json
 from ..utils.command_runner import CommandRunner
 from ..utils.ui_helper import UIHelper
+from ..hostinger_diagnostic.diagnostic_checks import diagnosticar
+from ..hostinger_diagnostic.hook_inventory import (
+    HookInventory, formatear_tabla_hooks
+)
+from ..hostinger_diagnostic.integrity_baseline import IntegrityBaseline
+from ..hostinger_diagnostic.plugin_catalog import PluginCatalog
+from ..hostinger_diagnostic.transport import LocalTransport, Transport
+from ..hostinger_diagnostic.uploads_analyzer import UploadsAnalyzer
+from .hook_profiler import HookProfiler
 
 class WordPressManager:
-    def __init__(self, ui: UIHelper, ruta_base: Path):
+    def __init__(
+        self,
+        ui: UIHelper,
+        ruta_base: Path,
+        transporte: Optional[Transport] = None
+    ):
         self.ui = ui
         self.ruta_base = ruta_base
+        # Los comandos de WP-CLI y las comprobaciones de archivos van por el
+        # transporte; ruta_base es donde se escriben los reportes
+        self.transporte = transporte or LocalTransport(ruta_base, ui)
         self.wp_path = Path.home() / '.wp-cli'  # Nuevo: directorio para WP-CLI
         self.diagnostics = []
+        self._catalogo_plugins: Optional[PluginCatalog] = None
+
+    def catalogo_plugins(self) -> PluginCatalog:
+        """Catálogo de plugins de la instalación, compartido por el análisis"""
+        if self._catalogo_plugins is None:
+            self._catalogo_plugins = PluginCatalog(
+                self.transporte.raiz_local(), self.transporte
+            )
+        return self._catalogo_plugins
 
     def verificar_wpcli(self) -> bool:
         """Verifica si WP-CLI está instalado y configurado"""
         # Primero verificar en PATH
-        success, _ = CommandRunner.execute_command(['wp', '--info'])
+        success, _ = self.transporte.ejecutar(['wp', '--info'])
         if success:
             self.ui.print_success("WP-CLI encontrado y funcionando")
             return True
+        if not self._es_local():
+            self.ui.print_error("WP-CLI no encontrado en el servidor")
+            return False
             
         # Verificar en directorio local
         wp_local = self.wp_path / 'wp.bat'
@@ -36,6 +65,10 @@ class WordPressManager:
             return self._instalar_wpcli()
         return False
 
+    def _es_local(self) -> bool:
+        """Indica si la instalación está en esta máquina"""
+        return isinstance(self.transporte, LocalTransport)
+
     def _instalar_wpcli(self) -> bool:
         """Instala WP-CLI en el directorio del usuario"""
         try:
@@ -112,7 +145,7 @@ php "{self.wp_path / 'wp-cli.phar'}" %*"""
                 return False, {}
 
             # Verificar que es una instalación WordPress
-            if not (self.ruta_base / 'wp-config.php').exists():
+            if self.transporte.stat('wp-config.php') is None:
                 self.ui.print_error("No se encontró wp-config.php. ¿Es esto una instalación WordPress?")
                 return False, {}
 
@@ -127,47 +160,45 @@ php "{self.wp_path / 'wp-cli.phar'}" %*"""
             }
 
             # Obtener versión y estado
-            success, output = CommandRunner.execute_command(
-                ['wp', 'core', 'version'], cwd=self.ruta_base
+            success, output = self.transporte.ejecutar(
+                ['wp', 'core', 'version']
             )
             if success:
                 info['version'] = output.strip()
                 self.ui.print_success(f"WordPress versión {info['version']} detectada")
             
             # Verificar tema activo
-            success, output = CommandRunner.execute_command(
-                ['wp', 'theme', 'list', '--status=active', '--format=json'],
-                cwd=self.ruta_base
+            success, output = self.transporte.ejecutar(
+                ['wp', 'theme', 'list', '--status=active', '--format=json']
             )
             if success:
                 info['tema_activo'] = json.loads(output)
                 self.ui.print_step(f"Tema activo: {info['tema_activo']}")
 
-            # Listar plugins
-            success, output = CommandRunner.execute_command(
-                ['wp', 'plugin', 'list', '--format=json'],
-                cwd=self.ruta_base
-            )
-            if success:
-                info['plugins'] = json.loads(output)
-                self.ui.print_step(f"Plugins encontrados: {len(info['plugins'])}")
+            # Listar plugins desde sus cabeceras; el estado sale del volcado de
+            # opciones
+            catalogo = self.catalogo_plugins()
+            opciones = catalogo.actualizar_estado()
+            if catalogo.estado_desde_cache:
+                self.ui.print_warning(
+                    f"WP-CLI no disponible: estado de plugins del volcado "
+                    f"guardado el {opciones.get('fecha', '?')}"
+                )
+            info['plugins'] = catalogo.listar()
+            self.ui.print_step(f"Plugins encontrados: {len(info['plugins'])}")
 
             # Verificar base de datos
-            success, output = CommandRunner.execute_command(
-                ['wp', 'db', 'check'],
-                cwd=self.ruta_base
-            )
+            success, output = self.transporte.ejecutar(['wp', 'db', 'check'])
             info['estado_db'] = 'OK' if success else 'Error'
             
             # Verificar permisos críticos
-            for dir in ['wp-content', 'wp-content/uploads']:
-                path = self.ruta_base / dir
-                if path.exists():
-                    permisos = os.stat(path).st_mode
+            directorios = ['wp-content', 'wp-content/uploads']
+            for dir, st in self.transporte.stats(directorios).items():
+                if st is not None:
                     info['permisos'].append({
                         'path': dir,
-                        'mode': oct(permisos)[-3:],
-                        'writeable': os.access(path, os.W_OK)
+                        'mode': oct(st['modo'])[-3:],
+                        'writeable': self.transporte.escribible(dir)
                     })
 
             # Generar reporte detallado
@@ -208,7 +239,7 @@ php "{self.wp_path / 'wp-cli.phar'}" %*"""
         """Analiza una instalación WordPress existente"""
         try:
             # Verificar que es una instalación WordPress
-            if not (self.ruta_base / 'wp-config.php').exists():
+            if self.transporte.stat('wp-config.php') is None:
                 self.ui.print_error("No se encontró wp-config.php. ¿Es esto una instalación WordPress?")
                 return
 
@@ -220,7 +251,10 @@ php "{self.wp_path / 'wp-cli.phar'}" %*"""
                 print("1. Analizar instalación")
                 print("2. Ejecutar diagnóstico completo")
                 print("3. Verificar actualizaciones")
-                print("4. Volver al menú principal")
+                print("4. Perfilar hooks en tiempo de ejecución")
+                print("5. Verificar integridad de plugins y temas")
+                print("6. Analizar subidas (espacio recuperable)")
+                print("7. Volver al menú principal")
                 
                 opcion = input("\nSeleccione una opción: ")
                 
@@ -237,6 +271,24 @@ php "{self.wp_path / 'wp-cli.phar'}" %*"""
                 elif opcion == "3":
                     self.verificar_actualizaciones()
                 elif opcion == "4":
+                    if self.ui.confirmar_accion(
+                        "Se instalará temporalmente un mu-plugin de "
+                        "perfilado. ¿Continuar?"
+                    ):
+                        self.perfilar_hooks()
+                elif opcion == "5":
+                    success, resultado = self.verificar_integridad_contenido()
+                    if (
+                        success
+                        and not resultado['ok']
+                        and self.ui.confirmar_accion(
+                            "¿Aceptar el estado actual como nueva línea base?"
+                        )
+                    ):
+                        self.verificar_integridad_contenido(actualizar=True)
+                elif opcion == "6":
+                    self.analizar_subidas()
+                elif opcion == "7":
                     break
 
         except Exception as e:
@@ -254,7 +306,7 @@ php "{self.wp_path / 'wp-cli.phar'}" %*"""
             ]
 
             for tipo, comando in checks:
-                success, output = CommandRunner.execute_command(comando, cwd=self.ruta_base)
+                success, output = self.transporte.ejecutar(comando)
                 if success:
                     self.ui.print_step(f"Estado de {tipo}:")
                     print(output)
@@ -262,43 +314,269 @@ php "{self.wp_path / 'wp-cli.phar'}" %*"""
         except Exception as e:
             self.ui.print_error(f"Error al verificar actualizaciones: {str(e)}")
 
-    def ejecutar_diagnostico_completo(self) -> Tuple[bool, Dict]:
-        """Ejecuta un diagnóstico completo de WordPress"""
+    def perfilar_hooks(
+        self, urls: Optional[List[str]] = None, renders: int = 3
+    ) -> Tuple[bool, Dict]:
+        """
+        Mide el coste de cada callback de acciones y filtros durante renders
+        reales.
+
+        Instala temporalmente un mu-plugin perfilador, renderiza las URLs con
+        WP-CLI y lo elimina al terminar, incluso si algún render falla.
+
+        Args:
+            urls: URLs o rutas relativas a la portada (por defecto, la portada)
+            renders: Renders por URL; los tiempos se promedian
+        """
+        self.ui.print_step("Perfilando hooks en tiempo de ejecución...")
         try:
-            diagnosticos = {
-                'estado': 'pendiente',
-                'errores': [],
-                'advertencias': [],
-                'info': {},
-                'timestamp': datetime.now().isoformat()
-            }
+            if self.transporte.stat('wp-config.php') is None:
+                self.ui.print_error(
+                    "No se encontró wp-config.php. "
+                    "¿Es esto una instalación WordPress?"
+                )
+                return False, {}
+            if not self._es_local():
+                self.ui.print_error(
+                    "El perfilado de hooks solo está disponible para "
+                    "instalaciones locales"
+                )
+                return False, {}
+            if not self.verificar_wpcli():
+                return False, {}
 
-            checks = [
-                ('core', ['wp', 'core', 'verify-checksums']),
-                ('db', ['wp', 'db', 'check']),
-                ('plugins', ['wp', 'plugin', 'status']),
-                ('temas', ['wp', 'theme', 'status']),
-                ('permisos', ['wp', 'eval', "echo wp_is_writable(ABSPATH)"]),
-                ('updates', ['wp', 'core', 'check-update']),
-                ('ssl', ['wp', 'eval', "echo is_ssl() ? 'SSL activo' : 'Sin SSL'"])
+            success, output = self.transporte.ejecutar(
+                ['wp', 'option', 'get', 'home']
+            )
+            if not success:
+                self.ui.print_error("No se pudo obtener la URL del sitio")
+                return False, {}
+            inicio = output.strip().rstrip('/')
+            urls = [
+                url if url.startswith(('http://', 'https://'))
+                else f"{inicio}/{url.lstrip('/')}"
+                for url in (urls or ['/'])
             ]
 
-            for nombre, comando in checks:
-                self.ui.print_step(f"Verificando {nombre}...")
-                success, output = CommandRunner.execute_command(
-                    comando, cwd=self.ruta_base, shell=True
+            perfil = HookProfiler(self.ruta_base).perfilar(urls, renders)
+            for error in perfil['errores']:
+                self.ui.print_warning(
+                    f"Render sin perfil ({error['url']}): {error['mensaje']}"
                 )
-                
-                if not success:
-                    diagnosticos['errores'].append({
-                        'componente': nombre,
-                        'mensaje': output
-                    })
-                else:
-                    diagnosticos['info'][nombre] = output.strip()
+            if not perfil['renders']:
+                self.ui.print_error("Ningún render produjo datos de perfilado")
+                return False, perfil
+
+            for fila in perfil['por_origen'][:5]:
+                self.ui.print_step(
+                    f"{fila['origen']}: {fila['ms_propio']} ms por render"
+                )
+            self._generar_reporte_perfil(
+                self.ruta_base / 'wp-perfil-hooks.md', perfil
+            )
+            return True, perfil
+
+        except Exception as e:
+            self.ui.print_error(f"Error al perfilar hooks: {str(e)}")
+            logging.error(f"Error al perfilar hooks: {str(e)}")
+            return False, {}
+
+    def verificar_integridad_contenido(
+        self, actualizar: bool = False, limite: int = 20
+    ) -> Tuple[bool, Dict]:
+        """
+        Compara los archivos de plugins y temas con su línea base de hashes.
 
-            # Analizar resultados
-            diagnosticos['estado'] = 'error' if diagnosticos['errores'] else 'ok'
+        La primera vez se crea la línea base. Después solo se hashean los
+        archivos cuyo tamaño o mtime cambió desde la última verificación.
+
+        Args:
+            actualizar: Acepta el estado actual como nueva línea base
+            limite: Archivos listados por categoría
+        """
+        self.ui.print_step("Verificando integridad de plugins y temas...")
+        try:
+            if not self._es_local():
+                self.ui.print_error(
+                    "La línea base de integridad solo está disponible para "
+                    "instalaciones locales"
+                )
+                return False, {}
+
+            baseline = IntegrityBaseline(self.ruta_base)
+            resultado = baseline.comparar(actualizar)
+            if not resultado['disponible']:
+                # Sin línea base, o ilegible o incompatible (ya descartada)
+                creada = baseline.crear()
+                self.ui.print_success(
+                    f"Línea base creada: {creada['archivos']} archivos "
+                    f"({creada['segundos']} s)"
+                )
+                return True, {
+                    'ok': True, 'disponible': False, 'creada': creada
+                }
+
+            for clave, titulo in (
+                ('modificados', 'Modificado'),
+                ('anadidos', 'Añadido'),
+                ('eliminados', 'Eliminado')
+            ):
+                for ruta in resultado[clave][:limite]:
+                    self.ui.print_warning(f"{titulo}: {ruta}")
+                if len(resultado[clave]) > limite:
+                    restantes = len(resultado[clave]) - limite
+                    self.ui.print_warning(f"... y {restantes} más")
+            resumen = (
+                f"{resultado['verificados']} archivos verificados, "
+                f"{resultado['hasheados']} hasheados "
+                f"({resultado['segundos']} s)"
+            )
+            if actualizar:
+                self.ui.print_success(f"Línea base actualizada: {resumen}")
+            elif resultado['ok']:
+                self.ui.print_success(
+                    f"Sin cambios desde {resultado['creado']}: {resumen}"
+                )
+            else:
+                self.ui.print_error(
+                    f"Cambios desde {resultado['creado']}: "
+                    f"{len(resultado['modificados'])} modificados, "
+                    f"{len(resultado['anadidos'])} añadidos, "
+                    f"{len(resultado['eliminados'])} eliminados"
+                )
+            return True, resultado
+
+        except Exception as e:
+            self.ui.print_error(f"Error al verificar integridad: {str(e)}")
+            logging.error(f"Error al verificar integridad: {str(e)}")
+            return False, {}
+
+    def analizar_subidas(self) -> Tuple[bool, Dict]:
+        """
+        Busca en wp-content/uploads duplicados exactos, originales
+        sobredimensionados y miniaturas huérfanas o faltantes, y estima el
+        espacio recuperable.
+        """
+        try:
+            if not self._es_local():
+                self.ui.print_error(
+                    "El análisis de subidas solo está disponible para "
+                    "instalaciones locales"
+                )
+                return False, {}
+
+            resultados = UploadsAnalyzer(self.ui).analizar(self.ruta_base)
+            for advertencia in resultados['advertencias']:
+                self.ui.print_warning(advertencia)
+            self._generar_reporte_subidas(
+                self.ruta_base / 'wp-subidas.md', resultados
+            )
+            return True, resultados
+
+        except Exception as e:
+            self.ui.print_error(f"Error al analizar subidas: {str(e)}")
+            logging.error(f"Error al analizar subidas: {str(e)}")
+            return False, {}
+
+    def _generar_reporte_subidas(
+        self, report_path: Path, resultados: Dict, limite: int = 25
+    ):
+        """Genera el reporte de espacio recuperable en subidas"""
+        recuperable = resultados['recuperable']
+        megas = resultados['bytes'] // (1024 * 1024)
+        content = [
+            "# Análisis de Subidas",
+            f"\nFecha: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+            f"\n- Archivos: {resultados['archivos']} ({megas} MB)",
+            f"- Recuperable por duplicados: "
+            f"{recuperable['duplicados'] // 1024} KB",
+            f"- Recuperable por miniaturas huérfanas: "
+            f"{recuperable['huerfanas'] // 1024} KB",
+            f"- Total recuperable: {recuperable['total'] // 1024} KB",
+
+            "\n## Duplicados",
+            "| Archivos | KB por copia | KB recuperables |",
+            "|----------|--------------|-----------------|",
+            *[f"| {', '.join(d['archivos'])} | {d['bytes'] // 1024} | "
+              f"{d['recuperable'] // 1024} |"
+              for d in resultados['duplicados'][:limite]],
+
+            "\n## Originales Sobredimensionados",
+            *[f"- {i['archivo']} ({i['ancho']}x{i['alto']}, "
+              f"{i['bytes'] // 1024} KB)"
+              for i in resultados['sobredimensionadas'][:limite]],
+
+            "\n## Miniaturas Huérfanas",
+            *[f"- {v['archivo']} ({v['bytes'] // 1024} KB)"
+              for v in resultados['variantes_huerfanas'][:limite]],
+
+            "\n## Miniaturas Faltantes",
+            *[f"- {v['archivo']}: {', '.join(v['faltan'])}"
+              for v in resultados['variantes_faltantes'][:limite]],
+
+            "\n## Advertencias",
+            *[f"- {advertencia}" for advertencia in resultados['advertencias']]
+        ]
+
+        report_path.write_text('\n'.join(content), encoding='utf-8')
+        self.ui.print_success(f"Reporte de subidas generado en: {report_path}")
+
+    def _generar_reporte_perfil(
+        self, report_path: Path, perfil: Dict, limite: int = 25
+    ):
+        """Genera el reporte de costes por origen, hook y callback"""
+        content = [
+            "# Perfil de Hooks WordPress",
+            f"\nFecha: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+            f"\n- Renders: {perfil['renders']} ({', '.join(perfil['urls'])})",
+            f"- Tiempo medio de petición: {perfil['ms_peticion']} ms",
+
+            "\n## Coste por Origen",
+            "| Origen | Hooks | Llamadas | ms propio | ms total |",
+            "|--------|-------|----------|-----------|----------|",
+            *[f"| {f['origen']} | {f['hooks']} | {f['llamadas']} | "
+              f"{f['ms_propio']} | {f['ms_total']} |"
+              for f in perfil['por_origen']],
+
+            "\n## Coste por Hook",
+            "| Hook | Callbacks | Llamadas | ms propio | ms total |",
+            "|------|-----------|----------|-----------|----------|",
+            *[f"| `{f['hook']}` | {f['callbacks']} | {f['llamadas']} | "
+              f"{f['ms_propio']} | {f['ms_total']} |"
+              for f in perfil['por_hook'][:limite]],
+
+            "\n## Callbacks más Costosos",
+            "| Callback | Hook | Origen | Llamadas | ms propio |",
+            "|----------|------|--------|----------|-----------|",
+            *[f"| `{f['callback']}` | `{f['hook']}` | {f['origen']} | "
+              f"{f['llamadas']} | {f['ms_propio']} |"
+              for f in perfil['callbacks'][:limite]]
+        ]
+
+        report_path.write_text('\n'.join(content), encoding='utf-8')
+        self.ui.print_success(
+            f"Reporte de perfilado generado en: {report_path}"
+        )
+
+    def ejecutar_diagnostico_completo(
+        self, sonda: bool = True
+    ) -> Tuple[bool, Dict]:
+        """
+        Ejecuta un diagnóstico completo de WordPress.
+
+        Con sonda=True todas las comprobaciones se resuelven en un solo
+        `wp eval-file` (un arranque de WordPress y, en remoto, un viaje de
+        ida y vuelta); si la sonda falla se usan los comandos WP-CLI.
+        """
+        try:
+            self.ui.print_step("Ejecutando diagnóstico completo...")
+            diagnosticos = diagnosticar(self.transporte, sonda)
+            diagnosticos['timestamp'] = datetime.now().isoformat()
+
+            hooks = self._inventariar_hooks()
+            if hooks is not None:
+                diagnosticos['hooks'] = hooks
+                diagnosticos['advertencias'].extend(hooks['advertencias'])
 
             # Generar reporte
             self._generar_reporte_diagnostico(diagnosticos)
@@ -309,6 +587,30 @@ php "{self.wp_path / 'wp-cli.phar'}" %*"""
             logging.error(f"Error en diagnóstico: {str(e)}")
             return False, {"estado": "error", "mensaje": str(e)}
 
+    def _inventariar_hooks(self) -> Optional[Dict]:
+        """Inventario estático de add_action/add_filter del tema y plugins"""
+        try:
+            raiz = self.transporte.raiz_local()
+            catalogo = self.catalogo_plugins()
+            opciones = catalogo.actualizar_estado() or {}
+            # Tema activo y, si es hijo, su padre
+            candidatos = (
+                opciones.get('stylesheet'), opciones.get('template')
+            )
+            temas = [tema for tema in dict.fromkeys(candidatos) if tema]
+            resultado = HookInventory(self.ui).inventariar(
+                raiz, temas, catalogo.activos()
+            )
+            if catalogo.estado_desde_cache:
+                resultado.setdefault('advertencias', []).append(
+                    f"WP-CLI no disponible: plugins activos según el volcado "
+                    f"guardado el {opciones.get('fecha', '?')}"
+                )
+            return resultado
+        except Exception as e:
+            logging.error(f"Error al inventariar hooks: {str(e)}")
+            return None
+
     def _generar_reporte_diagnostico(self, diagnosticos: Dict):
         """Genera un reporte detallado del diagnóstico"""
         try:
@@ -321,6 +623,9 @@ php "{self.wp_path / 'wp-cli.phar'}" %*"""
                 
                 "\n## Errores Detectados",
                 *[f"- {e['componente']}: {e['mensaje']}" for e in diagnosticos['errores']],
+
+                "\n## Advertencias",
+                *[f"- {a}" for a in diagnosticos.get('advertencias', [])],
                 
                 "\n## Información por Componente"
             ]
@@ -330,6 +635,16 @@ php "{self.wp_path / 'wp-cli.phar'}" %*"""
                     f"\n### {componente.title()}",
                     f"\n{info}"
                 ])
+
+            if diagnosticos.get('hooks'):
+                hooks = diagnosticos['hooks']
+                contenido.extend([
+                    "\n## Hooks Registrados",
+                    f"\n{len(hooks['registros'])} registros en "
+                    f"{len(hooks['por_origen'])} orígenes; "
+                    f"{len(hooks['calientes'])} hooks calientes\n",
+                    *formatear_tabla_hooks(hooks['por_hook'])
+                ])
             
             report_path.write_text('\n'.join(contenido), encoding='utf-8')
             self.ui.print_success(f"Reporte de diagnóstico generado en: {report_path}")
@@ -368,22 +683,22 @@ php "{self.wp_path / 'wp-cli.phar'}" %*"""
                 self.ui.print_step(f"Intentando corregir: {componente}")
                 
                 if componente == 'db':
-                    success, _ = CommandRunner.execute_command(
-                        ['wp', 'db', 'repair'], cwd=self.ruta_base
+                    success, _ = self.transporte.ejecutar(
+                        ['wp', 'db', 'repair']
                     )
                     if success:
                         acciones.append("Base de datos reparada")
                 
                 elif componente == 'plugins':
-                    success, _ = CommandRunner.execute_command(
-                        ['wp', 'plugin', 'update', '--all'], cwd=self.ruta_base
+                    success, _ = self.transporte.ejecutar(
+                        ['wp', 'plugin', 'update', '--all']
                     )
                     if success:
                         acciones.append("Plugins actualizados")
                 
                 elif componente == 'temas':
-                    success, _ = CommandRunner.execute_command(
-                        ['wp', 'theme', 'update', '--all'], cwd=self.ruta_base
+                    success, _ = self.transporte.ejecutar(
+                        ['wp', 'theme', 'update', '--all']
                     )
                     if success:
                         acciones.append("Temas actualizados")
@@ -409,23 +724,23 @@ php "{self.wp_path / 'wp-cli.phar'}" %*"""
         """Corrige permisos comunes"""
         directorios = ['wp-content', 'wp-content/uploads', 'wp-content/plugins']
         for dir in directorios:
-            CommandRunner.execute_command(['chmod', '-R', '755', dir], cwd=self.ruta_base)
+            self.transporte.ejecutar(['chmod', '-R', '755', dir])
 
     def _actualizar_plugins(self):
         """Actualiza plugins con problemas"""
-        CommandRunner.execute_command(['wp', 'plugin', 'update', '--all'], cwd=self.ruta_base)
+        self.transporte.ejecutar(['wp', 'plugin', 'update', '--all'])
 
     def _actualizar_temas(self):
         """Actualiza temas con problemas"""
-        CommandRunner.execute_command(['wp', 'theme', 'update', '--all'], cwd=self.ruta_base)
+        self.transporte.ejecutar(['wp', 'theme', 'update', '--all'])
 
     def _limpiar_cache(self):
         """Limpia cachés de WordPress"""
-        CommandRunner.execute_command(['wp', 'cache', 'flush'], cwd=self.ruta_base)
+        self.transporte.ejecutar(['wp', 'cache', 'flush'])
 
     def _optimizar_db(self):
         """Optimiza la base de datos"""
-        CommandRunner.execute_command(['wp', 'db', 'optimize'], cwd=self.ruta_base)
+        self.transporte.ejecutar(['wp', 'db', 'optimize'])
 
     def actualizar_documentacion_wordpress(self, diagnosticos: Dict):
         """Actualiza la documentación del proyecto con resultados de WordPress"""